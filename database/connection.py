@@ -0,0 +1,140 @@
+"""
+Shared SQLite connection provider for the CMS database layer.
+
+Every query in the application used to open and close its own connection,
+which made connection setup the dominant cost on large works. This module
+keeps one long-lived connection per thread and database path instead, tuned
+once with the PRAGMAs below and with a large prepared-statement cache.
+
+Usage:
+    conn = get_connection(DATABASE_PATH)          # reads
+    with transaction(DATABASE_PATH) as cursor:    # writes (commit/rollback)
+        cursor.execute(...)
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from config import DATABASE_PATH
+
+# Number of compiled statements sqlite3 keeps per connection.
+STATEMENT_CACHE_SIZE = 512
+
+# Seconds to wait on a locked database before raising "database is locked".
+BUSY_TIMEOUT = 30
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-32000",       # ~32 MB page cache
+    "PRAGMA mmap_size=268435456",     # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+)
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_open_connections = []
+_generation = 0
+
+
+def _configure(conn):
+    for pragma in CONNECTION_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.DatabaseError:
+            # Some filesystems (e.g. network shares) reject WAL/mmap; the
+            # connection is still usable with SQLite's defaults.
+            pass
+    return conn
+
+
+def _thread_state():
+    if getattr(_local, 'generation', None) != _generation:
+        _local.generation = _generation
+        _local.connections = {}
+        _local.depth = {}
+    return _local
+
+
+def get_connection(db_path=DATABASE_PATH):
+    """
+    Returns the calling thread's shared connection to ``db_path``.
+
+    The connection must not be closed by the caller; use
+    close_all_connections() when the database file itself is replaced.
+    """
+    state = _thread_state()
+    conn = state.connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(
+            db_path,
+            timeout=BUSY_TIMEOUT,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,
+        )
+        _configure(conn)
+        state.connections[db_path] = conn
+        with _registry_lock:
+            _open_connections.append(conn)
+    return conn
+
+
+@contextmanager
+def transaction(db_path=DATABASE_PATH):
+    """
+    Yields a cursor on the shared connection and commits when the block
+    succeeds or rolls back when it raises. Nested blocks join the outermost
+    transaction.
+    """
+    conn = get_connection(db_path)
+    state = _thread_state()
+    depth = state.depth.get(db_path, 0)
+    state.depth[db_path] = depth + 1
+    try:
+        yield conn.cursor()
+        if depth == 0:
+            conn.commit()
+    except BaseException:
+        if depth == 0:
+            conn.rollback()
+        raise
+    finally:
+        state.depth[db_path] = depth
+
+
+@contextmanager
+def read_transaction(db_path=DATABASE_PATH):
+    """
+    Yields a cursor whose queries all see the same consistent snapshot of
+    the database. Joins an already open transaction on this thread.
+    """
+    conn = get_connection(db_path)
+    owns_transaction = not conn.in_transaction
+    if owns_transaction:
+        conn.execute("BEGIN")
+    try:
+        yield conn.cursor()
+    finally:
+        if owns_transaction:
+            conn.commit()
+
+
+def checkpoint(db_path=DATABASE_PATH):
+    """Folds the WAL file back into the main database file."""
+    get_connection(db_path).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def close_all_connections():
+    """
+    Closes every pooled connection in every thread. Threads transparently
+    reconnect on their next get_connection() call.
+    """
+    global _generation
+    with _registry_lock:
+        for conn in _open_connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _open_connections.clear()
+        _generation += 1
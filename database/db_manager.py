@@ -2,162 +2,66 @@ import sqlite3
 import shutil
 import os
 from config import DATABASE_PATH
-
-def create_tables():
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS works (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            description TEXT
-        )
-    """)
-
-    # Add new columns if they don't exist
-    columns_to_add = {
-        "justification": "TEXT",
-        "section": "TEXT",
-        "work_type": "TEXT",
-        "file_no": "TEXT",
-        "estimate_no": "TEXT",
-        "tender_cost": "REAL",
-        "tender_opening_date": "TEXT",
-        "loa_no": "TEXT",
-        "loa_date": "TEXT",
-        "work_commence_date": "TEXT",
-        "admin_approval_office_note_no": "TEXT",
-        "admin_approval_date": "TEXT",
-        "work_type_category": "TEXT",
-        "work_type_subcategory": "TEXT",
-        "concurrence_letter_no": "TEXT",
-        "concurrence_letter_dated": "TEXT",
-        "dr_dfm_eoffice_note_no": "TEXT",
-        "computer_no": "TEXT"
-    }
-
-    for column, col_type in columns_to_add.items():
-        try:
-            cursor.execute(f"ALTER TABLE works ADD COLUMN {column} {col_type}")
-        except sqlite3.OperationalError as e:
-            if "duplicate column name" not in str(e):
-                raise
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS schedule_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            work_id INTEGER,
-            parent_item_id INTEGER,
-            item_name TEXT NOT NULL,
-            quantity REAL NOT NULL,
-            unit TEXT NOT NULL,
-            FOREIGN KEY (work_id) REFERENCES works(id),
-            FOREIGN KEY (parent_item_id) REFERENCES schedule_items(id)
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS firm_rates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            schedule_item_id INTEGER,
-            firm_name TEXT NOT NULL,
-            unit_rate REAL NOT NULL,
-            labour_rate REAL,
-            date_recorded TEXT NOT NULL,
-            FOREIGN KEY (schedule_item_id) REFERENCES schedule_items(id),
-            UNIQUE(schedule_item_id, firm_name)
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS template_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            template_name TEXT NOT NULL,
-            placeholder_name TEXT NOT NULL,
-            value TEXT,
-            timestamp TEXT NOT NULL,
-            UNIQUE(template_name, placeholder_name)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS schedule_item_variations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            schedule_item_id INTEGER,
-            variation_name TEXT NOT NULL,
-            quantity REAL NOT NULL,
-            FOREIGN KEY (schedule_item_id) REFERENCES schedule_items(id),
-            UNIQUE(schedule_item_id, variation_name)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS firm_documents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            work_id INTEGER,
-            firm_name TEXT NOT NULL,
-            pg_no TEXT,
-            pg_amount REAL,
-            bank_name TEXT,
-            bank_address TEXT,
-            firm_address TEXT,
-            indemnity_bond_details TEXT,
-            other_docs_details TEXT,
-            submission_date TEXT,
-            pg_submitted INTEGER,
-            indemnity_bond_submitted INTEGER,
-            pg_type TEXT,
-            pg_vetted_on TEXT,
-            ib_vetted_on TEXT,
-            FOREIGN KEY (work_id) REFERENCES works(id)
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+from database.connection import checkpoint, close_all_connections, get_connection, read_transaction, transaction
+from database.migrations import apply_migrations
+from database.schema_registry import invalidate_schema
+
+def create_tables(db_path=None):
+    """
+    Creates or upgrades the schema through the versioned migrations in
+    database/migrations.py. On an up-to-date database this is a single
+    PRAGMA user_version read.
+    """
+    apply_migrations(db_path)
 
 def add_work(name, description, justification=None, section=None, work_type=None, file_no=None, estimate_no=None, tender_cost=None, tender_opening_date=None, loa_no=None, loa_date=None, work_commence_date=None, admin_approval_office_note_no=None, admin_approval_date=None, work_type_category=None, work_type_subcategory=None, concurrence_letter_no=None, concurrence_letter_dated=None, dr_dfm_eoffice_note_no=None, computer_no=None):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     try:
-        cursor.execute("INSERT INTO works (name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date, admin_approval_office_note_no, admin_approval_date, work_type_category, work_type_subcategory, concurrence_letter_no, concurrence_letter_dated, dr_dfm_eoffice_note_no, computer_no) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date, admin_approval_office_note_no, admin_approval_date, work_type_category, work_type_subcategory, concurrence_letter_no, concurrence_letter_dated, dr_dfm_eoffice_note_no, computer_no))
-        work_id = cursor.lastrowid
-        conn.commit()
-        return work_id
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("INSERT INTO works (name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date, admin_approval_office_note_no, admin_approval_date, work_type_category, work_type_subcategory, concurrence_letter_no, concurrence_letter_dated, dr_dfm_eoffice_note_no, computer_no) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date, admin_approval_office_note_no, admin_approval_date, work_type_category, work_type_subcategory, concurrence_letter_no, concurrence_letter_dated, dr_dfm_eoffice_note_no, computer_no))
+            work_id = cursor.lastrowid
+            return work_id
     except sqlite3.IntegrityError:
         return None
-    finally:
-        conn.close()
+
+def add_works_bulk(works):
+    """
+    Inserts many works with one executemany in a single transaction. Each work
+    is a dict keyed by add_work's argument names; missing keys are stored as
+    NULL. Raises sqlite3.IntegrityError (and inserts nothing) if a name
+    already exists. Returns the number of works inserted.
+    """
+    if not works:
+        return 0
+    columns = ["name", "description", "justification", "section", "work_type", "file_no", "estimate_no", "tender_cost", "tender_opening_date", "loa_no", "loa_date", "work_commence_date", "admin_approval_office_note_no", "admin_approval_date", "work_type_category", "work_type_subcategory", "concurrence_letter_no", "concurrence_letter_dated", "dr_dfm_eoffice_note_no", "computer_no"]
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.executemany(
+            f"INSERT INTO works ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [tuple(work.get(column) for column in columns) for work in works]
+        )
+    return len(works)
 
 def update_work(work_id, name, description, justification=None, section=None, work_type=None, file_no=None, estimate_no=None, tender_cost=None, tender_opening_date=None, loa_no=None, loa_date=None, work_commence_date=None, admin_approval_office_note_no=None, admin_approval_date=None, work_type_category=None, work_type_subcategory=None, concurrence_letter_no=None, concurrence_letter_dated=None, dr_dfm_eoffice_note_no=None, computer_no=None):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     try:
-        cursor.execute("UPDATE works SET name = ?, description = ?, justification = ?, section = ?, work_type = ?, file_no = ?, estimate_no = ?, tender_cost = ?, tender_opening_date = ?, loa_no = ?, loa_date = ?, work_commence_date = ?, admin_approval_office_note_no = ?, admin_approval_date = ?, work_type_category = ?, work_type_subcategory = ?, concurrence_letter_no = ?, concurrence_letter_dated = ?, dr_dfm_eoffice_note_no = ?, computer_no = ? WHERE id = ?", (name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date, admin_approval_office_note_no, admin_approval_date, work_type_category, work_type_subcategory, concurrence_letter_no, concurrence_letter_dated, dr_dfm_eoffice_note_no, computer_no, work_id))
-        conn.commit()
-        return cursor.rowcount > 0
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("UPDATE works SET name = ?, description = ?, justification = ?, section = ?, work_type = ?, file_no = ?, estimate_no = ?, tender_cost = ?, tender_opening_date = ?, loa_no = ?, loa_date = ?, work_commence_date = ?, admin_approval_office_note_no = ?, admin_approval_date = ?, work_type_category = ?, work_type_subcategory = ?, concurrence_letter_no = ?, concurrence_letter_dated = ?, dr_dfm_eoffice_note_no = ?, computer_no = ? WHERE id = ?", (name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date, admin_approval_office_note_no, admin_approval_date, work_type_category, work_type_subcategory, concurrence_letter_no, concurrence_letter_dated, dr_dfm_eoffice_note_no, computer_no, work_id))
+            return cursor.rowcount > 0
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 def get_work_by_id(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date, admin_approval_office_note_no, admin_approval_date, work_type_category, work_type_subcategory, concurrence_letter_no, concurrence_letter_dated, dr_dfm_eoffice_note_no, computer_no FROM works WHERE id = ?", (work_id,))
     work = cursor.fetchone()
-    conn.close()
     return {'work_id': work[0], 'work_name': work[1], 'description': work[2], 'justification': work[3], 'section': work[4], 'work_type': work[5], 'file_no': work[6], 'estimate_no': work[7], 'tender_cost': work[8], 'tender_opening_date': work[9], 'loa_no': work[10], 'loa_date': work[11], 'work_commence_date': work[12], 'admin_approval_office_note_no': work[13], 'admin_approval_date': work[14], 'work_type_category': work[15], 'work_type_subcategory': work[16], 'concurrence_letter_no': work[17], 'concurrence_letter_dated': work[18], 'dr_dfm_eoffice_note_no': work[19], 'computer_no': work[20]} if work else None
 
 def get_work_by_id_all_columns(work_id):
     """Get work by ID using SELECT * to fetch all columns dynamically."""
     from database.managers.database_utils import get_work_columns
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM works WHERE id = ?", (work_id,))
     work = cursor.fetchone()
-    conn.close()
     if work:
         columns = get_work_columns()
         return dict(zip(columns, work))
@@ -166,238 +70,254 @@ def get_work_by_id_all_columns(work_id):
 def get_firm_documents_all_columns(work_id):
     """Get firm documents using SELECT * to fetch all columns dynamically."""
     from database.managers.database_utils import get_firm_documents_columns
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM firm_documents WHERE work_id = ?", (work_id,))
     documents = cursor.fetchall()
-    conn.close()
     if documents:
         columns = get_firm_documents_columns()
         return [dict(zip(columns, doc)) for doc in documents]
     return []
 
 def get_works():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date FROM works")
     works = cursor.fetchall()
-    conn.close()
     return [(w[0], w[1], w[2], w[3], w[4], w[5], w[6], w[7], w[8], w[9], w[10], w[11], w[12]) for w in works]
 
 def get_works_by_name(search_term):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, name, description, justification, section, work_type, file_no, estimate_no, tender_cost, tender_opening_date, loa_no, loa_date, work_commence_date FROM works WHERE name LIKE ?", ('%' + search_term + '%',))
     works = cursor.fetchall()
-    conn.close()
     return [(w[0], w[1], w[2], w[3], w[4], w[5], w[6], w[7], w[8], w[9], w[10], w[11], w[12]) for w in works]
 
 def delete_work(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     try:
-        cursor.execute("DELETE FROM schedule_item_variations WHERE schedule_item_id IN (SELECT id FROM schedule_items WHERE work_id = ?)", (work_id,))
-        cursor.execute("DELETE FROM firm_rates WHERE schedule_item_id IN (SELECT id FROM schedule_items WHERE work_id = ?)", (work_id,))
-        cursor.execute("DELETE FROM schedule_items WHERE work_id = ?", (work_id,))
-        cursor.execute("DELETE FROM works WHERE id = ?", (work_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("DELETE FROM schedule_item_variations WHERE schedule_item_id IN (SELECT id FROM schedule_items WHERE work_id = ?)", (work_id,))
+            cursor.execute("DELETE FROM firm_rates WHERE schedule_item_id IN (SELECT id FROM schedule_items WHERE work_id = ?)", (work_id,))
+            cursor.execute("DELETE FROM schedule_items WHERE work_id = ?", (work_id,))
+            cursor.execute("DELETE FROM works WHERE id = ?", (work_id,))
+            return cursor.rowcount > 0
     except sqlite3.Error as e:
         print(f"Database error during delete_work: {e}")
-        conn.rollback()
         return False
-    finally:
-        conn.close()
 
 def add_schedule_item(work_id, item_name, unit, quantity, parent_item_id=None):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO schedule_items (work_id, parent_item_id, item_name, quantity, unit) VALUES (?, ?, ?, ?, ?)",
-        (work_id, parent_item_id, item_name, quantity, unit)
-    )
-    item_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return item_id
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute(
+            "INSERT INTO schedule_items (work_id, parent_item_id, item_name, quantity, unit) VALUES (?, ?, ?, ?, ?)",
+            (work_id, parent_item_id, item_name, quantity, unit)
+        )
+        item_id = cursor.lastrowid
+        return item_id
+
+def add_schedule_items_bulk(work_id, items):
+    """
+    Inserts a batch of schedule items in one transaction and returns their new
+    ids in input order. Each item is a dict with item_name, unit, quantity and
+    optionally parent_item_id (an existing item) or parent_index (position of
+    the parent within items), so a whole tree goes in with one executemany.
+    """
+    if not items:
+        return []
+    with transaction(DATABASE_PATH) as cursor:
+        # Take the write lock before reserving ids so no other writer can
+        # claim them between the read below and the insert.
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'schedule_items'), 0),
+                       COALESCE((SELECT MAX(id) FROM schedule_items), 0))
+        """)
+        first_id = cursor.fetchone()[0] + 1
+        item_ids = list(range(first_id, first_id + len(items)))
+        rows = []
+        for item_id, item in zip(item_ids, items):
+            parent_index = item.get('parent_index')
+            parent_item_id = item_ids[parent_index] if parent_index is not None else item.get('parent_item_id')
+            rows.append((item_id, work_id, parent_item_id, item['item_name'], item['quantity'], item['unit']))
+        cursor.executemany(
+            "INSERT INTO schedule_items (id, work_id, parent_item_id, item_name, quantity, unit) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    return item_ids
 
 def update_schedule_item(item_id, item_name, unit, quantity, parent_item_id):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE schedule_items SET item_name = ?, unit = ?, quantity = ?, parent_item_id = ? WHERE id = ?",
-        (item_name, unit, quantity, parent_item_id, item_id)
-    )
-    conn.commit()
-    conn.close()
-    return cursor.rowcount > 0
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute(
+            "UPDATE schedule_items SET item_name = ?, unit = ?, quantity = ?, parent_item_id = ? WHERE id = ?",
+            (item_name, unit, quantity, parent_item_id, item_id)
+        )
+        return cursor.rowcount > 0
 
 def get_schedule_items(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, parent_item_id, item_name, quantity, unit FROM schedule_items WHERE work_id = ?", (work_id,))
     items = cursor.fetchall()
-    conn.close()
     return [{'item_id': i[0], 'parent_item_id': i[1], 'item_name': i[2], 'quantity': i[3], 'unit': i[4]} for i in items]
 
 def get_schedule_item_by_id(item_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, parent_item_id, item_name, quantity, unit FROM schedule_items WHERE id = ?", (item_id,))
     item = cursor.fetchone()
-    conn.close()
     return {'item_id': item[0], 'parent_item_id': item[1], 'item_name': item[2], 'quantity': item[3], 'unit': item[4]} if item else None
 
 def delete_schedule_item(item_id):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM schedule_item_variations WHERE schedule_item_id = ?", (item_id,))
-    cursor.execute("DELETE FROM firm_rates WHERE schedule_item_id = ?", (item_id,))
-    cursor.execute("DELETE FROM schedule_items WHERE parent_item_id = ?", (item_id,))
-    cursor.execute("DELETE FROM schedule_items WHERE id = ?", (item_id,))
-    conn.commit()
-    conn.close()
-    return cursor.rowcount > 0
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute("DELETE FROM schedule_item_variations WHERE schedule_item_id = ?", (item_id,))
+        cursor.execute("DELETE FROM firm_rates WHERE schedule_item_id = ?", (item_id,))
+        cursor.execute("DELETE FROM schedule_items WHERE parent_item_id = ?", (item_id,))
+        cursor.execute("DELETE FROM schedule_items WHERE id = ?", (item_id,))
+        return cursor.rowcount > 0
 
 def upsert_firm_rate(schedule_item_id, firm_name, unit_rate, labour_rate=None):
     from datetime import datetime
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    date_recorded = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    try:
-        cursor.execute(
-            "INSERT INTO firm_rates (schedule_item_id, firm_name, unit_rate, labour_rate, date_recorded) VALUES (?, ?, ?, ?, ?)",
-            (schedule_item_id, firm_name, unit_rate, labour_rate, date_recorded)
-        )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        cursor.execute(
-            "UPDATE firm_rates SET unit_rate = ?, labour_rate = ?, date_recorded = ? WHERE schedule_item_id = ? AND firm_name = ?",
-            (unit_rate, labour_rate, date_recorded, schedule_item_id, firm_name)
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+    with transaction(DATABASE_PATH) as cursor:
+        date_recorded = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            cursor.execute(
+                "INSERT INTO firm_rates (schedule_item_id, firm_name, unit_rate, labour_rate, date_recorded) VALUES (?, ?, ?, ?, ?)",
+                (schedule_item_id, firm_name, unit_rate, labour_rate, date_recorded)
+            )
+            return True
+        except sqlite3.IntegrityError:
+            cursor.execute(
+                "UPDATE firm_rates SET unit_rate = ?, labour_rate = ?, date_recorded = ? WHERE schedule_item_id = ? AND firm_name = ?",
+                (unit_rate, labour_rate, date_recorded, schedule_item_id, firm_name)
+            )
+            return cursor.rowcount > 0
 
 def get_firm_rates(schedule_item_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute(
         "SELECT id, firm_name, unit_rate, labour_rate, date_recorded FROM firm_rates WHERE schedule_item_id = ?",
         (schedule_item_id,)
     )
     rates = cursor.fetchall()
-    conn.close()
     return [{'rate_id': r[0], 'firm_name': r[1], 'unit_rate': r[2], 'labour_rate': r[3], 'date_recorded': r[4]} for r in rates]
 
 def get_firm_rate_by_id(rate_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute(
         "SELECT id, schedule_item_id, firm_name, unit_rate, date_recorded FROM firm_rates WHERE id = ?",
         (rate_id,)
     )
     rate = cursor.fetchone()
-    conn.close()
     return {'rate_id': rate[0], 'schedule_item_id': rate[1], 'firm_name': rate[2], 'unit_rate': rate[3], 'date_recorded': rate[4]} if rate else None
 
 def get_firm_rate_for_item(schedule_item_id, firm_name):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute(
         "SELECT id, schedule_item_id, firm_name, unit_rate, labour_rate, date_recorded FROM firm_rates WHERE schedule_item_id = ? AND firm_name = ?",
         (schedule_item_id, firm_name)
     )
     rate = cursor.fetchone()
-    conn.close()
     if rate:
         return {'rate_id': rate[0], 'schedule_item_id': rate[1], 'firm_name': rate[2], 'rate': rate[3], 'labour_rate': rate[4], 'date_recorded': rate[5]}
     return None
 
+def get_firm_rates_for_work(work_id, firm_name):
+    """
+    Returns {schedule_item_id: rate} for every item of the work that has a rate
+    from firm_name, where each rate has the same shape as get_firm_rate_for_item.
+    """
+    conn = get_connection(DATABASE_PATH)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT fr.id, fr.schedule_item_id, fr.firm_name, fr.unit_rate, fr.labour_rate, fr.date_recorded
+        FROM firm_rates fr
+        JOIN schedule_items si ON fr.schedule_item_id = si.id
+        WHERE si.work_id = ? AND fr.firm_name = ?
+    """, (work_id, firm_name))
+    rates = cursor.fetchall()
+    return {r[1]: {'rate_id': r[0], 'schedule_item_id': r[1], 'firm_name': r[2], 'rate': r[3], 'labour_rate': r[4], 'date_recorded': r[5]} for r in rates}
+
+def get_work_firm_rate_rows(work_id):
+    """Returns every firm rate of the work's schedule items, in entry order, from one JOIN."""
+    conn = get_connection(DATABASE_PATH)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT fr.schedule_item_id, fr.firm_name, fr.unit_rate, fr.labour_rate
+        FROM firm_rates fr
+        JOIN schedule_items si ON fr.schedule_item_id = si.id
+        WHERE si.work_id = ?
+        ORDER BY fr.id
+    """, (work_id,))
+    rates = cursor.fetchall()
+    return [{'schedule_item_id': r[0], 'firm_name': r[1], 'unit_rate': r[2], 'labour_rate': r[3]} for r in rates]
+
 def update_firm_rate(rate_id, firm_name, unit_rate):
     from datetime import datetime
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    date_recorded = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute(
-        "UPDATE firm_rates SET unit_rate = ?, date_recorded = ? WHERE id = ?",
-        (unit_rate, date_recorded, rate_id)
-    )
-    conn.commit()
-    conn.close()
-    return cursor.rowcount > 0
+    with transaction(DATABASE_PATH) as cursor:
+        date_recorded = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute(
+            "UPDATE firm_rates SET unit_rate = ?, date_recorded = ? WHERE id = ?",
+            (unit_rate, date_recorded, rate_id)
+        )
+        return cursor.rowcount > 0
 
 def delete_firm_rate(rate_id):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM firm_rates WHERE id = ?", (rate_id,))
-    conn.commit()
-    conn.close()
-    return cursor.rowcount > 0
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute("DELETE FROM firm_rates WHERE id = ?", (rate_id,))
+        return cursor.rowcount > 0
 
 def delete_firm_rate_by_item_and_firm(schedule_item_id, firm_name):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM firm_rates WHERE schedule_item_id = ? AND firm_name = ?", (schedule_item_id, firm_name))
-    conn.commit()
-    conn.close()
-    return cursor.rowcount > 0
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute("DELETE FROM firm_rates WHERE schedule_item_id = ? AND firm_name = ?", (schedule_item_id, firm_name))
+        return cursor.rowcount > 0
 
 def add_firm_document(work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            INSERT INTO firm_documents (
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("""
+                INSERT INTO firm_documents (
+                    work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, 
+                    indemnity_bond_details, other_docs_details, submission_date, pg_submitted, 
+                    indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
                 work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, 
                 indemnity_bond_details, other_docs_details, submission_date, pg_submitted, 
                 indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, 
-            indemnity_bond_details, other_docs_details, submission_date, pg_submitted, 
-            indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on
-        ))
-        conn.commit()
-        return cursor.lastrowid
+            ))
+            return cursor.lastrowid
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         return None
-    finally:
-        conn.close()
 
 def update_firm_document(doc_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            UPDATE firm_documents SET
-                firm_name = ?, pg_no = ?, pg_amount = ?, bank_name = ?, bank_address = ?, 
-                indemnity_bond_details = ?, other_docs_details = ?, 
-                submission_date = ?, pg_submitted = ?, indemnity_bond_submitted = ?, 
-                pg_type = ?, pg_vetted_on = ?, ib_vetted_on = ?
-            WHERE id = ?
-        """, (
-            firm_name, pg_no, pg_amount, bank_name, bank_address, 
-            indemnity_bond_details, other_docs_details, submission_date, pg_submitted, 
-            indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, doc_id
-        ))
-        conn.commit()
-        return cursor.rowcount > 0
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("""
+                UPDATE firm_documents SET
+                    firm_name = ?, pg_no = ?, pg_amount = ?, bank_name = ?, bank_address = ?, 
+                    indemnity_bond_details = ?, other_docs_details = ?, 
+                    submission_date = ?, pg_submitted = ?, indemnity_bond_submitted = ?, 
+                    pg_type = ?, pg_vetted_on = ?, ib_vetted_on = ?
+                WHERE id = ?
+            """, (
+                firm_name, pg_no, pg_amount, bank_name, bank_address, 
+                indemnity_bond_details, other_docs_details, submission_date, pg_submitted, 
+                indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, doc_id
+            ))
+            return cursor.rowcount > 0
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_all_registered_firm_names():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT name FROM firms")
     firms = cursor.fetchall()
-    conn.close()
     return [f[0] for f in firms]
 
 
@@ -405,7 +325,7 @@ def get_all_registered_firm_names():
 
 
 def get_unique_firm_names_by_work_id(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT DISTINCT fr.firm_name
@@ -414,144 +334,160 @@ def get_unique_firm_names_by_work_id(work_id):
         WHERE si.work_id = ?
     """, (work_id,))
     firms = cursor.fetchall()
-    conn.close()
     return [f[0] for f in firms]
 
 def get_all_unique_units():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT unit FROM schedule_items")
     units = cursor.fetchall()
-    conn.close()
     return [u[0] for u in units]
 
 def get_all_unique_sections():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT section FROM works WHERE section IS NOT NULL AND section != ''")
     sections = cursor.fetchall()
-    conn.close()
     return [s[0] for s in sections]
 
 def get_all_unique_file_numbers():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT file_no FROM works WHERE file_no IS NOT NULL AND file_no != ''")
     file_numbers = cursor.fetchall()
-    conn.close()
     return [fn[0] for fn in file_numbers]
 
 def get_all_unique_estimate_numbers():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT estimate_no FROM works WHERE estimate_no IS NOT NULL AND estimate_no != ''")
     estimate_numbers = cursor.fetchall()
-    conn.close()
     return [en[0] for en in estimate_numbers]
 
 def get_all_unique_loa_numbers():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT DISTINCT loa_no FROM works WHERE loa_no IS NOT NULL AND loa_no != ''")
     loa_numbers = cursor.fetchall()
-    conn.close()
     return [ln[0] for ln in loa_numbers]
 
 
 def upsert_template_data(template_name, placeholder_name, value):
     from datetime import datetime
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    try:
-        cursor.execute(
-            "INSERT INTO template_data (template_name, placeholder_name, value, timestamp) VALUES (?, ?, ?, ?)",
-            (template_name, placeholder_name, value, timestamp)
-        )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        cursor.execute(
-            "UPDATE template_data SET value = ?, timestamp = ? WHERE template_name = ? AND placeholder_name = ?",
-            (value, timestamp, template_name, placeholder_name)
-        )
-        conn.commit()
+    with transaction(DATABASE_PATH) as cursor:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute("""
+            INSERT INTO template_data (template_name, placeholder_name, value, timestamp) VALUES (?, ?, ?, ?)
+            ON CONFLICT(template_name, placeholder_name) DO UPDATE SET value = excluded.value, timestamp = excluded.timestamp
+        """, (template_name, placeholder_name, value, timestamp))
         return cursor.rowcount > 0
-    finally:
-        conn.close()
 
 def get_template_data(template_name):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT placeholder_name, value FROM template_data WHERE template_name = ?", (template_name,))
     data = cursor.fetchall()
-    conn.close()
     return {d[0]: d[1] for d in data}
 
-def add_schedule_item_variation(schedule_item_id, variation_name, quantity):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    try:
+def save_template_inputs(template_name, values):
+    """
+    Saves the entered placeholder values of a template as its current values
+    and adds new ones to the input history, all in one transaction. Only the
+    placeholders whose value changed are written. Returns that number.
+    """
+    from datetime import datetime
+    values = {name: None if value is None else str(value) for name, value in values.items()}
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute("SELECT placeholder_name, value FROM template_data WHERE template_name = ?", (template_name,))
+        current = dict(cursor.fetchall())
+        changed = [(name, value) for name, value in values.items() if name not in current or current[name] != value]
+        if not changed:
+            return 0
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.executemany("""
+            INSERT INTO template_data (template_name, placeholder_name, value, timestamp) VALUES (?, ?, ?, ?)
+            ON CONFLICT(template_name, placeholder_name) DO UPDATE SET value = excluded.value, timestamp = excluded.timestamp
+        """, [(template_name, name, value, timestamp) for name, value in changed])
+        cursor.executemany("""
+            INSERT INTO template_input_history (template_name, placeholder_name, value) VALUES (?, ?, ?)
+            ON CONFLICT DO NOTHING
+        """, [(template_name, name, value) for name, value in changed if value is not None])
+    return len(changed)
+
+def get_template_inputs(template_name):
+    """
+    Returns {placeholder_name: {"current": value, "history": [values]}} for a
+    template, history in the order the values were first entered.
+    """
+    with read_transaction(DATABASE_PATH) as cursor:
+        cursor.execute("SELECT placeholder_name, value FROM template_data WHERE template_name = ?", (template_name,))
+        inputs = {name: {"current": value, "history": []} for name, value in cursor.fetchall()}
         cursor.execute(
-            "INSERT INTO schedule_item_variations (schedule_item_id, variation_name, quantity) VALUES (?, ?, ?)",
-            (schedule_item_id, str(variation_name), quantity)
+            "SELECT placeholder_name, value FROM template_input_history WHERE template_name = ? ORDER BY rowid",
+            (template_name,)
         )
-        conn.commit()
-        return cursor.lastrowid
-    except sqlite3.IntegrityError:
-        # If it already exists, update it instead of failing
+        for name, value in cursor.fetchall():
+            inputs.setdefault(name, {"current": None, "history": []})["history"].append(value)
+    return inputs
+
+def get_template_input_history(template_name, placeholder_name):
+    conn = get_connection(DATABASE_PATH)
+    cursor = conn.execute(
+        "SELECT value FROM template_input_history WHERE template_name = ? AND placeholder_name = ? ORDER BY rowid",
+        (template_name, placeholder_name)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+def add_schedule_item_variation(schedule_item_id, variation_name, quantity):
+    with transaction(DATABASE_PATH) as cursor:
+        try:
+            cursor.execute(
+                "INSERT INTO schedule_item_variations (schedule_item_id, variation_name, quantity) VALUES (?, ?, ?)",
+                (schedule_item_id, str(variation_name), quantity)
+            )
+            return cursor.lastrowid
+        except sqlite3.IntegrityError:
+            # If it already exists, update it instead of failing
+            cursor.execute(
+                "UPDATE schedule_item_variations SET quantity = ? WHERE schedule_item_id = ? AND variation_name = ?",
+                (quantity, schedule_item_id, str(variation_name))
+            )
+            return cursor.rowcount > 0
+
+def update_schedule_item_variation(schedule_item_id, variation_name, quantity):
+    with transaction(DATABASE_PATH) as cursor:
         cursor.execute(
             "UPDATE schedule_item_variations SET quantity = ? WHERE schedule_item_id = ? AND variation_name = ?",
             (quantity, schedule_item_id, str(variation_name))
         )
-        conn.commit()
         return cursor.rowcount > 0
-    finally:
-        conn.close()
-
-def update_schedule_item_variation(schedule_item_id, variation_name, quantity):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE schedule_item_variations SET quantity = ? WHERE schedule_item_id = ? AND variation_name = ?",
-        (quantity, schedule_item_id, str(variation_name))
-    )
-    conn.commit()
-    conn.close()
-    return cursor.rowcount > 0
 
 def get_schedule_item_variations(schedule_item_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute(
         "SELECT variation_name, quantity FROM schedule_item_variations WHERE schedule_item_id = ?",
         (schedule_item_id,)
     )
     variations = cursor.fetchall()
-    conn.close()
     return {v[0]: v[1] for v in variations}
 
 def delete_variation_by_name(work_id, variation_name):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            DELETE FROM schedule_item_variations
-            WHERE variation_name = ? AND schedule_item_id IN (
-                SELECT id FROM schedule_items WHERE work_id = ?
-            )
-        """, (variation_name, work_id))
-        conn.commit()
-        return cursor.rowcount > 0
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("""
+                DELETE FROM schedule_item_variations
+                WHERE variation_name = ? AND schedule_item_id IN (
+                    SELECT id FROM schedule_items WHERE work_id = ?
+                )
+            """, (variation_name, work_id))
+            return cursor.rowcount > 0
     except sqlite3.Error as e:
         print(f"Database error during delete_variation_by_name: {e}")
-        conn.rollback()
         return False
-    finally:
-        conn.close()
 
 def get_variation_names_for_work(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT DISTINCT siv.variation_name
@@ -560,23 +496,79 @@ def get_variation_names_for_work(work_id):
         WHERE si.work_id = ?
     """, (work_id,))
     variation_names = cursor.fetchall()
-    conn.close()
     return [v[0] for v in variation_names]
 
+def get_work_schedule_snapshot(work_id):
+    """
+    Loads every schedule item of a work together with all firm rates and
+    variations in three set-based queries and groups the items into the
+    parent/child tree.
+
+    Returns a dict with:
+        'items': {item_id: item} for every item; each item carries
+                 'children' (sorted by name), 'firm_rates' (list, same shape
+                 as get_firm_rates) and 'variations' ({name: quantity}).
+        'root_items': top-level items sorted by name.
+        'variation_names': variation names of the work in creation order.
+    """
+    with read_transaction(DATABASE_PATH) as cursor:
+        cursor.execute(
+            "SELECT id, parent_item_id, item_name, quantity, unit FROM schedule_items WHERE work_id = ?",
+            (work_id,)
+        )
+        items = {
+            i[0]: {'item_id': i[0], 'parent_item_id': i[1], 'item_name': i[2], 'quantity': i[3], 'unit': i[4],
+                   'children': [], 'firm_rates': [], 'variations': {}, 'level': 0}
+            for i in cursor.fetchall()
+        }
+
+        cursor.execute("""
+            SELECT fr.schedule_item_id, fr.id, fr.firm_name, fr.unit_rate, fr.labour_rate, fr.date_recorded
+            FROM firm_rates fr
+            JOIN schedule_items si ON fr.schedule_item_id = si.id
+            WHERE si.work_id = ?
+            ORDER BY fr.id
+        """, (work_id,))
+        for r in cursor.fetchall():
+            items[r[0]]['firm_rates'].append({'rate_id': r[1], 'firm_name': r[2], 'unit_rate': r[3], 'labour_rate': r[4], 'date_recorded': r[5]})
+
+        cursor.execute("""
+            SELECT siv.schedule_item_id, siv.variation_name, siv.quantity
+            FROM schedule_item_variations siv
+            JOIN schedule_items si ON siv.schedule_item_id = si.id
+            WHERE si.work_id = ?
+            ORDER BY siv.id
+        """, (work_id,))
+        variation_names = {}
+        for v in cursor.fetchall():
+            items[v[0]]['variations'][v[1]] = v[2]
+            variation_names.setdefault(v[1], None)
+
+    root_items = []
+    for item in items.values():
+        parent_id = item['parent_item_id']
+        if parent_id is not None and parent_id in items:
+            items[parent_id]['children'].append(item)
+        elif parent_id is None:
+            root_items.append(item)
+    for item in items.values():
+        item['children'].sort(key=lambda x: x['item_name'])
+    root_items.sort(key=lambda x: x['item_name'])
+
+    return {'items': items, 'root_items': root_items, 'variation_names': list(variation_names)}
+
 def get_firm_documents(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on FROM firm_documents WHERE work_id = ?", (work_id,))
     documents = cursor.fetchall()
-    conn.close()
     return documents
 
 def get_firm_document_by_work_and_firm_name(work_id, firm_name):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on FROM firm_documents WHERE work_id = ? AND firm_name = ?", (work_id, firm_name))
     document = cursor.fetchone()
-    conn.close()
     if document:
         return {
             'id': document[0],
@@ -599,6 +591,9 @@ def get_firm_document_by_work_and_firm_name(work_id, firm_name):
 
 def backup_database(destination_path):
     try:
+        # Pooled connections run in WAL mode; fold pending pages into the main
+        # file so the copy is complete.
+        checkpoint(DATABASE_PATH)
         shutil.copy2(DATABASE_PATH, destination_path)
         return True, f"Database backed up successfully to {destination_path}"
     except Exception as e:
@@ -608,8 +603,12 @@ def restore_database(source_path):
     try:
         # Close any existing connections to the database before restoring
         # This is crucial to avoid database locking issues on Windows
-        # For simplicity, we'll assume the main application handles closing its connection
-        # before calling this function, or that the application is restarted after restore.
+        close_all_connections()
+        invalidate_schema(DATABASE_PATH)
+        # A stale WAL from the old database must not be replayed onto the restored file.
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(DATABASE_PATH + suffix):
+                os.remove(DATABASE_PATH + suffix)
         shutil.copy2(source_path, DATABASE_PATH)
         return True, f"Database restored successfully from {source_path}"
     except Exception as e:
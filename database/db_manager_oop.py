@@ -1,6 +1,6 @@
-
 import sqlite3
 from config import DATABASE_PATH
+from database.connection import get_connection
 
 class DBManager:
     def __init__(self, db_path=DATABASE_PATH):
@@ -8,9 +8,10 @@ class DBManager:
         self.conn = None
 
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
-        return self.conn.cursor()
+        self.conn = get_connection(self.db_path)
+        cursor = self.conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        return cursor
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.conn:
@@ -18,7 +19,6 @@ class DBManager:
                 self.conn.commit()
             else:
                 self.conn.rollback()
-            self.conn.close()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_connection(self.db_path)
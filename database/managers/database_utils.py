@@ -1,10 +1,14 @@
-import sqlite3
 import shutil
 import os
 from config import DATABASE_PATH
+from database.connection import checkpoint, close_all_connections
+from database.schema_registry import get_column_names, invalidate_schema
 
 def backup_database(destination_path):
     try:
+        # Pooled connections run in WAL mode; fold pending pages into the main
+        # file so the copy is complete.
+        checkpoint(DATABASE_PATH)
         shutil.copy2(DATABASE_PATH, destination_path)
         return True, f"Database backed up successfully to {destination_path}"
     except Exception as e:
@@ -14,24 +18,20 @@ def restore_database(source_path):
     try:
         # Close any existing connections to the database before restoring
         # This is crucial to avoid database locking issues on Windows
-        # For simplicity, we'll assume the main application handles closing its connection
-        # before calling this function, or that the application is restarted after restore.
+        close_all_connections()
+        invalidate_schema(DATABASE_PATH)
+        # A stale WAL from the old database must not be replayed onto the restored file.
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(DATABASE_PATH + suffix):
+                os.remove(DATABASE_PATH + suffix)
         shutil.copy2(source_path, DATABASE_PATH)
         return True, f"Database restored successfully from {source_path}"
     except Exception as e:
         return False, f"Error restoring database: {e}"
 
 def get_table_columns(table_name):
-    """Get list of column names for a specific table."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    try:
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
-        # Return list of column names (index 1 in the PRAGMA result)
-        return [col[1] for col in columns]
-    finally:
-        conn.close()
+    """Get list of column names for a specific table (cached by the schema registry)."""
+    return get_column_names(table_name, DATABASE_PATH)
 
 def get_work_columns():
     """Get list of column names for the works table."""
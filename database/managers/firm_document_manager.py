@@ -1,5 +1,6 @@
 import sqlite3
 from config import DATABASE_PATH
+from database.connection import get_connection, transaction
 
 def create_firm_documents_table(cursor):
     cursor.execute("""
@@ -45,57 +46,54 @@ def create_firm_documents_table(cursor):
                 raise
 
 def upsert_firm_document(data):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    with transaction(DATABASE_PATH) as cursor:
 
-    # Check if a record already exists
-    cursor.execute("SELECT id FROM firm_documents WHERE work_id = ? AND firm_name = ?", (data['work_id'], data['firm_name']))
-    existing_id = cursor.fetchone()
+        # Check if a record already exists
+        cursor.execute("SELECT id FROM firm_documents WHERE work_id = ? AND firm_name = ?", (data['work_id'], data['firm_name']))
+        existing_id = cursor.fetchone()
 
-    if existing_id:
-        # UPDATE existing record
-        query = """
-            UPDATE firm_documents SET
-                pg_type = ?, pg_no = ?, pg_amount = ?, pg_submitted_on = ?, pg_vetted_on = ?,
-                bank_name = ?, bank_address = ?, firm_address = ?, indemnity_bond_details = ?,
-                indemnity_submitted_on = ?, indemnity_vetted_on = ?, other_docs_details = ?,
-                ib_notarized_date = ?,
-                submission_date = ?, pg_submitted = ?, indemnity_bond_submitted = ?
-            WHERE id = ?
-        """
-        params = (
-            data.get('pg_type'), data.get('pg_no'), data.get('pg_amount'), data.get('pg_submitted_on'), data.get('pg_vetted_on'),
-            data.get('bank_name'), data.get('bank_address'), data.get('firm_address'), data.get('indemnity_bond_details'),
-            data.get('indemnity_submitted_on'), data.get('indemnity_vetted_on'), data.get('other_docs_details'),
-            data.get('ib_notarized_date'),
-            data.get('submission_date'), data.get('pg_submitted'), data.get('indemnity_bond_submitted'),
-            existing_id[0]
-        )
-    else:
-        # INSERT new record
-        query = """
-            INSERT INTO firm_documents (
-                work_id, firm_name, pg_type, pg_no, pg_amount, pg_submitted_on, pg_vetted_on,
-                bank_name, bank_address, firm_address, indemnity_bond_details,
-                indemnity_submitted_on, indemnity_vetted_on, other_docs_details,
-                ib_notarized_date,
-                submission_date, pg_submitted, indemnity_bond_submitted
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        params = (
-            data.get('work_id'), data.get('firm_name'), data.get('pg_type'), data.get('pg_no'), data.get('pg_amount'), data.get('pg_submitted_on'), data.get('pg_vetted_on'),
-            data.get('bank_name'), data.get('bank_address'), data.get('firm_address'), data.get('indemnity_bond_details'),
-            data.get('indemnity_submitted_on'), data.get('indemnity_vetted_on'), data.get('other_docs_details'),
-            data.get('ib_notarized_date'),
-            data.get('submission_date'), data.get('pg_submitted'), data.get('indemnity_bond_submitted')
-        )
+        if existing_id:
+            # UPDATE existing record
+            query = """
+                UPDATE firm_documents SET
+                    pg_type = ?, pg_no = ?, pg_amount = ?, pg_submitted_on = ?, pg_vetted_on = ?,
+                    bank_name = ?, bank_address = ?, firm_address = ?, indemnity_bond_details = ?,
+                    indemnity_submitted_on = ?, indemnity_vetted_on = ?, other_docs_details = ?,
+                    ib_notarized_date = ?,
+                    submission_date = ?, pg_submitted = ?, indemnity_bond_submitted = ?
+                WHERE id = ?
+            """
+            params = (
+                data.get('pg_type'), data.get('pg_no'), data.get('pg_amount'), data.get('pg_submitted_on'), data.get('pg_vetted_on'),
+                data.get('bank_name'), data.get('bank_address'), data.get('firm_address'), data.get('indemnity_bond_details'),
+                data.get('indemnity_submitted_on'), data.get('indemnity_vetted_on'), data.get('other_docs_details'),
+                data.get('ib_notarized_date'),
+                data.get('submission_date'), data.get('pg_submitted'), data.get('indemnity_bond_submitted'),
+                existing_id[0]
+            )
+        else:
+            # INSERT new record
+            query = """
+                INSERT INTO firm_documents (
+                    work_id, firm_name, pg_type, pg_no, pg_amount, pg_submitted_on, pg_vetted_on,
+                    bank_name, bank_address, firm_address, indemnity_bond_details,
+                    indemnity_submitted_on, indemnity_vetted_on, other_docs_details,
+                    ib_notarized_date,
+                    submission_date, pg_submitted, indemnity_bond_submitted
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """
+            params = (
+                data.get('work_id'), data.get('firm_name'), data.get('pg_type'), data.get('pg_no'), data.get('pg_amount'), data.get('pg_submitted_on'), data.get('pg_vetted_on'),
+                data.get('bank_name'), data.get('bank_address'), data.get('firm_address'), data.get('indemnity_bond_details'),
+                data.get('indemnity_submitted_on'), data.get('indemnity_vetted_on'), data.get('other_docs_details'),
+                data.get('ib_notarized_date'),
+                data.get('submission_date'), data.get('pg_submitted'), data.get('indemnity_bond_submitted')
+            )
     
-    cursor.execute(query, params)
-    conn.commit()
-    conn.close()
+        cursor.execute(query, params)
 
 def get_firm_documents(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, 
@@ -105,11 +103,10 @@ def get_firm_documents(work_id):
         FROM firm_documents WHERE work_id = ?
     """, (work_id,))
     documents = cursor.fetchall()
-    conn.close()
     return documents
 
 def get_firm_document_by_work_and_firm_name(work_id, firm_name):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, 
@@ -119,7 +116,6 @@ def get_firm_document_by_work_and_firm_name(work_id, firm_name):
         FROM firm_documents WHERE work_id = ? AND firm_name = ?
     """, (work_id, firm_name))
     document = cursor.fetchone()
-    conn.close()
     if document:
         return {
             'id': document[0],
@@ -145,9 +141,6 @@ def get_firm_document_by_work_and_firm_name(work_id, firm_name):
     return None
 
 def delete_firm_document(doc_id):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM firm_documents WHERE id = ?", (doc_id,))
-    conn.commit()
-    conn.close()
-    return cursor.rowcount > 0
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute("DELETE FROM firm_documents WHERE id = ?", (doc_id,))
+        return cursor.rowcount > 0
@@ -1,5 +1,6 @@
 import sqlite3
 from config import DATABASE_PATH
+from database.connection import get_connection, transaction
 
 def create_firms_table(cursor):
     cursor.execute("""
@@ -12,32 +13,26 @@ def create_firms_table(cursor):
     """)
 
 def add_firm(name, representative, address):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     try:
-        cursor.execute("INSERT INTO firms (name, representative, address) VALUES (?, ?, ?)", (name, representative, address))
-        firm_id = cursor.lastrowid
-        conn.commit()
-        return firm_id
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("INSERT INTO firms (name, representative, address) VALUES (?, ?, ?)", (name, representative, address))
+            firm_id = cursor.lastrowid
+            return firm_id
     except sqlite3.IntegrityError:
         return None
-    finally:
-        conn.close()
 
 def get_all_registered_firm_names():
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT name FROM firms")
     firms = cursor.fetchall()
-    conn.close()
     return [f[0] for f in firms]
 
 def get_firm_by_name(firm_name):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM firms WHERE name = ?", (firm_name,))
     firm = cursor.fetchone()
-    conn.close()
     if firm:
         return {
             'id': firm[0],
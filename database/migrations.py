@@ -0,0 +1,311 @@
+"""
+Versioned schema migrations for the CMS database.
+
+The schema version is stored in SQLite's ``PRAGMA user_version``. Every
+migration in MIGRATIONS whose number is greater than the stored version is
+applied once, in order, and the version is bumped in the same transaction, so
+an up-to-date database only costs a single PRAGMA read at startup.
+
+A migration step is either an SQL string or a callable taking the cursor.
+To change the schema, append a new (version, description, steps) entry;
+never edit a migration that has already shipped.
+"""
+
+import glob
+import json
+import os
+from datetime import datetime
+from config import DATABASE_PATH
+from database.connection import get_connection, transaction
+from database.schema_registry import invalidate_schema
+
+WORKS_COLUMNS = {
+    "justification": "TEXT",
+    "section": "TEXT",
+    "work_type": "TEXT",
+    "file_no": "TEXT",
+    "estimate_no": "TEXT",
+    "tender_cost": "REAL",
+    "tender_opening_date": "TEXT",
+    "loa_no": "TEXT",
+    "loa_date": "TEXT",
+    "work_commence_date": "TEXT",
+    "admin_approval_office_note_no": "TEXT",
+    "admin_approval_date": "TEXT",
+    "work_type_category": "TEXT",
+    "work_type_subcategory": "TEXT",
+    "concurrence_letter_no": "TEXT",
+    "concurrence_letter_dated": "TEXT",
+    "dr_dfm_eoffice_note_no": "TEXT",
+    "computer_no": "TEXT",
+}
+
+FIRM_DOCUMENTS_COLUMNS = {
+    "pg_submitted": "INTEGER DEFAULT 0",
+    "indemnity_bond_submitted": "INTEGER DEFAULT 0",
+    "pg_type": "TEXT",
+    "pg_vetted_on": "TEXT",
+    "ib_vetted_on": "TEXT",
+    "pg_valid_upto": "TEXT",
+    "ib_notarized_date": "TEXT",
+}
+
+FIRM_DOCUMENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        work_id INTEGER NOT NULL,
+        firm_name TEXT NOT NULL,
+        pg_no TEXT,
+        pg_amount REAL,
+        bank_name TEXT,
+        bank_address TEXT,
+        indemnity_bond_details TEXT,
+        other_docs_details TEXT,
+        submission_date TEXT,
+        pg_submitted INTEGER DEFAULT 0,
+        indemnity_bond_submitted INTEGER DEFAULT 0,
+        pg_type TEXT,
+        pg_vetted_on TEXT,
+        ib_vetted_on TEXT,
+        pg_valid_upto TEXT,
+        ib_notarized_date TEXT,
+        FOREIGN KEY (work_id) REFERENCES works(id)
+    )
+"""
+
+
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def _add_missing_columns(cursor, table, columns):
+    existing = set(_table_columns(cursor, table))
+    for column, col_type in columns.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+
+
+def _baseline_schema(cursor):
+    """
+    Creates every table in its current shape. Databases created before
+    versioning are brought to the same shape: missing works/firm_documents
+    columns are added and the old firm_documents layout with firm_address is
+    rebuilt without it.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS works (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT
+        )
+    """)
+    _add_missing_columns(cursor, "works", WORKS_COLUMNS)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schedule_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            work_id INTEGER,
+            parent_item_id INTEGER,
+            item_name TEXT NOT NULL,
+            quantity REAL NOT NULL,
+            unit TEXT NOT NULL,
+            FOREIGN KEY (work_id) REFERENCES works(id),
+            FOREIGN KEY (parent_item_id) REFERENCES schedule_items(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS firm_rates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            schedule_item_id INTEGER,
+            firm_name TEXT NOT NULL,
+            unit_rate REAL NOT NULL,
+            labour_rate REAL,
+            date_recorded TEXT NOT NULL,
+            FOREIGN KEY (schedule_item_id) REFERENCES schedule_items(id),
+            UNIQUE(schedule_item_id, firm_name)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS template_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            template_name TEXT NOT NULL,
+            placeholder_name TEXT NOT NULL,
+            value TEXT,
+            timestamp TEXT NOT NULL,
+            UNIQUE(template_name, placeholder_name)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schedule_item_variations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            schedule_item_id INTEGER,
+            variation_name TEXT NOT NULL,
+            quantity REAL NOT NULL,
+            FOREIGN KEY (schedule_item_id) REFERENCES schedule_items(id),
+            UNIQUE(schedule_item_id, variation_name)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS firms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            representative TEXT,
+            address TEXT
+        )
+    """)
+
+    # Left behind by the old startup code whenever no rebuild was needed.
+    cursor.execute("DROP TABLE IF EXISTS firm_documents_new")
+    cursor.execute(FIRM_DOCUMENTS_TABLE.format(name="firm_documents"))
+    columns = _table_columns(cursor, "firm_documents")
+    if "firm_address" in columns:
+        cursor.execute(FIRM_DOCUMENTS_TABLE.format(name="firm_documents_new"))
+        new_columns = _table_columns(cursor, "firm_documents_new")
+        copied = ", ".join(c for c in columns if c in new_columns)
+        cursor.execute(f"INSERT INTO firm_documents_new ({copied}) SELECT {copied} FROM firm_documents")
+        cursor.execute("DROP TABLE firm_documents")
+        cursor.execute("ALTER TABLE firm_documents_new RENAME TO firm_documents")
+    else:
+        _add_missing_columns(cursor, "firm_documents", FIRM_DOCUMENTS_COLUMNS)
+
+
+# Where TemplateDataManager kept each template's saved inputs before they
+# moved into the database (relative to the working directory, as it was).
+LEGACY_TEMPLATE_DATA_DIR = "template_data"
+
+
+def _import_template_data_json(cursor):
+    """
+    Imports template_data/<template file name>.json into template_data
+    (current values) and template_input_history. Values already in the
+    database win; unreadable files are skipped.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for path in sorted(glob.glob(os.path.join(LEGACY_TEMPLATE_DATA_DIR, "*.json"))):
+        template_name = os.path.basename(path)[:-len(".json")]
+        try:
+            with open(path, "r") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping template data file {path}: {e}")
+            continue
+        if not isinstance(saved, dict):
+            continue
+
+        current_rows, history_rows = [], []
+        for placeholder_name, entry in saved.items():
+            # Old files stored the bare value instead of {"current", "history"}
+            if isinstance(entry, dict):
+                current, history = entry.get("current"), entry.get("history") or []
+            else:
+                current, history = entry, [entry]
+            current_rows.append((template_name, placeholder_name, None if current is None else str(current), timestamp))
+            history_rows.extend((template_name, placeholder_name, str(value)) for value in history if value is not None)
+        cursor.executemany("""
+            INSERT INTO template_data (template_name, placeholder_name, value, timestamp) VALUES (?, ?, ?, ?)
+            ON CONFLICT(template_name, placeholder_name) DO NOTHING
+        """, current_rows)
+        cursor.executemany("""
+            INSERT INTO template_input_history (template_name, placeholder_name, value) VALUES (?, ?, ?)
+            ON CONFLICT DO NOTHING
+        """, history_rows)
+
+
+MIGRATIONS = [
+    (1, "Baseline schema", (
+        _baseline_schema,
+    )),
+    (2, "Index per-work and per-parent lookups", (
+        # Per-work item loads, the work_id subqueries of delete_work and the
+        # DISTINCT firm/variation name queries all start from this index.
+        # firm_rates and schedule_item_variations are already searchable by
+        # schedule_item_id through their UNIQUE(schedule_item_id, ...) indexes.
+        "CREATE INDEX IF NOT EXISTS idx_schedule_items_work_id ON schedule_items(work_id, parent_item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_schedule_items_parent_item_id ON schedule_items(parent_item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_firm_documents_work_id ON firm_documents(work_id, firm_name)",
+    )),
+    (3, "Template placeholder catalog", (
+        """
+        CREATE TABLE IF NOT EXISTS template_catalog (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL UNIQUE,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            is_multi_firm INTEGER NOT NULL DEFAULT 0,
+            scanned_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_template_catalog_sha256 ON template_catalog(sha256)",
+        """
+        CREATE TABLE IF NOT EXISTS template_catalog_placeholders (
+            template_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            locations TEXT NOT NULL,
+            PRIMARY KEY (template_id, kind, name),
+            FOREIGN KEY (template_id) REFERENCES template_catalog(id)
+        )
+        """,
+        # "Which templates use placeholder X" looks up by name.
+        "CREATE INDEX IF NOT EXISTS idx_template_catalog_placeholders_name ON template_catalog_placeholders(name, kind)",
+    )),
+    (4, "Template input history", (
+        # Every distinct value entered per (template, placeholder); rowid
+        # keeps the order values were first used in.
+        """
+        CREATE TABLE IF NOT EXISTS template_input_history (
+            template_name TEXT NOT NULL,
+            placeholder_name TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (template_name, placeholder_name, value)
+        )
+        """,
+        _import_template_data_json,
+    )),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(db_path=None):
+    conn = get_connection(db_path or DATABASE_PATH)
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(db_path=None, target_version=None):
+    """
+    Brings the database at db_path up to target_version (default
+    LATEST_VERSION) and returns the list of applied migration versions,
+    empty when it was already current.
+    """
+    db_path = db_path or DATABASE_PATH
+    target_version = LATEST_VERSION if target_version is None else target_version
+    current_version = get_schema_version(db_path)
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if version <= current_version or version > target_version:
+            continue
+        with transaction(db_path) as cursor:
+            # sqlite3 only opens transactions implicitly before DML; begin
+            # explicitly so the DDL below rolls back together on failure.
+            if not cursor.connection.in_transaction:
+                cursor.execute("BEGIN")
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            # PRAGMA does not accept bound parameters; version is an int literal.
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+        print(f"Applied database migration {version}: {description}")
+        applied.append(version)
+    if applied:
+        # Column metadata cached before the upgrade is stale now.
+        invalidate_schema(db_path)
+    return applied
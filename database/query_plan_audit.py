@@ -0,0 +1,174 @@
+"""
+EXPLAIN QUERY PLAN audit for the hot queries of the database layer.
+
+Builds (or reuses) a populated benchmark database, asks SQLite for the plan
+of every query in AUDITED_QUERIES and reports each full table scan, so a
+missing or dropped index shows up before it shows up as a slow screen.
+
+Usage:
+    python -m database.query_plan_audit                 # temporary benchmark DB
+    python -m database.query_plan_audit path/to/cms.db  # audit an existing DB
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+from database.connection import close_all_connections, get_connection, transaction
+from database.db_manager import create_tables
+from database.migrations import apply_migrations
+
+# (name, sql, sample parameters). Keep in sync with the queries in
+# database/db_manager.py when adding or changing a per-work access path.
+AUDITED_QUERIES = [
+    ("get_schedule_items",
+     "SELECT id, parent_item_id, item_name, quantity, unit FROM schedule_items WHERE work_id = ?",
+     (1,)),
+    ("delete_schedule_item (children)",
+     "DELETE FROM schedule_items WHERE parent_item_id = ?",
+     (1,)),
+    ("get_firm_rates",
+     "SELECT id, firm_name, unit_rate, labour_rate, date_recorded FROM firm_rates WHERE schedule_item_id = ?",
+     (1,)),
+    ("get_firm_rates_for_work",
+     """SELECT fr.id, fr.schedule_item_id, fr.firm_name, fr.unit_rate, fr.labour_rate, fr.date_recorded
+        FROM firm_rates fr
+        JOIN schedule_items si ON fr.schedule_item_id = si.id
+        WHERE si.work_id = ? AND fr.firm_name = ?""",
+     (1, "Firm 1")),
+    ("get_work_firm_rate_rows",
+     """SELECT fr.schedule_item_id, fr.firm_name, fr.unit_rate, fr.labour_rate
+        FROM firm_rates fr
+        JOIN schedule_items si ON fr.schedule_item_id = si.id
+        WHERE si.work_id = ?
+        ORDER BY fr.id""",
+     (1,)),
+    ("get_work_schedule_snapshot (variations)",
+     """SELECT siv.schedule_item_id, siv.variation_name, siv.quantity
+        FROM schedule_item_variations siv
+        JOIN schedule_items si ON siv.schedule_item_id = si.id
+        WHERE si.work_id = ?
+        ORDER BY siv.id""",
+     (1,)),
+    ("get_unique_firm_names_by_work_id",
+     """SELECT DISTINCT fr.firm_name
+        FROM firm_rates fr
+        JOIN schedule_items si ON fr.schedule_item_id = si.id
+        WHERE si.work_id = ?""",
+     (1,)),
+    ("get_variation_names_for_work",
+     """SELECT DISTINCT siv.variation_name
+        FROM schedule_item_variations siv
+        JOIN schedule_items si ON siv.schedule_item_id = si.id
+        WHERE si.work_id = ?""",
+     (1,)),
+    ("delete_work (variations)",
+     "DELETE FROM schedule_item_variations WHERE schedule_item_id IN (SELECT id FROM schedule_items WHERE work_id = ?)",
+     (1,)),
+    ("delete_work (firm rates)",
+     "DELETE FROM firm_rates WHERE schedule_item_id IN (SELECT id FROM schedule_items WHERE work_id = ?)",
+     (1,)),
+    ("delete_work (schedule items)",
+     "DELETE FROM schedule_items WHERE work_id = ?",
+     (1,)),
+    ("get_firm_documents",
+     "SELECT id, work_id, firm_name, pg_no, pg_amount FROM firm_documents WHERE work_id = ?",
+     (1,)),
+    ("get_firm_document_by_work_and_firm_name",
+     "SELECT id, work_id, firm_name, pg_no, pg_amount FROM firm_documents WHERE work_id = ? AND firm_name = ?",
+     (1, "Firm 1")),
+    ("find_templates_using",
+     """SELECT DISTINCT tc.path
+        FROM template_catalog_placeholders tcp
+        JOIN template_catalog tc ON tc.id = tcp.template_id
+        WHERE tcp.name = ? AND tcp.kind = ?""",
+     ("FIRM_NAME", "firm")),
+]
+
+
+def build_benchmark_database(db_path, works=20, items_per_work=200, firms_per_work=5, variations_per_work=3):
+    """
+    Creates the CMS schema at db_path, applies all migrations and fills it
+    with synthetic works, schedule items (half of them sub-items), firm rates,
+    variations and firm documents. Statistics are gathered with ANALYZE so
+    the planner sees realistic table sizes.
+    """
+    create_tables(db_path)
+    apply_migrations(db_path)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    firm_names = [f"Firm {n + 1}" for n in range(firms_per_work)]
+    with transaction(db_path) as cursor:
+        for w in range(works):
+            cursor.execute("INSERT INTO works (name, description) VALUES (?, ?)",
+                           (f"Benchmark Work {w + 1}", "Synthetic work for the query plan audit"))
+            work_id = cursor.lastrowid
+            parent_id = None
+            for i in range(items_per_work):
+                cursor.execute(
+                    "INSERT INTO schedule_items (work_id, parent_item_id, item_name, quantity, unit) VALUES (?, ?, ?, ?, ?)",
+                    (work_id, parent_id if i % 2 else None, f"Item {i + 1}", float(i + 1), "nos")
+                )
+                item_id = cursor.lastrowid
+                if i % 2 == 0:
+                    parent_id = item_id
+                cursor.executemany(
+                    "INSERT INTO firm_rates (schedule_item_id, firm_name, unit_rate, labour_rate, date_recorded) VALUES (?, ?, ?, ?, ?)",
+                    [(item_id, firm, 100.0 + f, 10.0, now) for f, firm in enumerate(firm_names)]
+                )
+                cursor.executemany(
+                    "INSERT INTO schedule_item_variations (schedule_item_id, variation_name, quantity) VALUES (?, ?, ?)",
+                    [(item_id, f"Variation {v + 1}", float(i)) for v in range(variations_per_work)]
+                )
+            cursor.executemany(
+                "INSERT INTO firm_documents (work_id, firm_name, pg_no, pg_amount) VALUES (?, ?, ?, ?)",
+                [(work_id, firm, f"PG/{work_id}/{firm}", 1000.0) for firm in firm_names]
+            )
+    get_connection(db_path).execute("ANALYZE")
+
+
+def explain(db_path, sql, params=()):
+    """Returns the plan detail strings SQLite reports for sql."""
+    cursor = get_connection(db_path).execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def audit_query_plans(db_path, queries=None):
+    """
+    Returns a list of {'query', 'detail'} findings, one for every full table
+    scan in the plans of the audited queries. An empty list means every
+    query is served by an index.
+    """
+    findings = []
+    for name, sql, params in queries or AUDITED_QUERIES:
+        for detail in explain(db_path, sql, params):
+            # "SCAN t" is a full table scan; "SCAN t USING ... INDEX" walks a
+            # whole index, which is just as proportional to the table size.
+            if detail.startswith("SCAN "):
+                findings.append({'query': name, 'detail': detail})
+    return findings
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        db_path = argv[0]
+        findings = audit_query_plans(db_path)
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "query_plan_benchmark.db")
+            print("Building benchmark database...")
+            build_benchmark_database(db_path)
+            findings = audit_query_plans(db_path)
+            close_all_connections()
+
+    if not findings:
+        print(f"OK: all {len(AUDITED_QUERIES)} audited queries use an index.")
+        return 0
+    print(f"{len(findings)} full scan(s) found:")
+    for finding in findings:
+        print(f"  {finding['query']}: {finding['detail']}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Process-wide cache of table column metadata.
+
+Column lists used to come from a PRAGMA table_info round trip on every
+call, several times per generated document. The registry reads a table's
+columns once per database and keeps them as ColumnInfo descriptors, tagged
+with the PRAGMA user_version they were read at. The schema only changes
+through database.migrations, which calls invalidate_schema() after bumping
+user_version; restoring a database file invalidates it as well.
+"""
+
+import threading
+from collections import namedtuple
+from config import DATABASE_PATH
+from database.connection import get_connection
+
+_AFFINITY_TYPES = {
+    "INTEGER": int,
+    "REAL": float,
+    "NUMERIC": float,
+    "TEXT": str,
+    "BLOB": bytes,
+}
+
+
+class ColumnInfo(namedtuple("ColumnInfo", "name declared_type not_null default primary_key")):
+    """One row of PRAGMA table_info with SQLite's type affinity rules applied."""
+
+    __slots__ = ()
+
+    @property
+    def affinity(self):
+        declared = (self.declared_type or "").upper()
+        if "INT" in declared:
+            return "INTEGER"
+        if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared:
+            return "TEXT"
+        if not declared or "BLOB" in declared:
+            return "BLOB"
+        if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+            return "REAL"
+        return "NUMERIC"
+
+    @property
+    def python_type(self):
+        return _AFFINITY_TYPES[self.affinity]
+
+
+class TableSchema:
+    def __init__(self, table, columns, user_version):
+        self.table = table
+        self.columns = tuple(columns)
+        self.user_version = user_version
+        self.by_name = {column.name: column for column in self.columns}
+
+    @property
+    def column_names(self):
+        return [column.name for column in self.columns]
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+
+_schemas = {}
+_lock = threading.Lock()
+
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _load_table_schema(db_path, table):
+    conn = get_connection(db_path)
+    user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    rows = conn.execute(f"PRAGMA table_info({_quote_identifier(table)})").fetchall()
+    columns = [ColumnInfo(row[1], row[2], bool(row[3]), row[4], bool(row[5])) for row in rows]
+    return TableSchema(table, columns, user_version)
+
+
+def get_table_schema(table, db_path=None):
+    """
+    Returns the TableSchema of table. The first call per database reads it
+    with PRAGMA table_info; later calls are served from memory.
+    """
+    key = (db_path or DATABASE_PATH, table)
+    schema = _schemas.get(key)
+    if schema is None:
+        with _lock:
+            schema = _schemas.get(key)
+            if schema is None:
+                schema = _schemas[key] = _load_table_schema(key[0], table)
+    return schema
+
+
+def get_column_names(table, db_path=None):
+    """Ordered list of column names of table (a new list the caller may modify)."""
+    return get_table_schema(table, db_path).column_names
+
+
+def invalidate_schema(db_path=None):
+    """Forgets the cached schemas of db_path, or of every database when db_path is None."""
+    with _lock:
+        if db_path is None:
+            _schemas.clear()
+        else:
+            for key in [key for key in _schemas if key[0] == db_path]:
+                del _schemas[key]
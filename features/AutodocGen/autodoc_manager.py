@@ -2,17 +2,21 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from docx import Document
-from features.AutodocGen.constants import LETTERS_TEMPLATE_DIR, OFFICE_NOTES_TEMPLATE_DIR, USER_PLACEHOLDER_PATTERN, WORK_DATA_PLACEHOLDER_PATTERN, FIRM_PLACEHOLDER_PATTERN
+from features.AutodocGen.constants import BASE_TEMPLATE_DIR, LETTERS_TEMPLATE_DIR, OFFICE_NOTES_TEMPLATE_DIR, USER_PLACEHOLDER_PATTERN, WORK_DATA_PLACEHOLDER_PATTERN, FIRM_PLACEHOLDER_PATTERN
 from features.AutodocGen.placeholder_parser import PlaceholderParser
+from features.template_engine.placeholder_catalog import get_template_placeholders
 from features.AutodocGen.data_fetcher import DataFetcher
 from features.AutodocGen.document_generator import DocumentGenerator
+from features.AutodocGen.document_pack import generate_document_pack, is_firm_specific_template
 from features.AutodocGen.firm_selector_dialog import FirmSelectorDialog
+from features.template_engine.docx_merge import DocumentMerger
 from utils.helpers import show_toast
 
 class AutodocManager:
-    def __init__(self, master, db_path):
+    def __init__(self, master, db_path, job_executor=None):
         self.master = master
         self.db_path = db_path
+        self.job_executor = job_executor
         self.placeholder_parser = PlaceholderParser()
         self.data_fetcher = DataFetcher(db_path)
         self.document_generator = DocumentGenerator(self.data_fetcher)
@@ -41,6 +45,8 @@ class AutodocManager:
             return
 
         # 3. Fetch Dynamic Data
+        # Each generation reads a fresh snapshot of the work, shared by all of its documents
+        self.data_fetcher.reset()
         dynamic_data = {}
         try:
             # Fetch work-related data
@@ -106,13 +112,85 @@ class AutodocManager:
         except Exception as e:
             show_toast(self.master, f"Error generating document: {e}", "error")
 
+    def generate_document_pack(self, work_id):
+        """
+        Generates several templates for a work in one batch: firm-specific
+        templates once per selected firm, the others once. The documents,
+        a merged pack (optional) and manifest.json go to one folder.
+        """
+        template_paths = filedialog.askopenfilenames(
+            initialdir=BASE_TEMPLATE_DIR,
+            title="Select Templates for the Document Pack",
+            filetypes=[("Word Documents", "*.docx")]
+        )
+        if not template_paths:
+            show_toast(self.master, "Template selection cancelled.", "info")
+            return
+
+        try:
+            firm_specific = [path for path in template_paths if is_firm_specific_template(path)]
+            user_placeholders = set()
+            for path in template_paths:
+                user_placeholders |= get_template_placeholders(path).user
+        except Exception as e:
+            show_toast(self.master, f"Error extracting placeholders: {e}", "error")
+            return
+
+        self.data_fetcher.reset()
+        firm_names = []
+        if firm_specific:
+            firms_for_work = self.data_fetcher.fetch_firms_for_work(work_id)
+            if not firms_for_work:
+                show_toast(self.master, "No firms found for this work to generate firm-specific documents.", "warning")
+                return
+            dialog = FirmSelectorDialog(self.master, firms_for_work, multiple=True)
+            self.master.wait_window(dialog)
+            firm_names = dialog.selected_firms
+            if not firm_names:
+                show_toast(self.master, "Firm selection cancelled.", "info")
+                return
+
+        output_dir = filedialog.askdirectory(title="Select Folder for the Document Pack")
+        if not output_dir:
+            show_toast(self.master, "Document pack cancelled.", "info")
+            return
+        merged_pack_path = None
+        if messagebox.askyesno("Document Pack", "Also combine all documents into a single merged pack?", parent=self.master):
+            merged_pack_path = os.path.join(output_dir, "Document_Pack.docx")
+
+        # Same simplification as generate_document: user inputs are marked, not prompted for
+        user_data = {ph: f"<USER_INPUT_{ph}>" for ph in user_placeholders}
+
+        def pack_job(job):
+            return generate_document_pack(
+                work_id, list(template_paths), output_dir, firm_names, user_data, merged_pack_path,
+                db_path=self.db_path, progress=job.report, cancelled=lambda: job.cancel_requested
+            )
+
+        def on_done(manifest):
+            message = f"Document pack: {manifest['generated']} of {manifest['planned']} documents written to {output_dir}"
+            if manifest['failed']:
+                show_toast(self.master, f"{message} ({manifest['failed']} failed, see manifest.json)", "warning")
+            else:
+                show_toast(self.master, message, "success")
+
+        def on_error(e):
+            show_toast(self.master, f"Error generating document pack: {e}", "error")
+
+        if self.job_executor is None:
+            try:
+                on_done(generate_document_pack(work_id, list(template_paths), output_dir, firm_names, user_data,
+                                               merged_pack_path, db_path=self.db_path))
+            except Exception as e:
+                on_error(e)
+            return
+        self.job_executor.submit("Document Pack", pack_job, on_done=on_done, on_error=on_error)
+        show_toast(self.master, "Document pack started in the background.", "info")
+
     def _is_multi_firm_template(self, template_path):
         """Check if the template has a specific identifier for multi-firm generation."""
         try:
-            document = Document(template_path)
-            for paragraph in document.paragraphs:
-                if "MULTI_FIRM_IDENTIFIER" in paragraph.text:
-                    return True
+            return get_template_placeholders(template_path).is_multi_firm
         except Exception as e:
             print(f"Error reading template for multi-firm identifier: {e}")
         return False
@@ -136,7 +214,8 @@ class AutodocManager:
         
         # Generate the base document with first firm
         self.document_generator.generate(template_path, dynamic_data, output_file_path, is_firm_specific=True)
-        base_document = Document(output_file_path)
+        # Letters are appended after page breaks; their shared logos and letterheads are stored once
+        merger = DocumentMerger(Document(output_file_path))
         
         # Generate and append documents for remaining firms
         for firm_name in firms_for_work[1:]:
@@ -148,23 +227,15 @@ class AutodocManager:
             temp_output_path = output_file_path.replace(".docx", f"_temp_{firm_name}.docx")
             self.document_generator.generate(template_path, dynamic_data, temp_output_path, is_firm_specific=True)
 
-            # Add page break before next firm's letter
-            from docx.shared import Inches
-            from docx.enum.text import WD_BREAK
-            base_document.add_page_break()
-            
-            # Load and append firm document content
-            firm_document = Document(temp_output_path)
-            for element in firm_document._body._element:
-                base_document._body._element.append(element)
-            
+            merger.append(Document(temp_output_path))
+
             # Clean up temp file
             try:
                 os.remove(temp_output_path)
             except:
                 pass
 
-        base_document.save(output_file_path)
+        merger.save(output_file_path)
         show_toast(self.master, f"Document for all {len(firms_for_work)} firms generated successfully to {output_file_path}", "success")
         
     def _remove_multi_firm_identifier(self, template_path):
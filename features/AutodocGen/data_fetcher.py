@@ -1,24 +1,54 @@
-import sqlite3
 from config import DATABASE_PATH
-from database import db_manager
-from database.managers import firm_manager
+from features.template_engine.work_context import WorkContextSnapshot
+
+# Column order of the firm_documents tuples returned by fetch_all_firms_pg_details
+# (the same as db_manager.get_firm_documents).
+FIRM_DOCUMENT_TUPLE_COLUMNS = (
+    'id', 'work_id', 'firm_name', 'pg_no', 'pg_amount', 'bank_name', 'bank_address',
+    'indemnity_bond_details', 'other_docs_details', 'submission_date', 'pg_submitted',
+    'indemnity_bond_submitted', 'pg_type', 'pg_vetted_on', 'ib_vetted_on'
+)
 
 class DataFetcher:
+    """
+    Reads a work's data from a WorkContextSnapshot that is loaded once and
+    shared by every document generated until reset() is called.
+    """
+
     def __init__(self, db_path):
         self.db_path = db_path
+        self._snapshots = {}
+
+    def work_context(self, work_id):
+        """The session's WorkContextSnapshot for work_id, loaded on first use."""
+        snapshot = self._snapshots.get(work_id)
+        if snapshot is None:
+            snapshot = self._snapshots[work_id] = WorkContextSnapshot.load(work_id, self.db_path or DATABASE_PATH)
+        return snapshot
+
+    def reset(self):
+        """Starts a new session; the next fetch reads the database again."""
+        self._snapshots.clear()
 
     def fetch_work_data(self, work_id):
-        work_data = db_manager.get_work_by_id(work_id)
+        work = self.work_context(work_id).work
+        if not work:
+            return None
+        work_data = {'work_id': work['id'], 'work_name': work['name']}
+        work_data.update((column, value) for column, value in work.items() if column not in ('id', 'name'))
         return work_data
 
     def fetch_firms_for_work(self, work_id):
-        firms = db_manager.get_unique_firm_names_by_work_id(work_id)
-        return firms
+        return list(self.work_context(work_id).quoting_firms)
 
     def fetch_firm_data(self, firm_name, work_id):
-        firm_doc_data = db_manager.get_firm_document_by_work_and_firm_name(work_id, firm_name)
-        firm_data = firm_manager.get_firm_by_name(firm_name)
-        if firm_doc_data and firm_data:
+        snapshot = self.work_context(work_id)
+        firm_doc_data = snapshot.firm_document(firm_name)
+        if not firm_doc_data:
+            return None
+        firm_doc_data = dict(firm_doc_data)
+        firm_data = snapshot.firm(firm_name)
+        if firm_data:
             firm_doc_data['firm_address'] = firm_data['address']
         return firm_doc_data
 
@@ -26,5 +56,7 @@ class DataFetcher:
         # This fetches all firm documents for a given work_id
         # You might want to refine this to only include firms that have quoted
         # or have specific PG details.
-        all_firm_docs = db_manager.get_firm_documents(work_id)
-        return all_firm_docs
+        return [
+            tuple(doc.get(column) for column in FIRM_DOCUMENT_TUPLE_COLUMNS)
+            for doc in self.work_context(work_id).firm_documents
+        ]
@@ -0,0 +1,213 @@
+"""
+Document packs: every selected template generated for a work in one batch,
+once per firm for templates with firm placeholders (<<X>>) and once for the
+others, e.g. the same letter for every bidder plus the office note.
+
+The (template, firm) documents are spread over a process pool. Each worker
+process keeps its own DataFetcher snapshot of the work and prepares each
+template once (multi-firm identifier removed) in memory, opening every
+document from those bytes instead of the template file.
+The pool uses the "spawn" start method so no process inherits the parent's
+SQLite connections. The individual .docx files, an optional merged pack and
+a manifest.json describing the run are written to the output directory.
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from docx import Document
+from config import DATABASE_PATH
+from features.AutodocGen.data_fetcher import DataFetcher
+from features.AutodocGen.document_generator import DocumentGenerator
+from features.template_engine.docx_merge import DocumentMerger
+from features.template_engine.letter_output import safe_filename
+from features.template_engine.placeholder_catalog import MULTI_FIRM_IDENTIFIER, get_template_placeholders
+
+MANIFEST_NAME = "manifest.json"
+
+PackDocument = namedtuple("PackDocument", "template_path firm_name output_path")
+
+
+def is_firm_specific_template(template_path):
+    entry = get_template_placeholders(template_path)
+    return bool(entry.firm) or entry.is_multi_firm
+
+
+def plan_pack(template_paths, firm_names, output_dir):
+    """
+    Returns the PackDocuments to generate, grouped by template: one per firm
+    for firm-specific templates (skipped when there are no firms), one for
+    the other templates. Output names that would clash (same template name
+    from another folder, firm names equal once made file-safe) get a
+    numeric suffix, as the letter writers do.
+    """
+    documents = []
+    used_names = set()
+
+    def output_path(name):
+        candidate = f"{name}.docx"
+        suffix = len(documents) + 1
+        while candidate.lower() in used_names:
+            candidate = f"{name}_{suffix}.docx"
+            suffix += 1
+        used_names.add(candidate.lower())
+        return os.path.join(output_dir, candidate)
+
+    for template_path in template_paths:
+        stem = safe_filename(os.path.splitext(os.path.basename(template_path))[0])
+        if is_firm_specific_template(template_path):
+            for firm_name in firm_names:
+                documents.append(PackDocument(template_path, firm_name, output_path(f"{stem}_{safe_filename(firm_name)}")))
+        else:
+            documents.append(PackDocument(template_path, None, output_path(stem)))
+    return documents
+
+
+class _PackWorker:
+    """Renders pack documents; one per worker process (or one for a serial run)."""
+
+    def __init__(self, db_path):
+        self.data_fetcher = DataFetcher(db_path)
+        self.generator = DocumentGenerator(self.data_fetcher)
+        self._templates = {}
+
+    def _template(self, template_path):
+        blob = self._templates.get(template_path)
+        if blob is None:
+            template = Document(template_path)
+            for paragraph in template.paragraphs:
+                if MULTI_FIRM_IDENTIFIER in paragraph.text:
+                    paragraph.text = paragraph.text.replace(MULTI_FIRM_IDENTIFIER, "")
+            stream = io.BytesIO()
+            template.save(stream)
+            blob = self._templates[template_path] = stream.getvalue()
+        return Document(io.BytesIO(blob))
+
+    def _document_data(self, work_id, firm_name, user_data):
+        data = {}
+        work_data = self.data_fetcher.fetch_work_data(work_id)
+        if work_data:
+            data.update(work_data)
+        data.update(user_data or {})
+        data['work_id'] = work_id
+        if firm_name:
+            firm_data = self.data_fetcher.fetch_firm_data(firm_name, work_id)
+            if firm_data:
+                data.update(firm_data)
+            data['firm_name'] = firm_name
+        return data
+
+    def render(self, work_id, pack_document, user_data=None):
+        start = time.perf_counter()
+        result = {
+            'template': os.path.basename(pack_document.template_path),
+            'firm': pack_document.firm_name,
+            'file': os.path.basename(pack_document.output_path),
+            'worker': os.getpid(),
+        }
+        try:
+            document = self._template(pack_document.template_path)
+            data = self._document_data(work_id, pack_document.firm_name, user_data)
+            self.generator.render(document, data, is_firm_specific=pack_document.firm_name is not None)
+            document.save(pack_document.output_path)
+            result['error'] = None
+        except Exception as e:
+            result['error'] = str(e)
+        result['seconds'] = round(time.perf_counter() - start, 4)
+        return result
+
+
+_worker = None
+
+
+def _init_worker(db_path):
+    global _worker
+    _worker = _PackWorker(db_path)
+
+
+def _render_in_worker(work_id, pack_document, user_data):
+    return _worker.render(work_id, pack_document, user_data)
+
+
+def merge_documents(paths, output_path):
+    """
+    Appends paths[1:] to paths[0], each starting a new section that keeps
+    its own page setup, headers and footers, and saves the result to
+    output_path. Images and header/footer parts repeated across the
+    documents are stored once (see DocumentMerger).
+    """
+    merger = DocumentMerger(Document(paths[0]))
+    for path in paths[1:]:
+        merger.append(Document(path), keep_sections=True)
+    return merger.save(output_path)
+
+
+def generate_document_pack(work_id, template_paths, output_dir, firm_names=None, user_data=None,
+                           merged_pack_path=None, max_workers=None, db_path=None, progress=None, cancelled=None):
+    """
+    Generates the pack and returns its manifest (also written to
+    output_dir/manifest.json).
+
+    firm_names defaults to the firms that quoted for the work. max_workers
+    defaults to the number of CPU cores; with one worker (or one document)
+    everything runs in this process. progress(done, total, message) is
+    called after each document; cancelled() is polled between documents
+    and stops the run early when it returns True.
+    """
+    start = time.perf_counter()
+    db_path = db_path or DATABASE_PATH
+    os.makedirs(output_dir, exist_ok=True)
+    if firm_names is None:
+        firm_names = DataFetcher(db_path).fetch_firms_for_work(work_id)
+    pack = plan_pack(template_paths, firm_names, output_dir)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(pack)))
+
+    results = {}
+    if workers == 1:
+        worker = _PackWorker(db_path)
+        for n, pack_document in enumerate(pack):
+            if cancelled and cancelled():
+                break
+            results[pack_document] = worker.render(work_id, pack_document, user_data)
+            if progress:
+                progress(n + 1, len(pack), results[pack_document]['file'])
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(db_path,)) as pool:
+            futures = {pool.submit(_render_in_worker, work_id, pack_document, user_data): pack_document for pack_document in pack}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(len(results), len(pack), results[futures[future]]['file'])
+                if cancelled and cancelled():
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    break
+
+    # Manifest entries keep the planned order, whatever order workers finished in
+    documents = [results[pack_document] for pack_document in pack if pack_document in results]
+    generated = [pack_document.output_path for pack_document in pack
+                 if pack_document in results and results[pack_document]['error'] is None]
+    if merged_pack_path and generated:
+        merge_documents(generated, merged_pack_path)
+
+    manifest = {
+        'work_id': work_id,
+        'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'templates': [os.path.basename(path) for path in template_paths],
+        'firms': list(firm_names),
+        'workers': workers,
+        'seconds': round(time.perf_counter() - start, 3),
+        'planned': len(pack),
+        'generated': len(generated),
+        'failed': sum(1 for result in documents if result['error']),
+        'merged_pack': os.path.basename(merged_pack_path) if merged_pack_path and generated else None,
+        'documents': documents,
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
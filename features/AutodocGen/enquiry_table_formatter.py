@@ -1,15 +1,79 @@
+from xml.sax.saxutils import escape
 from docx import Document
-from docx.shared import Inches
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from database.db_manager import get_schedule_items, get_firm_rate_for_item
-from utils.helpers import format_currency_inr
+from docx.oxml import parse_xml
+from docx.table import Table
+from database.db_manager import get_schedule_items, get_firm_rates_for_work
+from utils.inr_format import format_inr, format_inr_array
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+# Column widths in twips: SN, Schedule Items, Qty, Unit, ELS Unit Rate,
+# ELS Total Cost, Firm Unit Rate, Firm Total Cost
+COLUMN_WIDTHS = (720, 3600, 1008, 864, 1440, 1728, 1440, 1728)
+
+# Paragraph alignment of each column in the data rows
+DATA_ALIGNMENT = ("center", None, "center", "center", "right", "right", None, None)
+
+
+def _run_xml(text, bold=False):
+    if not text:
+        return ""
+    # Line breaks and tabs become w:br / w:tab, as python-docx's cell.text does
+    parts = []
+    for n, line in enumerate(text.split("\n")):
+        if n:
+            parts.append("<w:br/>")
+        for m, chunk in enumerate(line.split("\t")):
+            if m:
+                parts.append("<w:tab/>")
+            if chunk:
+                parts.append(f'<w:t xml:space="preserve">{escape(chunk)}</w:t>')
+    run_properties = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    return f"<w:r>{run_properties}{''.join(parts)}</w:r>"
+
+
+def _cell_open(column, align=None, span=1):
+    width = sum(COLUMN_WIDTHS[column:column + span])
+    grid_span = f'<w:gridSpan w:val="{span}"/>' if span > 1 else ""
+    paragraph_properties = f'<w:pPr><w:jc w:val="{align}"/></w:pPr>' if align else ""
+    return f'<w:tc><w:tcPr><w:tcW w:w="{width}" w:type="dxa"/>{grid_span}</w:tcPr><w:p>{paragraph_properties}'
+
+
+_CELL_CLOSE = "</w:p></w:tc>"
+
+# Pre-styled prototype of a data row: the opening XML of every cell, so a
+# row is built by joining its escaped texts between them.
+_DATA_CELL_OPEN = tuple(_cell_open(column, align) for column, align in enumerate(DATA_ALIGNMENT))
+
+
+def _cell_xml(column, text="", align=None, bold=False, span=1):
+    return _cell_open(column, align, span) + _run_xml(text, bold) + _CELL_CLOSE
+
+
+def _header_rows_xml():
+    first = [_cell_xml(column, text, "center", True) for column, text in enumerate(("SN", "Schedule Items", "Qty", "Unit"))]
+    first += [_cell_xml(4, "ELS KYN Estimate", "center", True, span=2), _cell_xml(6, "Firm Quoted", "center", True, span=2)]
+    second = [_cell_xml(column, "", "center", True) for column in range(4)]
+    second += [_cell_xml(column, text, "center", True) for column, text in zip(range(4, 8), ("Unit Rate", "Total Cost", "Unit Rate", "Total Cost"))]
+    return "<w:tr>" + "".join(first) + "</w:tr><w:tr>" + "".join(second) + "</w:tr>"
+
+
+def _summary_row_xml(label, amount):
+    cells = [_cell_xml(column) for column in range(4)]
+    cells += [_cell_xml(4, label, "right", True), _cell_xml(5, amount, "right", True), _cell_xml(6), _cell_xml(7)]
+    return "<w:tr>" + "".join(cells) + "</w:tr>"
+
 
 class EnquiryTableFormatter:
     def __init__(self):
         pass
     
-    def create_enquiry_table(self, document, work_id, reference_firm_name=None):
+    def load_table_data(self, work_id, reference_firm_name=None):
+        """(schedule_items, reference unit rates) for the work's enquiry table."""
+        schedule_items = get_schedule_items(work_id)
+        return schedule_items, self._reference_rates(work_id, schedule_items, reference_firm_name)
+
+    def create_enquiry_table(self, document, work_id, reference_firm_name=None, table_data=None):
         """
         Creates an enquiry table in the document with the specified structure:
         - SN, Schedule Items, Qty, ELS KYN Estimate (merged), Firm Quoted (merged)
@@ -19,41 +83,80 @@ class EnquiryTableFormatter:
         """
         
         # Get schedule items for the work
-        schedule_items = get_schedule_items(work_id)
+        schedule_items, unit_rates = table_data or self.load_table_data(work_id, reference_firm_name)
         
         if not schedule_items:
             # If no schedule items, add a simple message
             p = document.add_paragraph("No schedule items found for this work.")
             return
         
-        # Create table with 8 columns for proper structure (added Unit column)
-        # Header rows (2) + data rows + summary rows (2)
-        num_rows = 2 + len(schedule_items) + 2
-        table = document.add_table(rows=num_rows, cols=8)
-        table.style = 'Table Grid'
-        table.alignment = WD_TABLE_ALIGNMENT.CENTER
-        
-        # Set column widths
-        table.columns[0].width = Inches(0.5)  # SN
-        table.columns[1].width = Inches(2.5)  # Schedule Items  
-        table.columns[2].width = Inches(0.7)  # Qty
-        table.columns[3].width = Inches(0.6)  # Unit
-        table.columns[4].width = Inches(1.0)  # ELS Unit Rate
-        table.columns[5].width = Inches(1.2)  # ELS Total Cost
-        table.columns[6].width = Inches(1.0)  # Firm Unit Rate
-        table.columns[7].width = Inches(1.2)  # Firm Total Cost
-        
-        # Populate the table using common method
-        self._populate_enquiry_table(table, schedule_items, reference_firm_name)
-        
+        table = Table(self.build_table_element(schedule_items, unit_rates), document)
+        document.element.body._insert_tbl(table._tbl)
         return table
     
-    def create_enquiry_table_at_location(self, document, work_id, reference_firm_name=None, paragraph_index=0):
+    def _reference_rates(self, work_id, schedule_items, reference_firm_name=None):
+        """Unit rate of the reference firm for each schedule item (0 when it has none), from one query."""
+        if not reference_firm_name:
+            return [0.0] * len(schedule_items)
+        rates = get_firm_rates_for_work(work_id, reference_firm_name)
+        unit_rates = []
+        for item in schedule_items:
+            rate = rates.get(item['item_id'])
+            unit_rates.append(float(rate['rate'] or 0) if rate else 0.0)
+        return unit_rates
+
+    def build_table_element(self, schedule_items, unit_rates):
+        """
+        Builds the whole enquiry table as one w:tbl element:
+        - SN, Schedule Items, Qty, Unit, ELS KYN Estimate (merged), Firm Quoted (merged)
+        - Under ELS KYN Estimate and Firm Quoted: Unit Rate, Total Cost
+        - One row per schedule item, then GST @18% and Grand Total
+        The rows are generated as XML text from the row prototype and parsed
+        once, instead of filling a python-docx table cell by cell.
+        """
+        total_costs = [unit_rate * (item.get('quantity') or 0) for unit_rate, item in zip(unit_rates, schedule_items)]
+        total_els_cost = sum(total_costs)
+        gst_amount = total_els_cost * 0.18
+
+        # Currency cells of all rows are formatted in one batch; rates that
+        # are zero or negative show as ₹ 0.00/-
+        formatted_rates = format_inr_array([max(rate, 0) for rate in unit_rates])
+        formatted_totals = format_inr_array([max(total, 0) for total in total_costs])
+
+        sn_open, name_open, qty_open, unit_open, rate_open, total_open, firm_rate_open, firm_total_open = _DATA_CELL_OPEN
+        firm_cells = firm_rate_open + _CELL_CLOSE + firm_total_open + _CELL_CLOSE
+        rows = [
+            f"<w:tr>{sn_open}{_run_xml(str(idx + 1))}{_CELL_CLOSE}"
+            f"{name_open}{_run_xml(item.get('item_name') or '')}{_CELL_CLOSE}"
+            f"{qty_open}{_run_xml(str(item.get('quantity', 0)))}{_CELL_CLOSE}"
+            f"{unit_open}{_run_xml(item.get('unit') or '')}{_CELL_CLOSE}"
+            f"{rate_open}{_run_xml(rate)}{_CELL_CLOSE}"
+            f"{total_open}{_run_xml(total)}{_CELL_CLOSE}"
+            f"{firm_cells}</w:tr>"
+            for idx, (item, rate, total) in enumerate(zip(schedule_items, formatted_rates, formatted_totals))
+        ]
+
+        grid = "".join(f'<w:gridCol w:w="{width}"/>' for width in COLUMN_WIDTHS)
+        table_xml = (
+            f'<w:tbl xmlns:w="{W_NS}">'
+            '<w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/><w:jc w:val="center"/>'
+            '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" w:lastColumn="0" w:noHBand="0" w:noVBand="1"/></w:tblPr>'
+            f"<w:tblGrid>{grid}</w:tblGrid>"
+            + _header_rows_xml()
+            + "".join(rows)
+            + _summary_row_xml("GST @18%", format_inr(gst_amount))
+            + _summary_row_xml("Grand Total", format_inr(total_els_cost + gst_amount))
+            + "</w:tbl>"
+        )
+        return parse_xml(table_xml)
+    
+    def create_enquiry_table_at_location(self, document, work_id, reference_firm_name=None, paragraph_index=0, table_data=None):
         """
-        Creates an enquiry table in the document at a specific paragraph location
+        Creates an enquiry table in the document at a specific paragraph location.
+        table_data: the result of load_table_data() when already loaded.
         """
         # Get schedule items for the work
-        schedule_items = get_schedule_items(work_id)
+        schedule_items, unit_rates = table_data or self.load_table_data(work_id, reference_firm_name)
         
         if not schedule_items:
             # If no schedule items, add a simple message at the specified location
@@ -81,177 +184,14 @@ class EnquiryTableFormatter:
             insertion_point.addnext(new_p)
             return
         
-        # Create table with 8 columns for proper structure (added Unit column)
-        # Header rows (2) + data rows + summary rows (2)
-        num_rows = 2 + len(schedule_items) + 2
-        
-        # Create table element directly
-        from docx.oxml.table import CT_Tbl
-        from docx.table import Table
-        from docx.oxml import parse_xml
-        
         # Get the insertion point
         if paragraph_index < len(document.paragraphs):
             insertion_point = document.paragraphs[paragraph_index]._element
         else:
             # Fallback to the regular method if index is out of range
-            self.create_enquiry_table(document, work_id, reference_firm_name)
+            self.create_enquiry_table(document, work_id, reference_firm_name, (schedule_items, unit_rates))
             return
         
-        # Create table XML
-        table_xml = f'''
-        <w:tbl xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-            <w:tblPr>
-                <w:tblStyle w:val="TableGrid"/>
-                <w:tblW w:w="0" w:type="auto"/>
-                <w:jc w:val="center"/>
-            </w:tblPr>
-            <w:tblGrid>
-                <w:gridCol w:w="720"/>   <!-- SN -->
-                <w:gridCol w:w="3600"/>  <!-- Schedule Items -->
-                <w:gridCol w:w="1008"/>  <!-- Qty -->
-                <w:gridCol w:w="864"/>   <!-- Unit -->
-                <w:gridCol w:w="1440"/>  <!-- ELS Unit Rate -->
-                <w:gridCol w:w="1728"/>  <!-- ELS Total Cost -->
-                <w:gridCol w:w="1440"/>  <!-- Firm Unit Rate -->
-                <w:gridCol w:w="1728"/>  <!-- Firm Total Cost -->
-            </w:tblGrid>
-        </w:tbl>
-        '''
-        
-        # Parse and insert the table
-        table_element = parse_xml(table_xml)
-        insertion_point.addnext(table_element)
-        
-        # Create Table object from the element
-        table = Table(table_element, document)
-        
-        # Add rows to the table
-        for _ in range(num_rows):
-            table.add_row()
-        
-        # Now populate the table with the same logic as the original method
-        self._populate_enquiry_table(table, schedule_items, reference_firm_name)
-        
+        table = Table(self.build_table_element(schedule_items, unit_rates), document)
+        insertion_point.addnext(table._tbl)
         return table
-    
-    def _populate_enquiry_table(self, table, schedule_items, reference_firm_name=None):
-        """
-        Populate the enquiry table with data (extracted common logic)
-        """
-        # Header Row 1 - Main headers
-        header_row1 = table.rows[0]
-        header_row1.cells[0].text = "SN"
-        header_row1.cells[1].text = "Schedule Items"
-        header_row1.cells[2].text = "Qty"
-        header_row1.cells[3].text = "Unit"
-        header_row1.cells[4].text = "ELS KYN Estimate"
-        header_row1.cells[6].text = "Firm Quoted"
-        
-        # Merge cells for main headers
-        header_row1.cells[4].merge(header_row1.cells[5])
-        header_row1.cells[6].merge(header_row1.cells[7])
-        
-        # Header Row 2 - Sub headers
-        header_row2 = table.rows[1]
-        header_row2.cells[0].text = ""  # SN continues
-        header_row2.cells[1].text = ""  # Schedule Items continues
-        header_row2.cells[2].text = ""  # Qty continues
-        header_row2.cells[3].text = ""  # Unit continues
-        header_row2.cells[4].text = "Unit Rate"
-        header_row2.cells[5].text = "Total Cost"
-        header_row2.cells[6].text = "Unit Rate"
-        header_row2.cells[7].text = "Total Cost"
-        
-        # Center align all header cells
-        for row_idx in [0, 1]:
-            for cell in table.rows[row_idx].cells:
-                cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                # Make text bold
-                for run in cell.paragraphs[0].runs:
-                    run.bold = True
-        
-        # Data rows
-        total_els_cost = 0
-        
-        for idx, item in enumerate(schedule_items):
-            row_idx = idx + 2  # Start after header rows
-            data_row = table.rows[row_idx]
-            
-            # SN
-            data_row.cells[0].text = str(idx + 1)
-            data_row.cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Schedule Items
-            data_row.cells[1].text = item.get('item_name', '')
-            
-            # Quantity
-            qty = item.get('quantity', 0)
-            data_row.cells[2].text = str(qty)
-            data_row.cells[2].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Unit
-            unit = item.get('unit', '')
-            data_row.cells[3].text = unit
-            data_row.cells[3].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # ELS KYN Estimate (get rate for reference firm)
-            unit_rate = 0
-            if reference_firm_name:
-                firm_rate_data = get_firm_rate_for_item(item['item_id'], reference_firm_name)
-                if firm_rate_data:
-                    unit_rate = float(firm_rate_data.get('rate', 0))
-            
-            # ELS Unit Rate
-            data_row.cells[4].text = format_currency_inr(unit_rate) if unit_rate > 0 else "₹ 0.00/-"
-            data_row.cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            
-            # ELS Total Cost
-            total_cost = unit_rate * qty
-            total_els_cost += total_cost
-            data_row.cells[5].text = format_currency_inr(total_cost) if total_cost > 0 else "₹ 0.00/-"
-            data_row.cells[5].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            
-            # Firm Quoted columns (empty for now)
-            data_row.cells[6].text = ""
-            data_row.cells[7].text = ""
-        
-        # Summary rows
-        summary_start_row = len(schedule_items) + 2
-        
-        # GST @18% row
-        gst_row = table.rows[summary_start_row]
-        gst_row.cells[0].text = ""
-        gst_row.cells[1].text = ""
-        gst_row.cells[2].text = ""
-        gst_row.cells[3].text = ""
-        gst_row.cells[4].text = "GST @18%"
-        gst_row.cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        gst_amount = total_els_cost * 0.18
-        gst_row.cells[5].text = format_currency_inr(gst_amount)
-        gst_row.cells[5].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        gst_row.cells[6].text = ""
-        gst_row.cells[7].text = ""
-        
-        # Grand Total row
-        total_row = table.rows[summary_start_row + 1]
-        total_row.cells[0].text = ""
-        total_row.cells[1].text = ""
-        total_row.cells[2].text = ""
-        total_row.cells[3].text = ""
-        total_row.cells[4].text = "Grand Total"
-        total_row.cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        grand_total = total_els_cost + gst_amount
-        total_row.cells[5].text = format_currency_inr(grand_total)
-        total_row.cells[5].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        total_row.cells[6].text = ""
-        total_row.cells[7].text = ""
-        
-        # Make summary row text bold
-        for cell in [gst_row.cells[4], gst_row.cells[5], total_row.cells[4], total_row.cells[5]]:
-            for run in cell.paragraphs[0].runs:
-                run.bold = True
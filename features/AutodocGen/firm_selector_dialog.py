@@ -2,11 +2,13 @@ import tkinter as tk
 from tkinter import ttk
 
 class FirmSelectorDialog(tk.Toplevel):
-    def __init__(self, parent, firms):
+    def __init__(self, parent, firms, multiple=False):
         super().__init__(parent)
-        self.title("Select Firm")
+        self.title("Select Firms" if multiple else "Select Firm")
         self.firms = firms
+        self.multiple = multiple
         self.selected_firm = None
+        self.selected_firms = []
 
         self.grab_set() # Make dialog modal
         self.transient(parent)
@@ -17,12 +19,20 @@ class FirmSelectorDialog(tk.Toplevel):
         main_frame = ttk.Frame(self, padding=10)
         main_frame.pack(fill=tk.BOTH, expand=True)
 
-        ttk.Label(main_frame, text="Select a firm:").pack(pady=5)
-
-        self.firm_combobox = ttk.Combobox(main_frame, values=self.firms, state="readonly")
-        self.firm_combobox.pack(pady=5)
-        if self.firms:
-            self.firm_combobox.set(self.firms[0]) # Pre-select first firm
+        if self.multiple:
+            ttk.Label(main_frame, text="Select firms:").pack(pady=5)
+            self.firm_listbox = tk.Listbox(main_frame, selectmode=tk.EXTENDED, height=min(max(len(self.firms), 3), 15), exportselection=False)
+            for firm in self.firms:
+                self.firm_listbox.insert(tk.END, firm)
+            self.firm_listbox.selection_set(0, tk.END) # Pre-select all firms
+            self.firm_listbox.pack(fill=tk.BOTH, expand=True, pady=5)
+        else:
+            ttk.Label(main_frame, text="Select a firm:").pack(pady=5)
+
+            self.firm_combobox = ttk.Combobox(main_frame, values=self.firms, state="readonly")
+            self.firm_combobox.pack(pady=5)
+            if self.firms:
+                self.firm_combobox.set(self.firms[0]) # Pre-select first firm
 
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=10)
@@ -31,9 +41,13 @@ class FirmSelectorDialog(tk.Toplevel):
         ttk.Button(button_frame, text="Cancel", command=self._on_cancel).pack(side=tk.LEFT, padx=5)
 
     def _on_select(self):
-        self.selected_firm = self.firm_combobox.get()
+        if self.multiple:
+            self.selected_firms = [self.firms[i] for i in self.firm_listbox.curselection()]
+        else:
+            self.selected_firm = self.firm_combobox.get()
         self.destroy()
 
     def _on_cancel(self):
         self.selected_firm = None
+        self.selected_firms = []
         self.destroy()
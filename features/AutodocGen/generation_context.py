@@ -0,0 +1,39 @@
+from collections import Counter
+
+class GenerationContext:
+    """
+    Values that are expensive to compute and the same for every paragraph,
+    table, header and footer of one DocumentGenerator.generate() call, such
+    as the [ALL_FIRMS_PG_DETAILS] text and the enquiry table data. Each value
+    is computed on first use and shared for the rest of the call; hits and
+    misses are counted per value name for tuning.
+    """
+
+    def __init__(self, work_id, snapshot=None):
+        self.work_id = work_id
+        self.snapshot = snapshot
+        self._values = {}
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def get(self, name, compute, *key):
+        """Returns the value cached under (name, *key), calling compute() on the first request."""
+        cache_key = (name,) + key
+        if cache_key in self._values:
+            self.hits[name] += 1
+            return self._values[cache_key]
+        self.misses[name] += 1
+        value = self._values[cache_key] = compute()
+        return value
+
+    def record(self, name, hits=0, misses=0):
+        """Adds counts from a cache kept elsewhere (e.g. the placeholder engine) to the statistics."""
+        self.hits[name] += hits
+        self.misses[name] += misses
+
+    def stats(self):
+        """{name: {'hits': n, 'misses': n}} for every value requested in this context."""
+        return {
+            name: {'hits': self.hits[name], 'misses': self.misses[name]}
+            for name in sorted(set(self.hits) | set(self.misses))
+        }
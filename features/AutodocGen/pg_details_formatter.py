@@ -1,12 +1,14 @@
-from utils.helpers import format_currency_inr
+from utils.inr_format import format_inr
 from database.db_manager import get_unique_firm_names_by_work_id
 
 class PGDetailsFormatter:
-    def format_pg_details(self, pg_details, work_id):
+    def format_pg_details(self, pg_details, work_id, all_firms=None):
+        """all_firms: the work's quoting firms when already loaded (e.g. from a WorkContextSnapshot)."""
         if not pg_details:
             return "No Performance Guarantee details found for this work."
 
-        all_firms = get_unique_firm_names_by_work_id(work_id)
+        if all_firms is None:
+            all_firms = get_unique_firm_names_by_work_id(work_id)
         submitted_firms = set(doc[2] for doc in pg_details)
 
         details_list = []
@@ -23,7 +25,7 @@ class PGDetailsFormatter:
                         bank_name = doc[5] if doc[5] is not None else 'bank name'
                         bank_address = doc[6] if doc[6] is not None else 'address'
                         
-                        formatted_pg_amount = format_currency_inr(pg_amount) if pg_amount != '--------' else '--------'
+                        formatted_pg_amount = format_inr(pg_amount) if pg_amount != '--------' else '--------'
 
                         details_list.append(
                             f"{i}. {firm_name}, submitted PG No. {pg_no}, Dated {submission_date} amount Rs. {formatted_pg_amount}, bank: {bank_name}, {bank_address}."
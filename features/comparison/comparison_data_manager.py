@@ -1,32 +1,67 @@
-
+import numpy as np
 from database import db_manager
 
+GST_RATE = 0.18
+
 class ComparisonDataManager:
     def __init__(self, work_id):
         self.work_id = work_id
 
     def get_comparison_data(self):
+        """
+        Loads the work's schedule items and pivots all firm rates into a dense
+        item x firm matrix. Missing rates are NaN in 'rate_matrix'.
+        """
         work_details = db_manager.get_work_by_id(self.work_id)
         schedule_items = db_manager.get_schedule_items(self.work_id)
-        firm_names = db_manager.get_unique_firm_names_by_work_id(self.work_id)
+        rate_rows = db_manager.get_work_firm_rate_rows(self.work_id)
+
+        item_index = {item['item_id']: i for i, item in enumerate(schedule_items)}
+        firm_index = {}
+        for rate in rate_rows:
+            firm_index.setdefault(rate['firm_name'], len(firm_index))
 
-        data = {
+        rate_matrix = np.full((len(schedule_items), len(firm_index)), np.nan)
+        if rate_rows:
+            rows = [item_index[rate['schedule_item_id']] for rate in rate_rows]
+            cols = [firm_index[rate['firm_name']] for rate in rate_rows]
+            rate_matrix[rows, cols] = [rate['unit_rate'] for rate in rate_rows]
+
+        quantities = np.array([item['quantity'] or 0 for item in schedule_items], dtype=float)
+
+        return {
             'work_name': work_details['work_name'],
-            'schedule_items': [],
-            'firm_names': firm_names
+            'schedule_items': [
+                {'item_id': item['item_id'], 'item_name': item['item_name'], 'quantity': item['quantity'], 'unit': item['unit']}
+                for item in schedule_items
+            ],
+            'firm_names': list(firm_index),
+            'quantities': quantities,
+            'rate_matrix': rate_matrix,
         }
 
-        for item in schedule_items:
-            item_data = {
-                'item_id': item['item_id'],
-                'item_name': item['item_name'],
-                'quantity': item['quantity'],
-                'unit': item['unit'],
-                'firm_rates': {}
-            }
-            firm_rates = db_manager.get_firm_rates(item['item_id'])
-            for rate in firm_rates:
-                item_data['firm_rates'][rate['firm_name']] = rate['unit_rate']
-            data['schedule_items'].append(item_data)
-
-        return data
+    @staticmethod
+    def compute_firm_summary(data):
+        """
+        Vectorised per-firm figures for the comparison summary block:
+        item costs, totals, totals with GST, inter se rank (1 = lowest,
+        ties share a rank like Excel's RANK.EQ) and the fraction by which
+        each firm is above L-1.
+        """
+        cost_matrix = data['rate_matrix'] * data['quantities'][:, None]
+        totals = np.nansum(cost_matrix, axis=0)
+        totals_with_gst = totals * (1 + GST_RATE)
+        ranks = (totals_with_gst[None, :] < totals_with_gst[:, None]).sum(axis=1) + 1
+        if totals_with_gst.size:
+            lowest = totals_with_gst.min()
+            above_l1 = (totals_with_gst - lowest) / lowest if lowest else np.zeros_like(totals_with_gst)
+        else:
+            above_l1 = totals_with_gst
+        return {
+            'cost_matrix': cost_matrix,
+            'totals': totals,
+            'gst': totals * GST_RATE,
+            'totals_with_gst': totals_with_gst,
+            'ranks': ranks,
+            'above_l1': above_l1,
+        }
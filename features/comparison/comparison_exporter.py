@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
+from xlsxwriter.utility import xl_col_to_name
 from .comparison_data_manager import ComparisonDataManager
 from .comparison_excel_structure import ComparisonExcelStructure
-from utils.helpers import format_currency_inr
+from utils.inr_format import INR_XLSX_FORMAT
 from ..AutodocGen.data_fetcher import DataFetcher
 from ..AutodocGen.pg_details_formatter import PGDetailsFormatter
 from config import DATABASE_PATH
@@ -19,18 +21,7 @@ class ComparisonExporter:
         self.excel_structure = ComparisonExcelStructure(firm_names)
         header_rows = self.excel_structure.get_excel_header_structure()
 
-        rows = []
-        for i, item in enumerate(data['schedule_items']):
-            row = {
-                'SN': i + 1,
-                'Description': item['item_name'],
-                'Qty': item['quantity']
-            }
-            for firm_name in firm_names:
-                if firm_name in item['firm_rates']:
-                    row[f'{firm_name} - Unit Rate'] = item['firm_rates'][firm_name]
-                    row[f'{firm_name} - Total Cost in Rs.'] = item['quantity'] * item['firm_rates'][firm_name]
-            rows.append(row)
+        summary = self.data_manager.compute_firm_summary(data)
 
         writer = pd.ExcelWriter(output_filename, engine='xlsxwriter')
         workbook = writer.book
@@ -46,8 +37,7 @@ class ComparisonExporter:
         data_format = workbook.add_format({
             'border': 1
         })
-        currency_format = workbook.add_format({'num_format': '₹#,##,##0.00'})
-        percentage_format = workbook.add_format({'num_format': '0.00%'})
+        currency_format = workbook.add_format({'num_format': INR_XLSX_FORMAT})
         percentage_format = workbook.add_format({'num_format': '0.00%'})
 
         # Manually write multi-level headers
@@ -57,54 +47,32 @@ class ComparisonExporter:
         # Write data rows and formulas
         data_start_row = len(header_rows) # Data starts after the header rows
         
-        # Prepare data for writing, including formulas
-        prepared_rows = []
+        # Write the item rows straight from the rate matrix. Total cost cells
+        # keep their formula but carry the NumPy-computed value as cache.
+        rate_matrix = data['rate_matrix']
+        cost_matrix = summary['cost_matrix']
+        qty_col_letter = xl_col_to_name(2)
         for i, item in enumerate(data['schedule_items']):
-            row_data = [i + 1, item['item_name'], item['quantity']]
-            firm_col_start_idx = 3 # SN, Description, Qty
-            
-            for firm_name in firm_names:
-                unit_rate = item['firm_rates'].get(firm_name)
-                row_data.append(unit_rate) # Unit Rate
-                
-                if unit_rate is not None:
-                    # Calculate column index for Quantity and Unit Rate for the current row
-                    qty_col_letter = chr(ord('A') + 2) # 'C'
-                    unit_rate_col_letter = chr(ord('A') + firm_col_start_idx)
-                    
-                    # Row index in Excel is 1-based, so add 1 to current row index + data_start_row
-                    excel_row_idx = data_start_row + i + 1
-                    
-                    formula = f'={qty_col_letter}{excel_row_idx}*{unit_rate_col_letter}{excel_row_idx}'
-                    row_data.append(formula) # Total Cost in Rs. (formula)
-                else:
-                    row_data.append(None) # No total cost if no unit rate
-                firm_col_start_idx += 2 # Move to next firm's unit rate column
-            prepared_rows.append(row_data)
-
-        # Write prepared data to worksheet
-        for row_idx, row_data in enumerate(prepared_rows):
-            for col_idx, cell_value in enumerate(row_data):
-                if col_idx == 0 or col_idx == 1 or col_idx == 2: # SN, Description, Qty columns
-                    if isinstance(cell_value, str) and cell_value.startswith('='):
-                        worksheet.write_formula(data_start_row + row_idx, col_idx, cell_value, data_format)
-                    else:
-                        worksheet.write(data_start_row + row_idx, col_idx, cell_value, data_format)
-                elif col_idx >= 3 and (col_idx - 3) % 2 == 0: # Unit Rate column
-                    if isinstance(cell_value, str) and cell_value.startswith('='):
-                        worksheet.write_formula(data_start_row + row_idx, col_idx, cell_value, currency_format)
-                    else:
-                        worksheet.write(data_start_row + row_idx, col_idx, cell_value, currency_format)
-                elif col_idx >= 3 and (col_idx - 3) % 2 == 1: # Total Cost in Rs. column
-                    if isinstance(cell_value, str) and cell_value.startswith('='):
-                        worksheet.write_formula(data_start_row + row_idx, col_idx, cell_value, currency_format)
-                    else:
-                        worksheet.write(data_start_row + row_idx, col_idx, cell_value, currency_format)
+            row_idx = data_start_row + i
+            excel_row_idx = row_idx + 1
+            worksheet.write(row_idx, 0, i + 1, data_format)
+            worksheet.write(row_idx, 1, item['item_name'], data_format)
+            worksheet.write(row_idx, 2, item['quantity'], data_format)
+            for j in range(len(firm_names)):
+                unit_rate_col_idx = 3 + 2 * j
+                unit_rate = rate_matrix[i, j]
+                if np.isnan(unit_rate):
+                    worksheet.write_blank(row_idx, unit_rate_col_idx, None, currency_format)
+                    worksheet.write_blank(row_idx, unit_rate_col_idx + 1, None, currency_format)
+                    continue
+                worksheet.write_number(row_idx, unit_rate_col_idx, unit_rate, currency_format)
+                formula = f'={qty_col_letter}{excel_row_idx}*{xl_col_to_name(unit_rate_col_idx)}{excel_row_idx}'
+                worksheet.write_formula(row_idx, unit_rate_col_idx + 1, formula, currency_format, cost_matrix[i, j])
 
         # Add summary rows with formulas
-        firm_total_cost_col_indices = self._add_summary_rows_with_formulas(worksheet, data_start_row + len(prepared_rows), firm_names, self.excel_structure.get_dataframe_columns(), header_format, currency_format, percentage_format)
+        firm_total_cost_col_indices = self._add_summary_rows_with_formulas(worksheet, data_start_row + len(data['schedule_items']), firm_names, summary, self.excel_structure.get_dataframe_columns(), header_format, currency_format, percentage_format)
 
-# Add PG details section
+        # Add PG details section
         self._add_pg_details_section(worksheet, header_format, data_format)
 
         # Apply formatting
@@ -118,12 +86,11 @@ class ComparisonExporter:
             traceback.print_exc()
             raise # Re-raise the exception after logging
 
-    def _add_summary_rows_with_formulas(self, worksheet, data_end_row, firm_names, dataframe_columns, header_format, currency_format, percentage_format):
+    def _add_summary_rows_with_formulas(self, worksheet, data_end_row, firm_names, summary, dataframe_columns, header_format, currency_format, percentage_format):
         current_summary_row = data_end_row # This is the row index where the first summary row will start
 
-        # Helper to get column letter from index
-        def get_column_letter(col_idx):
-            return chr(ord('A') + col_idx)
+        # Helper to get column letter from index (AA, AB, ... past column Z)
+        get_column_letter = xl_col_to_name
 
         # Find column indices for firm-specific total cost columns
         firm_total_cost_col_indices = {}
@@ -138,7 +105,7 @@ class ComparisonExporter:
         # --- Total row ---
         total_row_idx = current_summary_row
         worksheet.write(total_row_idx, 1, 'Total', header_format) # Description column
-        for firm_name in firm_names:
+        for j, firm_name in enumerate(firm_names):
             total_cost_col_idx = firm_total_cost_col_indices[firm_name]
             
             # Data starts at data_start_row (0-indexed in Python) + 1 (for Excel 1-indexing)
@@ -148,28 +115,28 @@ class ComparisonExporter:
 
             total_cost_col_letter = get_column_letter(total_cost_col_idx)
             formula = f'=SUM({total_cost_col_letter}{start_data_excel_row}:{total_cost_col_letter}{end_data_excel_row})'
-            worksheet.write_formula(total_row_idx, total_cost_col_idx, formula, currency_format) # Apply currency format
+            worksheet.write_formula(total_row_idx, total_cost_col_idx, formula, currency_format, summary['totals'][j]) # Apply currency format
         current_summary_row += 1
 
         # --- GST row ---
         gst_row_idx = current_summary_row
         worksheet.write(gst_row_idx, 1, 'GST @18%  (Rs)', header_format) # Description column
-        for firm_name in firm_names:
+        for j, firm_name in enumerate(firm_names):
             total_cost_col_idx = firm_total_cost_col_indices[firm_name]
             total_cell_letter = get_column_letter(total_cost_col_idx)
             formula = f'={total_cell_letter}{total_row_idx + 1}*0.18' # +1 for Excel 1-indexing
-            worksheet.write_formula(gst_row_idx, total_cost_col_idx, formula, currency_format) # Apply currency format
+            worksheet.write_formula(gst_row_idx, total_cost_col_idx, formula, currency_format, summary['gst'][j]) # Apply currency format
         current_summary_row += 1
 
         # --- Total Cost (including GST) row ---
         total_cost_gst_row_idx = current_summary_row
         worksheet.write(total_cost_gst_row_idx, 1, 'Total Cost (including GST)', header_format) # Description column
-        for firm_name in firm_names:
+        for j, firm_name in enumerate(firm_names):
             total_cost_col_idx = firm_total_cost_col_indices[firm_name]
             total_cost_gst_cell_letter = get_column_letter(total_cost_col_idx)
             
             formula = f'={total_cost_gst_cell_letter}{total_row_idx + 1}+{total_cost_gst_cell_letter}{gst_row_idx + 1}'
-            worksheet.write_formula(total_cost_gst_row_idx, total_cost_col_idx, formula, currency_format) # Apply currency format
+            worksheet.write_formula(total_cost_gst_row_idx, total_cost_col_idx, formula, currency_format, summary['totals_with_gst'][j]) # Apply currency format
         current_summary_row += 1
 
         # --- Rebate in % row ---
@@ -190,20 +157,20 @@ class ComparisonExporter:
             # The row for Total Cost (including GST) is total_cost_gst_row_idx + 1 (Excel 1-indexed)
             # The row for Rebate in % is rebate_percentage_row_idx + 1 (Excel 1-indexed)
             formula = f'={total_cost_gst_cell_letter}{total_cost_gst_row_idx + 1}*{total_cost_gst_cell_letter}{rebate_percentage_row_idx + 1}'
-            worksheet.write_formula(rebate_amount_row_idx, total_cost_col_idx, formula, currency_format) # Apply currency format
+            worksheet.write_formula(rebate_amount_row_idx, total_cost_col_idx, formula, currency_format, 0) # Apply currency format
         current_summary_row += 1
 
         # --- Total after Rebate row ---
         total_after_rebate_row_idx = current_summary_row
         worksheet.write(total_after_rebate_row_idx, 1, 'Total after Rebate', header_format) # Description column
-        for firm_name in firm_names:
+        for j, firm_name in enumerate(firm_names):
             total_cost_col_idx = firm_total_cost_col_indices[firm_name]
             total_cost_gst_cell_letter = get_column_letter(total_cost_col_idx)
             
             # The row for Total Cost (including GST) is total_cost_gst_row_idx + 1 (Excel 1-indexed)
             # The row for Rebate in ₹ is rebate_amount_row_idx + 1 (Excel 1-indexed)
             formula = f'={total_cost_gst_cell_letter}{total_cost_gst_row_idx + 1}-{total_cost_gst_cell_letter}{rebate_amount_row_idx + 1}'
-            worksheet.write_formula(total_after_rebate_row_idx, total_cost_col_idx, formula, currency_format) # Apply currency format
+            worksheet.write_formula(total_after_rebate_row_idx, total_cost_col_idx, formula, currency_format, summary['totals_with_gst'][j]) # Apply currency format
         current_summary_row += 1
 
         # --- Inter se position row ---
@@ -218,7 +185,7 @@ class ComparisonExporter:
             total_after_rebate_cells.append(cell_ref)
         rank_range_str = ','.join(total_after_rebate_cells)
 
-        for firm_name in firm_names:
+        for j, firm_name in enumerate(firm_names):
             total_cost_col_idx = firm_total_cost_col_indices[firm_name]
             current_firm_total_after_rebate_cell = f'${get_column_letter(total_cost_col_idx)}${total_after_rebate_row_idx + 1}'
             
@@ -228,7 +195,18 @@ class ComparisonExporter:
             # To get L-1 for the lowest value, we need to rank in ascending order (order 1).
             # However, the user wants L-1 for the lowest cost, so we use order 1.
             formula = f'="L-"&RANK.EQ({current_firm_total_after_rebate_cell},({rank_range_str}),1)'
-            worksheet.write_formula(inter_se_row_idx, total_cost_col_idx, formula, header_format)
+            worksheet.write_formula(inter_se_row_idx, total_cost_col_idx, formula, header_format, f"L-{summary['ranks'][j]}")
+        current_summary_row += 1
+
+        # --- Variation from L-1 row ---
+        above_l1_row_idx = current_summary_row
+        worksheet.write(above_l1_row_idx, 1, 'Variation from L-1 (%)', header_format) # Description column
+        lowest_total_str = f'MIN({rank_range_str})'
+        for j, firm_name in enumerate(firm_names):
+            total_cost_col_idx = firm_total_cost_col_indices[firm_name]
+            current_firm_total_after_rebate_cell = f'${get_column_letter(total_cost_col_idx)}${total_after_rebate_row_idx + 1}'
+            formula = f'=IFERROR(({current_firm_total_after_rebate_cell}-{lowest_total_str})/{lowest_total_str},0)'
+            worksheet.write_formula(above_l1_row_idx, total_cost_col_idx, formula, percentage_format, summary['above_l1'][j])
         current_summary_row += 1
 
         # Store the last row of data for formatting
@@ -32,10 +32,11 @@ def load_data(work_id, firm_name):
             "remarks": work_details.get('description', ''),
         })
 
-    # Fetch schedule items and firm rates
+    # Fetch schedule items and all of the firm's rates for the work in one query
     schedule_items = db_manager.get_schedule_items(work_id)
+    firm_rates = db_manager.get_firm_rates_for_work(work_id, firm_name)
     for i, item in enumerate(schedule_items):
-        firm_rate = db_manager.get_firm_rate_for_item(item['item_id'], firm_name)
+        firm_rate = firm_rates.get(item['item_id'])
         
         # Ensure numeric values are floats for calculations
         qty = float(item.get('quantity')) if item.get('quantity') is not None else None
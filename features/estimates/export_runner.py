@@ -13,6 +13,7 @@ from .constants import COLUMN_HEADERS
 def run_export(work_id, firm_name, estimate_no=None, work_subcategory=None):
     """
     Main script to trigger the export and save the Excel file.
+    Returns the path of the saved workbook, or None when there is no data.
     
     Args:
         work_id: The work ID to export
@@ -73,6 +74,7 @@ def run_export(work_id, firm_name, estimate_no=None, work_subcategory=None):
     # Save the workbook
     workbook.save(file_path)
     print(f"Estimate report saved to {file_path}")
+    return file_path
 
 
 def _sanitize_filename(filename):
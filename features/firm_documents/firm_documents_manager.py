@@ -1,90 +1,31 @@
-import sqlite3
 from config import DATABASE_PATH
+from database.connection import get_connection, transaction
+from database.migrations import apply_migrations
 
 def create_firm_documents_table():
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS firm_documents_new (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            work_id INTEGER NOT NULL,
-            firm_name TEXT NOT NULL,
-            pg_no TEXT,
-            pg_amount REAL,
-            bank_name TEXT,
-            bank_address TEXT,
-            indemnity_bond_details TEXT,
-            other_docs_details TEXT,
-            submission_date TEXT,
-            pg_submitted INTEGER DEFAULT 0,
-            indemnity_bond_submitted INTEGER DEFAULT 0,
-            pg_type TEXT,
-            pg_vetted_on TEXT,
-            ib_vetted_on TEXT,
-            FOREIGN KEY (work_id) REFERENCES works(id)
-        )
-    ''')
-
-    cursor.execute("PRAGMA table_info(firm_documents)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if 'firm_address' in columns:
-        cursor.execute('''
-            INSERT INTO firm_documents_new (id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on)
-            SELECT id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on FROM firm_documents
-        ''')
-        cursor.execute('DROP TABLE firm_documents')
-        cursor.execute('ALTER TABLE firm_documents_new RENAME TO firm_documents')
-
-    # Add new columns if they don't exist
-    cursor.execute("PRAGMA table_info(firm_documents)")
-    columns = [col[1] for col in cursor.fetchall()]
-
-    if 'pg_submitted' not in columns:
-        cursor.execute("ALTER TABLE firm_documents ADD COLUMN pg_submitted INTEGER DEFAULT 0")
-    if 'indemnity_bond_submitted' not in columns:
-        cursor.execute("ALTER TABLE firm_documents ADD COLUMN indemnity_bond_submitted INTEGER DEFAULT 0")
-    if 'pg_type' not in columns:
-        cursor.execute("ALTER TABLE firm_documents ADD COLUMN pg_type TEXT")
-    if 'pg_vetted_on' not in columns:
-        cursor.execute("ALTER TABLE firm_documents ADD COLUMN pg_vetted_on TEXT")
-    if 'ib_vetted_on' not in columns:
-        cursor.execute("ALTER TABLE firm_documents ADD COLUMN ib_vetted_on TEXT")
-    if 'pg_valid_upto' not in columns:
-        cursor.execute("ALTER TABLE firm_documents ADD COLUMN pg_valid_upto TEXT")
-    if 'ib_notarized_date' not in columns:
-        cursor.execute("ALTER TABLE firm_documents ADD COLUMN ib_notarized_date TEXT")
-
-    cursor.execute("PRAGMA table_info(firm_documents)")
-    updated_columns = [col[1] for col in cursor.fetchall()]
-    print(f"Firm documents table columns after ALTER: {updated_columns}")
-
-    conn.commit()
-    conn.close()
+    # The firm_documents table and its later columns are now created by the
+    # versioned migrations; kept so existing callers keep working.
+    apply_migrations()
 
 def add_firm_document(work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto=None, ib_notarized_date=None):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO firm_documents (work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        (work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date)
-    )
-    conn.commit()
-    conn.close()
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute(
+            "INSERT INTO firm_documents (work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date)
+        )
 
 def get_firm_documents(work_id):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date FROM firm_documents WHERE work_id = ?", (work_id,))
     documents = cursor.fetchall()
-    conn.close()
     return documents
 
 def get_firm_document_by_work_and_firm_name(work_id, firm_name):
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date FROM firm_documents WHERE work_id = ? AND firm_name = ?", (work_id, firm_name))
     document = cursor.fetchone()
-    conn.close()
     if document:
         return {
             'id': document[0],
@@ -108,18 +49,12 @@ def get_firm_document_by_work_and_firm_name(work_id, firm_name):
     return None
 
 def update_firm_document(doc_id, firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto=None, ib_notarized_date=None):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE firm_documents SET firm_name = ?, pg_no = ?, pg_amount = ?, bank_name = ?, bank_address = ?, indemnity_bond_details = ?, other_docs_details = ?, submission_date = ?, pg_submitted = ?, indemnity_bond_submitted = ?, pg_type = ?, pg_vetted_on = ?, ib_vetted_on = ?, pg_valid_upto = ?, ib_notarized_date = ? WHERE id = ?",
-        (firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date, doc_id)
-    )
-    conn.commit()
-    conn.close()
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute(
+            "UPDATE firm_documents SET firm_name = ?, pg_no = ?, pg_amount = ?, bank_name = ?, bank_address = ?, indemnity_bond_details = ?, other_docs_details = ?, submission_date = ?, pg_submitted = ?, indemnity_bond_submitted = ?, pg_type = ?, pg_vetted_on = ?, ib_vetted_on = ?, pg_valid_upto = ?, ib_notarized_date = ? WHERE id = ?",
+            (firm_name, pg_no, pg_amount, bank_name, bank_address, indemnity_bond_details, other_docs_details, submission_date, pg_submitted, indemnity_bond_submitted, pg_type, pg_vetted_on, ib_vetted_on, pg_valid_upto, ib_notarized_date, doc_id)
+        )
 
 def delete_firm_document(doc_id):
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM firm_documents WHERE id = ?", (doc_id,))
-    conn.commit()
-    conn.close()
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute("DELETE FROM firm_documents WHERE id = ?", (doc_id,))
@@ -8,17 +8,19 @@ def export_price_variation_data_to_excel(work_details, schedule_items, output_pa
         processed_schedule_items = []
         total_cost_before_all_items = 0
         total_cost_after_all_items = 0
+        snapshot_items = db_manager.get_work_schedule_snapshot(work_details['work_id'])['items']
 
         for sr_no, item in enumerate(schedule_items, 1):
             item['sr_no'] = sr_no  # Add serial number to the item
             original_quantity = item['quantity']
+            snapshot_item = snapshot_items.get(item['item_id'], {})
             # Fetch new_quantity from schedule_item_variations
-            variations = db_manager.get_schedule_item_variations(item['item_id'])
+            variations = snapshot_item.get('variations', {})
             new_quantity = variations.get(variation_type, original_quantity)
             item['new_quantity'] = new_quantity # Add new_quantity to the item dictionary
 
             # Fetch unit_rate for the selected firm
-            firm_rates = db_manager.get_firm_rates(item['item_id'])
+            firm_rates = snapshot_item.get('firm_rates', [])
             unit_rate = 0
             if selected_firms and firm_rates:
                 for rate in firm_rates:
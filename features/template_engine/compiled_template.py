@@ -0,0 +1,216 @@
+"""
+Parse-once form of a .docx template for multi-firm letter runs.
+
+A CompiledTemplate parses the template a single time and records which
+paragraphs of the body and of each header and footer part contain
+placeholder tokens (the "slots") together with their text. Rendering a
+letter deep-copies the parsed body (or part) and rewrites only those slots;
+every other paragraph keeps its original XML untouched.
+
+Compiled templates are cached per file, keyed by path, modification time and
+size, so regenerating letters from an unchanged template does not parse it
+again. write_docx() saves a rendered body as a complete document by copying
+the template package and streaming in a new main document part, with the
+rendered headers and footers in place of the template's.
+"""
+
+import copy
+import io
+import os
+import posixpath
+import zipfile
+from collections import namedtuple
+from functools import lru_cache
+from lxml import etree
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.text.paragraph import Paragraph
+from .placeholder_engine import TOKEN_PATTERN
+
+# Paragraphs directly in the body (or header/footer) and in table cells, nested tables included.
+SLOT_PARAGRAPHS_XPATH = "./w:p | ./w:tbl//w:tc/w:p"
+
+# A header or footer part of the template; name is its zip entry name.
+CompiledPart = namedtuple("CompiledPart", "name rId reltype content_type element slots")
+
+# An extra copy of the header or footer part source, see write_docx().
+AddedPart = namedtuple("AddedPart", "name source rId")
+
+CONTENT_TYPES_NAME = "[Content_Types].xml"
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_BODY_MARKER = "letter-body"
+
+
+def _paragraph_text(p):
+    return "".join(run.text for run in Paragraph(p, None).runs)
+
+
+def part_xml(root):
+    """The serialised XML of a part's root element (bytes are returned unchanged)."""
+    if isinstance(root, bytes):
+        return root
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _rels_name(name):
+    # "word/document.xml" -> "word/_rels/document.xml.rels"
+    return posixpath.join(posixpath.dirname(name), "_rels", posixpath.basename(name) + ".rels")
+
+
+def _find_slots(root):
+    slots = []
+    for index, p in enumerate(root.xpath(SLOT_PARAGRAPHS_XPATH)):
+        text = _paragraph_text(p)
+        if TOKEN_PATTERN.search(text):
+            slots.append((index, text))
+    return slots
+
+
+def _render(root, slots, replace_text, run_cache=None):
+    run_cache = {} if run_cache is None else run_cache
+    root = copy.deepcopy(root)
+    if slots:
+        paragraphs = root.xpath(SLOT_PARAGRAPHS_XPATH)
+        for index, text in slots:
+            new_text = replace_text(text)
+            if new_text == text:
+                continue
+            p = paragraphs[index]
+            for r in p.r_lst:
+                p.remove(r)
+            if not new_text:
+                continue
+            run = run_cache.get(new_text)
+            if run is None:
+                run = Paragraph(p, None).add_run(new_text).element
+                run_cache[new_text] = copy.deepcopy(run)
+            else:
+                p.append(copy.deepcopy(run))
+    return root
+
+
+class CompiledTemplate:
+    def __init__(self, doc_path):
+        self.doc_path = doc_path
+        with open(doc_path, "rb") as f:
+            self.package_blob = f.read()
+        self.document = Document(io.BytesIO(self.package_blob))
+        self.main_part_name = self.document.part.partname.lstrip("/")
+        with zipfile.ZipFile(io.BytesIO(self.package_blob)) as package:
+            self.package_names = set(package.namelist())
+        self._document_xml_frame = None
+        self.slots = _find_slots(self.document.element.body)
+        self.parts = {}
+        for rId, rel in self.document.part.rels.items():
+            if rel.is_external or rel.reltype not in (RT.HEADER, RT.FOOTER):
+                continue
+            part = rel.target_part
+            name = part.partname.lstrip("/")
+            self.parts[name] = CompiledPart(name, rId, rel.reltype, part.content_type, part.element, _find_slots(part.element))
+
+    def render_body(self, replace_text, run_cache=None):
+        """
+        Returns a deep copy of the template body in which every slot paragraph
+        whose text changes under replace_text(text) is rewritten as a single run.
+        Passing the same run_cache dict across letters reuses the run built
+        for a text that repeats, such as a work-level value in every letter.
+        """
+        return _render(self.document.element.body, self.slots, replace_text, run_cache)
+
+    def render_part(self, name, replace_text, run_cache=None):
+        """Returns a rendered deep copy of the header or footer part name, as render_body does for the body."""
+        part = self.parts[name]
+        return _render(part.element, part.slots, replace_text, run_cache)
+
+    def render_parts(self, replace_text, run_cache=None):
+        """{name: rendered root element} for every header and footer part that has slots."""
+        return {name: self.render_part(name, replace_text, run_cache) for name, part in self.parts.items() if part.slots}
+
+
+    def _frame(self):
+        # Serialised main document part split around the body's children
+        if self._document_xml_frame is None:
+            root = copy.deepcopy(self.document.element)
+            body = root.body
+            for child in list(body):
+                body.remove(child)
+            body.append(etree.Comment(_BODY_MARKER))
+            xml = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+            self._document_xml_frame = tuple(xml.split(f"<!--{_BODY_MARKER}-->".encode()))
+        return self._document_xml_frame
+
+    def write_docx(self, body_children, target, parts=None, added_parts=None):
+        """
+        Writes a .docx to target (a path or writable binary file) that is the
+        template package with body_children (an element list or iterator,
+        e.g. a rendered body) as the document body. Children are serialised
+        one at a time as they are consumed. parts ({name: root element or
+        XML bytes}, e.g. from render_parts()) are written in place of the
+        template's header and footer parts of the same name.
+
+        added_parts lists AddedParts: further copies of a header or footer
+        part, written from parts[name] with the source part's relationships
+        and related from the main document part as rId. The body is written
+        first, so parts and added_parts may still be filled while
+        body_children is consumed.
+        """
+        parts = parts if parts is not None else {}
+        added_parts = added_parts if added_parts is not None else []
+        before, after = self._frame()
+        main_rels_name = _rels_name(self.main_part_name)
+        with zipfile.ZipFile(io.BytesIO(self.package_blob)) as template, \
+                zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as package:
+            with package.open(self.main_part_name, "w") as part:
+                part.write(before)
+                for child in body_children:
+                    part.write(etree.tostring(child, encoding="UTF-8"))
+                part.write(after)
+
+            for item in template.infolist():
+                if item.filename == self.main_part_name:
+                    continue
+                if item.filename in parts:
+                    data = part_xml(parts[item.filename])
+                else:
+                    data = template.read(item.filename)
+                    if added_parts and item.filename == main_rels_name:
+                        data = self._add_relationships(data, added_parts)
+                    elif added_parts and item.filename == CONTENT_TYPES_NAME:
+                        data = self._add_content_types(data, added_parts)
+                # writestr() sets the entry's offset in the new archive on the ZipInfo it is given
+                package.writestr(copy.copy(item), data)
+
+            for added in added_parts:
+                package.writestr(added.name, part_xml(parts[added.name]))
+                source_rels_name = _rels_name(added.source)
+                if source_rels_name in self.package_names:
+                    package.writestr(_rels_name(added.name), template.read(source_rels_name))
+
+    def _add_relationships(self, rels_xml, added_parts):
+        root = etree.fromstring(rels_xml)
+        base = posixpath.dirname(self.main_part_name)
+        for added in added_parts:
+            etree.SubElement(root, f"{{{RELATIONSHIPS_NS}}}Relationship", Id=added.rId,
+                             Type=self.parts[added.source].reltype, Target=posixpath.relpath(added.name, base))
+        return part_xml(root)
+
+    def _add_content_types(self, content_types_xml, added_parts):
+        root = etree.fromstring(content_types_xml)
+        for added in added_parts:
+            etree.SubElement(root, f"{{{CONTENT_TYPES_NS}}}Override", PartName=f"/{added.name}",
+                             ContentType=self.parts[added.source].content_type)
+        return part_xml(root)
+
+
+@lru_cache(maxsize=16)
+def _compile(doc_path, mtime_ns, size):
+    return CompiledTemplate(doc_path)
+
+
+def load_compiled_template(doc_path):
+    """Returns the cached CompiledTemplate for doc_path, compiling it if the file changed."""
+    doc_path = os.path.abspath(doc_path)
+    stat = os.stat(doc_path)
+    return _compile(doc_path, stat.st_mtime_ns, stat.st_size)
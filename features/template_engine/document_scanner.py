@@ -0,0 +1,71 @@
+"""
+Fast text scanner for .docx templates.
+
+Placeholder discovery only needs paragraph text, so instead of building the
+python-docx object model (which materialises every table's cell grid) the
+scanner streams the raw word/document.xml, header and footer parts with
+lxml's iterparse. Every paragraph is visited once, including those in nested
+tables and text boxes, and a header or footer shared by several sections is
+read once because it is a single part in the package.
+"""
+
+import re
+import zipfile
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_P = f"{{{W_NS}}}p"
+W_T = f"{{{W_NS}}}t"
+W_TAB = f"{{{W_NS}}}tab"
+W_BR = f"{{{W_NS}}}br"
+W_CR = f"{{{W_NS}}}cr"
+
+SCANNED_PARTS = re.compile(r"word/(document|header\d*|footer\d*)\.xml\Z")
+
+_RUN_TEXT_TAGS = (W_T, W_TAB, W_BR, W_CR)
+
+
+def _part_paragraph_texts(stream):
+    for _, paragraph in etree.iterparse(stream, events=("end",), tag=W_P):
+        parts = []
+        for element in paragraph.iter(*_RUN_TEXT_TAGS):
+            if element.tag == W_T:
+                if element.text:
+                    parts.append(element.text)
+            elif element.tag == W_TAB:
+                # w:tab also appears in paragraph tab stops (w:pPr/w:tabs)
+                if element.getparent().tag != f"{{{W_NS}}}tabs":
+                    parts.append("\t")
+            else:
+                parts.append("\n")
+        # Clearing the paragraph frees it and keeps a paragraph nested in a
+        # text box from being counted again by its enclosing paragraph.
+        paragraph.clear(keep_tail=True)
+        yield "".join(parts)
+
+
+def iter_paragraphs(doc_path):
+    """
+    Yields (part_name, paragraph_index, text) for every paragraph in the
+    body, headers and footers; the index counts paragraphs within the part.
+    """
+    with zipfile.ZipFile(doc_path) as package:
+        for name in package.namelist():
+            if SCANNED_PARTS.match(name):
+                with package.open(name) as stream:
+                    for index, text in enumerate(_part_paragraph_texts(stream)):
+                        yield name, index, text
+
+
+def iter_paragraph_texts(doc_path):
+    """Yields the text of every paragraph in the body, headers and footers."""
+    for _, _, text in iter_paragraphs(doc_path):
+        yield text
+
+
+def document_text(doc_path):
+    """
+    All paragraph texts of the document joined by newlines, ready for the
+    placeholder regexes (none of which match across a line break).
+    """
+    return "\n".join(iter_paragraph_texts(doc_path))
@@ -0,0 +1,155 @@
+"""
+Merging separately saved .docx files into one document.
+
+Copying body XML from one package into another leaves its r:embed / r:id
+references pointing at relationships the target does not have, so logos,
+signatures and letterheads go missing. DocumentMerger imports every part an
+appended body refers to (images, headers and footers, embedded objects,
+each with the parts they refer to in turn) and rewrites the references.
+
+Parts are identified by a content hash covering their bytes, content type
+and everything they relate to. A part whose hash is already in the merged
+package, whether from the base document or an earlier append, is
+referenced again instead of copied, so fifty letters carrying the same
+logo and letterhead share a single image part and a single header part.
+"""
+
+import hashlib
+import re
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from features.template_engine.letter_output import PAGE_BREAK_XML
+
+R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+_PARTNAME_NUMBER = re.compile(r"\d*(?=\.\w+$)")
+
+
+def _partname_template(partname):
+    # "/word/media/image12.png" -> "/word/media/image%d.png"
+    return _PARTNAME_NUMBER.sub("%d", partname, count=1)
+
+
+class DocumentMerger:
+    """
+    Appends documents to base_document (a python-docx Document), one after
+    another. imported and shared count the parts copied into the merged
+    package and the references resolved to a part that was already there.
+    """
+
+    def __init__(self, base_document):
+        self.document = base_document
+        self.package = base_document.part.package
+        self.imported = 0
+        self.shared = 0
+        self._keys = {}
+        self._parts_by_key = {}
+        for part in self.package.iter_parts():
+            if part is not base_document.part:
+                self._parts_by_key.setdefault(self._part_key(part), part)
+
+    def _part_key(self, part):
+        key = self._keys.get(id(part))
+        if key is None:
+            # Marks the part while its relationships are hashed, in case they lead back to it
+            self._keys[id(part)] = (part, "")
+            digest = hashlib.sha256(part.content_type.encode())
+            digest.update(part.blob or b"")
+            for rId in sorted(part.rels):
+                rel = part.rels[rId]
+                target = rel.target_ref if rel.is_external else self._part_key(rel.target_part)
+                digest.update(f"|{rId}|{rel.reltype}|{target}".encode())
+            key = (part, digest.hexdigest())
+            self._keys[id(part)] = key
+        return key[1]
+
+    def _import_part(self, source_part, relate):
+        """
+        Finds or imports the merged-package part equal to source_part and
+        returns relate(part), which adds the relationship to it.
+        """
+        key = self._part_key(source_part)
+        part = self._parts_by_key.get(key)
+        if part is not None:
+            self.shared += 1
+            return relate(part)
+
+        partname = self.package.next_partname(_partname_template(source_part.partname))
+        part = Part(PackURI(partname), source_part.content_type, source_part.blob, self.package)
+        self._parts_by_key[key] = part
+        self.imported += 1
+        # Related first so the part counts for next_partname() of the parts it refers to
+        result = relate(part)
+        # The blob keeps its rIds, so its relationships are recreated under the same ids
+        for rId, rel in source_part.rels.items():
+            if rel.is_external:
+                part.rels.add_relationship(rel.reltype, rel.target_ref, rId, is_external=True)
+            else:
+                self._import_part(rel.target_part, lambda target, rId=rId, reltype=rel.reltype:
+                                  part.rels.add_relationship(reltype, target, rId))
+        return result
+
+    def _import_references(self, elements, source_part):
+        """Rewrites the r:* attributes of elements to relationships of the merged document part."""
+        rId_map = {}
+        for element in elements:
+            for node in element.iter():
+                for name, value in node.attrib.items():
+                    if not name.startswith(R_NS):
+                        continue
+                    if value not in rId_map:
+                        rel = source_part.rels.get(value)
+                        if rel is None:
+                            continue
+                        if rel.is_external:
+                            rId_map[value] = self.document.part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+                        else:
+                            rId_map[value] = self._import_part(
+                                rel.target_part, lambda target, reltype=rel.reltype: self.document.part.relate_to(target, reltype))
+                    node.set(name, rId_map[value])
+
+    def append(self, document, keep_sections=False):
+        """
+        Appends document's body. With keep_sections the current last section
+        is closed and the appended document continues in a new section with
+        its own page setup, headers and footers; otherwise the body follows a
+        page break and uses the merged document's sections.
+        """
+        body = self.document.element.body
+        final_section = body.find(qn('w:sectPr'))
+        children = [child for child in document.element.body if child.tag != qn('w:sectPr')]
+
+        def insert(element):
+            if final_section is not None:
+                final_section.addprevious(element)
+            else:
+                body.append(element)
+
+        if keep_sections and final_section is not None:
+            # The section so far ends with a paragraph carrying its properties
+            break_paragraph = parse_xml(
+                '<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:pPr/></w:p>'
+            )
+            insert(break_paragraph)
+            break_paragraph.pPr.append(final_section)
+            new_section = document.element.body.find(qn('w:sectPr'))
+            if new_section is not None:
+                self._import_references([new_section], document.part)
+                body.append(new_section)
+                final_section = new_section
+            else:
+                final_section = None
+        else:
+            insert(parse_xml(PAGE_BREAK_XML))
+
+        self._import_references(children, document.part)
+        for child in children:
+            insert(child)
+        # Digests of the appended document's parts would keep its whole package alive
+        self._keys = {k: v for k, v in self._keys.items() if v[0].package is self.package}
+
+    def save(self, path):
+        self.document.save(path)
+        return path
@@ -0,0 +1,279 @@
+"""
+Document-generation benchmark.
+
+Builds a synthetic .docx template (configurable paragraph, table, header
+and placeholder counts) and synthetic works with 1-200 firms, then times
+TemplateProcessor.replace_placeholders, generate_letters_for_firms and
+AutodocGen's DocumentGenerator.generate (once per firm, sharing one
+DataFetcher session). Each case records wall time (best of the timed
+runs), peak Python memory from one tracemalloc run and the number of SQL
+statements issued. Results are written as a JSON baseline, and a later run
+can be compared against one.
+
+The synthetic works and firms are inserted into the configured database and
+removed again when the run ends, as is the template's placeholder catalog
+entry.
+
+Usage:
+    python -m features.template_engine.generation_benchmark
+    python -m features.template_engine.generation_benchmark --firms 1 10 50 200 --output baseline.json
+    python -m features.template_engine.generation_benchmark --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from docx import Document
+from config import DATABASE_PATH
+from database import db_manager
+from database.connection import get_connection, transaction
+from features.template_engine.placeholder_catalog import forget_template
+from features.template_engine.template_processor import TemplateProcessor
+from features.AutodocGen.data_fetcher import DataFetcher
+from features.AutodocGen.document_generator import DocumentGenerator
+
+DEFAULT_FIRM_COUNTS = (1, 10, 50, 200)
+
+# Placeholders cycled through the synthetic paragraphs and cells.
+SYNTHETIC_PLACEHOLDERS = (
+    "[NAME]", "<<FIRM_NAME>>", "{{REF_NO}}", "[FILE_NO]", "<<PG_NO>>",
+    "{{COST_1.18_IN_WORDS}}", "[CURRENT_DATE]", "<<BANK_NAME>>", "{{COST}}", "[TENDER_COST]",
+)
+
+SYNTHETIC_INPUTS = {"REF_NO": "REF/2025/001", "COST": "1234567.89"}
+
+SQL_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "WITH", "REPLACE")
+
+
+def build_synthetic_template(path, paragraphs=50, tables=2, table_rows=10, headers=True,
+                             placeholders_per_paragraph=2, all_firms_pg_details=True):
+    """Writes a template with the given shape to path and returns path."""
+    document = Document()
+    counter = 0
+
+    def filler(count):
+        nonlocal counter
+        tokens = []
+        for _ in range(count):
+            tokens.append(SYNTHETIC_PLACEHOLDERS[counter % len(SYNTHETIC_PLACEHOLDERS)])
+            counter += 1
+        return " lorem ipsum ".join(["Dear sir"] + tokens) + "."
+
+    if headers:
+        document.sections[0].header.paragraphs[0].text = "File No. [FILE_NO] | Ref {{REF_NO}}"
+        document.sections[0].footer.paragraphs[0].text = "[NAME] - [CURRENT_DATE]"
+    for n in range(paragraphs):
+        # Every third paragraph is plain text without placeholders
+        document.add_paragraph(filler(placeholders_per_paragraph) if n % 3 else f"Static paragraph {n} of the letter body.")
+    if all_firms_pg_details:
+        document.add_paragraph("[ALL_FIRMS_PG_DETAILS]")
+    for _ in range(tables):
+        table = document.add_table(rows=table_rows, cols=3)
+        for row in table.rows:
+            row.cells[0].text = "Item"
+            row.cells[1].text = filler(1)
+            row.cells[2].text = filler(1)
+    document.save(path)
+    return path
+
+
+def create_synthetic_work(firm_count, label=""):
+    """Inserts a work with firm_count firms (documents and registrations); returns (work_id, firm_names)."""
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    work_id = db_manager.add_work(name=f"Benchmark Work {firm_count} firms {label}{stamp}", description="Synthetic work for the generation benchmark.",
+                                  file_no=f"FILE/{stamp}", tender_cost=2500000.0)
+    firm_names = [f"Benchmark Firm {n + 1} {stamp}" for n in range(firm_count)]
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.executemany("INSERT INTO firms (name, representative, address) VALUES (?, ?, ?)",
+                           [(firm, f"Representative {n + 1}", f"{n + 1} Industrial Area") for n, firm in enumerate(firm_names)])
+        cursor.executemany(
+            """INSERT INTO firm_documents (work_id, firm_name, pg_no, pg_amount, bank_name, bank_address, submission_date, pg_submitted)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(work_id, firm, f"PG/{n + 1}", 10000.0 * (n + 1), "State Bank", "Main Road", "01-01-2025", n % 2)
+             for n, firm in enumerate(firm_names)]
+        )
+    return work_id, firm_names
+
+
+def delete_synthetic_work(work_id, firm_names):
+    with transaction(DATABASE_PATH) as cursor:
+        cursor.execute("DELETE FROM firm_documents WHERE work_id = ?", (work_id,))
+        cursor.executemany("DELETE FROM firms WHERE name = ?", [(firm,) for firm in firm_names])
+    db_manager.delete_work(work_id)
+
+
+class SqlCounter:
+    """Counts the SQL statements run on this thread's pooled connection."""
+
+    def __init__(self, db_path=DATABASE_PATH):
+        self.connection = get_connection(db_path)
+        self.count = 0
+
+    def _trace(self, statement):
+        if statement.lstrip().upper().startswith(SQL_VERBS):
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        self.connection.set_trace_callback(self._trace)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.set_trace_callback(None)
+
+
+def measure(func, repeat=3):
+    """Runs func repeat times; returns best wall time, peak traced memory and SQL count of one run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    with SqlCounter() as sql:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"wall_s": round(min(timings), 6), "peak_kib": round(peak / 1024, 1), "sql": sql.count}
+
+
+def _cases(template_path, work_id, firm_names, output_dir):
+    processor = TemplateProcessor()
+
+    def replace_placeholders():
+        processor.replace_placeholders(template_path, dict(SYNTHETIC_INPUTS), work_id,
+                                       os.path.join(output_dir, "single.docx"), firm_placeholders=set())
+
+    def generate_letters_for_firms():
+        processor.generate_letters_for_firms(template_path, dict(SYNTHETIC_INPUTS), work_id,
+                                             os.path.join(output_dir, "letters.docx"))
+
+    def autodoc_generate():
+        generator = DocumentGenerator(DataFetcher(DATABASE_PATH))
+        for n, firm in enumerate(firm_names):
+            data = dict(SYNTHETIC_INPUTS, work_id=work_id, firm_name=firm)
+            generator.generate(template_path, data, os.path.join(output_dir, f"autodoc_{n}.docx"), is_firm_specific=True)
+
+    return (
+        ("replace_placeholders", replace_placeholders),
+        ("generate_letters_for_firms", generate_letters_for_firms),
+        ("DocumentGenerator.generate", autodoc_generate),
+    )
+
+
+def run_benchmark(firm_counts=DEFAULT_FIRM_COUNTS, repeat=3, paragraphs=50, tables=2, table_rows=10,
+                  headers=True, placeholders_per_paragraph=2, cases=None, progress=print):
+    """
+    Runs every case for every firm count and returns the result document
+    ({'created', 'environment', 'config', 'results': [...]}). cases limits
+    the run to the named cases.
+    """
+    db_manager.create_tables()
+    config = {"firm_counts": list(firm_counts), "repeat": repeat, "paragraphs": paragraphs, "tables": tables,
+              "table_rows": table_rows, "headers": headers, "placeholders_per_paragraph": placeholders_per_paragraph}
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = build_synthetic_template(os.path.join(temp_dir, "benchmark_template.docx"), paragraphs, tables,
+                                                 table_rows, headers, placeholders_per_paragraph)
+        try:
+            for firm_count in firm_counts:
+                work_id, firm_names = create_synthetic_work(firm_count)
+                try:
+                    for name, func in _cases(template_path, work_id, firm_names, temp_dir):
+                        if cases and name not in cases:
+                            continue
+                        result = dict(case=name, firms=firm_count, **measure(func, repeat))
+                        results.append(result)
+                        if progress:
+                            progress(f"{name:<28} {firm_count:>4} firms  {result['wall_s']:>9.4f} s  "
+                                     f"{result['peak_kib']:>10.1f} KiB  {result['sql']:>6} SQL")
+                finally:
+                    delete_synthetic_work(work_id, firm_names)
+        finally:
+            # The processors catalogued the temporary template; its entry must not outlive it
+            forget_template(template_path)
+    return {
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": config,
+        "results": results,
+    }
+
+
+def save_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, tolerance=0.25):
+    """
+    Returns a list of {'case', 'firms', 'metric', 'baseline', 'current'}
+    regressions: wall time or peak memory more than tolerance above the
+    baseline, or any increase in SQL statements. Cases missing from either
+    run are ignored.
+    """
+    baseline_by_key = {(r["case"], r["firms"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = baseline_by_key.get((result["case"], result["firms"]))
+        if before is None:
+            continue
+        for metric, limit in (("wall_s", before["wall_s"] * (1 + tolerance)),
+                              ("peak_kib", before["peak_kib"] * (1 + tolerance)),
+                              ("sql", before["sql"])):
+            if result[metric] > limit:
+                regressions.append({"case": result["case"], "firms": result["firms"], "metric": metric,
+                                    "baseline": before[metric], "current": result[metric]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark document generation.")
+    parser.add_argument("--firms", type=int, nargs="+", default=list(DEFAULT_FIRM_COUNTS), help="firm counts to run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is reported)")
+    parser.add_argument("--paragraphs", type=int, default=50)
+    parser.add_argument("--tables", type=int, default=2)
+    parser.add_argument("--table-rows", type=int, default=10)
+    parser.add_argument("--placeholders", type=int, default=2, help="placeholders per paragraph")
+    parser.add_argument("--no-headers", action="store_true")
+    parser.add_argument("--case", action="append", help="only run this case (repeatable)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a regression is reported")
+    args = parser.parse_args(argv)
+
+    if any(count < 1 or count > 200 for count in args.firms):
+        parser.error("firm counts must be between 1 and 200")
+
+    results = run_benchmark(args.firms, args.repeat, args.paragraphs, args.tables, args.table_rows,
+                            not args.no_headers, args.placeholders, args.case)
+    if args.output:
+        save_results(results, args.output)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}:")
+            for r in regressions:
+                print(f"  {r['case']} ({r['firms']} firms) {r['metric']}: {r['baseline']} -> {r['current']}")
+            return 1
+        print(f"OK: no regressions against {args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Streaming output for multi-firm letter runs.
+
+generate_letters_for_firms writes each firm's letter out as soon as it is
+rendered, so memory stays the same whatever the number of firms:
+
+    merged  every letter in one .docx, separated by page breaks
+    split   one .docx per firm in a directory
+    zip     one .docx per firm appended to a zip archive
+
+Each letter is the template package with only its main document part and
+rendered header/footer parts replaced (CompiledTemplate.write_docx), so
+styles, numbering and media are the template's own. Merged output and
+merge_letters(), which stitches split or zipped letters back together,
+write all letters into the template package the same way: every letter
+refers to the template's media, so the merged document holds a single
+copy of each, and a header or footer is written once per distinct
+rendering (see write_merged_letters).
+"""
+
+import copy
+import io
+import os
+import posixpath
+import re
+import zipfile
+from lxml import etree
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from .compiled_template import AddedPart, part_xml
+
+MERGED = "merged"
+SPLIT = "split"
+ZIP = "zip"
+OUTPUT_MODES = (MERGED, SPLIT, ZIP)
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]+')
+
+PAGE_BREAK_XML = (
+    '<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:r><w:br w:type="page"/></w:r></w:p>'
+)
+
+
+def safe_filename(text):
+    """text with characters that are not allowed in Windows file names replaced by "_"."""
+    return _UNSAFE_FILENAME_CHARS.sub("_", text).strip(" .") or "document"
+
+
+class _LetterWriter:
+    def __init__(self, stem):
+        self.stem = safe_filename(stem)
+        self.names = []
+
+    def _next_name(self, firm_name):
+        name = f"{self.stem}_{safe_filename(firm_name)}.docx"
+        if name in self.names:
+            name = f"{self.stem}_{safe_filename(firm_name)}_{len(self.names) + 1}.docx"
+        self.names.append(name)
+        return name
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SplitLetterWriter(_LetterWriter):
+    """Writes each letter as its own .docx file in directory."""
+
+    def __init__(self, directory, stem):
+        super().__init__(stem)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, compiled_template, firm_name, body, parts=None):
+        path = os.path.join(self.directory, self._next_name(firm_name))
+        compiled_template.write_docx(body, path, parts)
+        return path
+
+    def open_letter(self, name):
+        return open(os.path.join(self.directory, name), "rb")
+
+
+class ZipLetterWriter(_LetterWriter):
+    """Appends each letter as a .docx entry to the zip archive at zip_path."""
+
+    def __init__(self, zip_path, stem):
+        super().__init__(stem)
+        self.zip_path = zip_path
+        # The letters are already deflated; storing them avoids compressing twice
+        self._archive = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED)
+
+    def write(self, compiled_template, firm_name, body, parts=None):
+        name = self._next_name(firm_name)
+        with self._archive.open(name, "w") as entry:
+            compiled_template.write_docx(body, entry, parts)
+        return name
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def open_letter(self, name):
+        with zipfile.ZipFile(self.zip_path) as archive:
+            return io.BytesIO(archive.read(name))
+
+
+def _read_letter(compiled_template, letter):
+    # (body children, {name: XML bytes} of the header/footer parts the letter rendered)
+    with zipfile.ZipFile(letter) as package:
+        root = etree.fromstring(package.read(compiled_template.main_part_name))
+        parts = {name: package.read(name) for name, part in compiled_template.parts.items() if part.slots}
+    return list(root.find(qn('w:body'))), parts
+
+
+class _MergedSections:
+    """
+    Header and footer parts of a merged letter run. Letters whose rendered
+    part is identical share one copy; the first version of each part
+    replaces the template's, later versions are added as new parts.
+    """
+
+    def __init__(self, compiled_template):
+        self.template = compiled_template
+        self.parts = {}
+        self.added_parts = []
+        self._versions = {}
+        self._names_by_rId = {part.rId: name for name, part in compiled_template.parts.items()}
+        self._rIds = set(compiled_template.document.part.rels)
+
+    def _added_part(self, source):
+        stem, extension = posixpath.splitext(source)
+        stem = stem.rstrip("0123456789")
+        n = len(self.added_parts) + 1
+        while f"{stem}{n}{extension}" in self.template.package_names or f"{stem}{n}{extension}" in self.parts:
+            n += 1
+        rel_number = len(self._rIds) + 1
+        while f"rId{rel_number}" in self._rIds:
+            rel_number += 1
+        added = AddedPart(f"{stem}{n}{extension}", source, f"rId{rel_number}")
+        self._rIds.add(added.rId)
+        self.added_parts.append(added)
+        return added
+
+    def references(self, rendered_parts):
+        """{template part name: rId} of the parts carrying a letter's rendered headers and footers."""
+        references = {}
+        for name, root in rendered_parts.items():
+            xml = part_xml(root)
+            rId = self._versions.get((name, xml))
+            if rId is None:
+                if name not in self.parts:
+                    rId = self.template.parts[name].rId
+                    self.parts[name] = xml
+                else:
+                    added = self._added_part(name)
+                    rId = added.rId
+                    self.parts[added.name] = xml
+                self._versions[name, xml] = rId
+            references[name] = rId
+        return references
+
+    def point_to(self, element, references):
+        """Points the header/footer references of the section properties in element at references."""
+        for reference in element.iter(qn('w:headerReference'), qn('w:footerReference')):
+            name = self._names_by_rId.get(reference.get(qn('r:id')))
+            if name in references:
+                reference.set(qn('r:id'), references[name])
+        return element
+
+    def section_break(self, section_properties, references):
+        """A paragraph ending a letter's section, with its own headers and footers."""
+        section_properties = self.point_to(copy.deepcopy(section_properties), references)
+        paragraph = parse_xml(f'<w:p {nsdecls("w")}><w:pPr/></w:p>')
+        paragraph.pPr.append(section_properties)
+        return paragraph
+
+
+def write_merged_letters(compiled_template, letters, output_path):
+    """
+    Writes the letters ((body, rendered header/footer parts) pairs, e.g. from
+    rendered bodies and render_parts()), in order and separated by page
+    breaks, into one document at output_path. Each body is serialised as it
+    is consumed, and every letter refers to the template's own media, so the
+    document holds a single copy of each whatever the number of letters.
+
+    Headers and footers are rendered per letter. Identical ones, such as a
+    header with only work placeholders, are written once and the letters
+    stay in one section. A letter whose header or footer differs from the
+    previous letter's, e.g. through <<FIRM_NAME>>, starts a new section
+    with its own copy.
+    """
+    sections = _MergedSections(compiled_template)
+    template_section = compiled_template.document.element.body.find(qn('w:sectPr'))
+
+    def children():
+        previous = {}
+        for n, (body, rendered_parts) in enumerate(letters):
+            references = sections.references(rendered_parts)
+            if n and (references == previous or template_section is None):
+                yield parse_xml(PAGE_BREAK_XML)
+            elif n:
+                yield sections.section_break(template_section, previous)
+            for child in body:
+                if child.tag != qn('w:sectPr'):
+                    yield sections.point_to(child, references)
+            previous = references
+        if template_section is not None:
+            yield sections.point_to(copy.deepcopy(template_section), previous)
+
+    compiled_template.write_docx(children(), output_path, sections.parts, sections.added_parts)
+    return output_path
+
+
+def merge_letters(compiled_template, writer, output_path):
+    """
+    Writes the letters of a closed writer into one document at output_path
+    (see write_merged_letters). Only one letter is held in memory at a time.
+    """
+    def letters():
+        for name in writer.names:
+            with writer.open_letter(name) as letter:
+                yield _read_letter(compiled_template, letter)
+
+    return write_merged_letters(compiled_template, letters(), output_path)
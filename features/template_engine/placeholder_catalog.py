@@ -0,0 +1,218 @@
+"""
+Persistent placeholder catalog for .docx templates.
+
+The placeholders of each template (user input {{x}}, work [X], firm <<X>>
+and the special work placeholders such as [ALL_FIRMS_PG_DETAILS]) are stored
+in the template_catalog tables together with the paragraphs they occur in.
+An entry is reused while the file's mtime and size are unchanged; when they
+change, a template whose SHA-256 is already catalogued (a copy, a restore,
+a touched file) reuses that scan, and only new content is scanned.
+
+warm_up_catalog() indexes Templates/Letters and Templates/OfficeNotes so
+that selecting a template later only costs a stat() and two queries.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from config import DATABASE_PATH
+from database.connection import get_connection, transaction
+from features.AutodocGen.constants import LETTERS_TEMPLATE_DIR, OFFICE_NOTES_TEMPLATE_DIR
+from .document_scanner import iter_paragraphs
+
+USER = "user"
+WORK = "work"
+FIRM = "firm"
+SPECIAL = "special"
+
+PLACEHOLDER_PATTERNS = (
+    (USER, re.compile(r"\{\{([a-zA-Z0-9_.]+)\}\}")),
+    (WORK, re.compile(r"\[([A-Za-z0-9_]+)\]")),
+    (FIRM, re.compile(r"<<([A-Za-z0-9_]+)>>")),
+)
+
+# Work-level names that are generated rather than read from a works column.
+SPECIAL_PLACEHOLDERS = {"ALL_FIRMS_PG_DETAILS", "FIRM_PG_DETAILS", "ENQUIRY_TABLE", "CURRENT_DATE", "CURRENT_TIME"}
+
+MULTI_FIRM_IDENTIFIER = "MULTI_FIRM_IDENTIFIER"
+
+WARM_UP_DIRECTORIES = (LETTERS_TEMPLATE_DIR, OFFICE_NOTES_TEMPLATE_DIR)
+
+
+class CatalogEntry:
+    """Placeholders of one template; locations maps (kind, name) to 'part#paragraph' strings."""
+
+    def __init__(self, path, locations, is_multi_firm):
+        self.path = path
+        self.locations = locations
+        self.is_multi_firm = is_multi_firm
+
+    def names(self, *kinds):
+        return {name for kind, name in self.locations if kind in kinds}
+
+    @property
+    def user(self):
+        return self.names(USER)
+
+    @property
+    def work(self):
+        """All [X] names, special ones included, as the template engine reports them."""
+        return self.names(WORK, SPECIAL)
+
+    @property
+    def firm(self):
+        return self.names(FIRM)
+
+    @property
+    def special(self):
+        return self.names(SPECIAL)
+
+
+def _catalog_path(template_path):
+    return os.path.normcase(os.path.abspath(template_path))
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_template(template_path):
+    """Scans a template and returns its (locations, is_multi_firm)."""
+    locations = {}
+    is_multi_firm = False
+    for part, index, text in iter_paragraphs(template_path):
+        if MULTI_FIRM_IDENTIFIER in text:
+            is_multi_firm = True
+        for kind, pattern in PLACEHOLDER_PATTERNS:
+            for name in pattern.findall(text):
+                if kind == WORK and name in SPECIAL_PLACEHOLDERS:
+                    kind_for_name = SPECIAL
+                else:
+                    kind_for_name = kind
+                locations.setdefault((kind_for_name, name), []).append(f"{part}#{index}")
+    return locations, is_multi_firm
+
+
+def _load_locations(cursor, template_id):
+    cursor.execute("SELECT kind, name, locations FROM template_catalog_placeholders WHERE template_id = ?", (template_id,))
+    return {(kind, name): json.loads(locs) for kind, name, locs in cursor.fetchall()}
+
+
+def _store(cursor, path, stat, sha256, locations, is_multi_firm):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cursor.execute("""
+        INSERT INTO template_catalog (path, mtime_ns, size, sha256, is_multi_firm, scanned_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            mtime_ns = excluded.mtime_ns, size = excluded.size, sha256 = excluded.sha256,
+            is_multi_firm = excluded.is_multi_firm, scanned_at = excluded.scanned_at
+    """, (path, stat.st_mtime_ns, stat.st_size, sha256, int(is_multi_firm), now))
+    cursor.execute("SELECT id FROM template_catalog WHERE path = ?", (path,))
+    template_id = cursor.fetchone()[0]
+    cursor.execute("DELETE FROM template_catalog_placeholders WHERE template_id = ?", (template_id,))
+    cursor.executemany(
+        "INSERT INTO template_catalog_placeholders (template_id, kind, name, locations) VALUES (?, ?, ?, ?)",
+        [(template_id, kind, name, json.dumps(locs)) for (kind, name), locs in locations.items()]
+    )
+
+
+def get_template_placeholders(template_path, db_path=None):
+    """
+    Returns the CatalogEntry for template_path, scanning the file only when
+    neither its mtime/size nor its content hash is already catalogued.
+    """
+    db_path = db_path or DATABASE_PATH
+    path = _catalog_path(template_path)
+    stat = os.stat(path)
+
+    cursor = get_connection(db_path).cursor()
+    cursor.execute("SELECT id, mtime_ns, size, is_multi_firm FROM template_catalog WHERE path = ?", (path,))
+    row = cursor.fetchone()
+    if row and row[1] == stat.st_mtime_ns and row[2] == stat.st_size:
+        return CatalogEntry(path, _load_locations(cursor, row[0]), bool(row[3]))
+
+    sha256 = _file_sha256(path)
+    cursor.execute("SELECT id, is_multi_firm FROM template_catalog WHERE sha256 = ? LIMIT 1", (sha256,))
+    same_content = cursor.fetchone()
+    if same_content:
+        locations, is_multi_firm = _load_locations(cursor, same_content[0]), bool(same_content[1])
+    else:
+        locations, is_multi_firm = scan_template(path)
+
+    with transaction(db_path) as write_cursor:
+        _store(write_cursor, path, stat, sha256, locations, is_multi_firm)
+    return CatalogEntry(path, locations, is_multi_firm)
+
+
+def find_templates_using(name, kind=None, db_path=None):
+    """Returns the catalogued template paths that contain placeholder name."""
+    sql = """SELECT DISTINCT tc.path
+             FROM template_catalog_placeholders tcp
+             JOIN template_catalog tc ON tc.id = tcp.template_id
+             WHERE tcp.name = ?"""
+    params = [name]
+    if kind:
+        sql += " AND tcp.kind = ?"
+        params.append(kind)
+    cursor = get_connection(db_path or DATABASE_PATH).execute(sql + " ORDER BY tc.path", params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _delete_entries(db_path, template_ids):
+    with transaction(db_path) as write_cursor:
+        write_cursor.executemany("DELETE FROM template_catalog_placeholders WHERE template_id = ?", template_ids)
+        write_cursor.executemany("DELETE FROM template_catalog WHERE id = ?", template_ids)
+
+
+def _prune_missing(db_path):
+    cursor = get_connection(db_path).execute("SELECT id, path FROM template_catalog")
+    missing = [(template_id,) for template_id, path in cursor.fetchall() if not os.path.exists(path)]
+    if missing:
+        _delete_entries(db_path, missing)
+    return len(missing)
+
+
+def forget_template(template_path, db_path=None):
+    """Removes the catalog entry for template_path, e.g. for a temporary template about to be deleted."""
+    db_path = db_path or DATABASE_PATH
+    cursor = get_connection(db_path).execute("SELECT id FROM template_catalog WHERE path = ?", (_catalog_path(template_path),))
+    entries = cursor.fetchall()
+    if entries:
+        _delete_entries(db_path, entries)
+    return bool(entries)
+
+
+def warm_up_catalog(directories=WARM_UP_DIRECTORIES, db_path=None):
+    """
+    Catalogs every .docx under directories and drops entries for files that
+    no longer exist. Returns the number of templates checked.
+    """
+    db_path = db_path or DATABASE_PATH
+    _prune_missing(db_path)
+    checked = 0
+    for directory in directories:
+        for dir_path, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                # "~$" files are Word's lock files for open documents.
+                if not file_name.lower().endswith(".docx") or file_name.startswith("~$"):
+                    continue
+                try:
+                    get_template_placeholders(os.path.join(dir_path, file_name), db_path)
+                    checked += 1
+                except Exception as e:
+                    print(f"Could not catalog template {file_name}: {e}")
+    return checked
+
+
+def start_catalog_warm_up(directories=WARM_UP_DIRECTORIES, db_path=None):
+    """Runs warm_up_catalog on a daemon thread and returns the thread."""
+    thread = threading.Thread(target=warm_up_catalog, args=(directories, db_path), daemon=True, name="template-catalog")
+    thread.start()
+    return thread
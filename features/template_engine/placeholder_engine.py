@@ -0,0 +1,132 @@
+"""
+Single-pass placeholder substitution shared by the template engine and
+AutodocGen.
+
+TOKEN_PATTERN matches all three placeholder forms in one alternation:
+[WORK_KEY] (AutodocGen also allows [DATE:DD-MM-YYYY]), <<FIRM_KEY>> and
+{{user_key}}. PlaceholderEngine scans a text once, asks its resolver for
+each token and assembles the output with a single join. Resolved values are
+memoised per token, so a placeholder that repeats across a document is
+only resolved once; hits and misses count how often the memo was used.
+"""
+
+import re
+from features.template_engine.special_placeholder_handler import evaluate_special_placeholder
+
+TOKEN_PATTERN = re.compile(
+    r"\[(?P<work>[A-Za-z0-9_:-]+)\]"
+    r"|<<(?P<firm>[A-Za-z0-9_]+)>>"
+    r"|\{\{(?P<user>[a-zA-Z0-9_.]+)\}\}"
+)
+
+# Token kinds, named after the groups of TOKEN_PATTERN.
+WORK = "work"
+FIRM = "firm"
+USER = "user"
+
+# Keys the template engine accepts inside [...]; AutodocGen's [DATE:...]
+# format tokens are left alone there, as before.
+_WORK_KEY = re.compile(r"[A-Za-z0-9_]+\Z")
+
+_MISSING = object()
+
+
+class PlaceholderEngine:
+    """
+    resolve(kind, key, token) returns the replacement string for a token,
+    or None to leave the token in the text unchanged.
+    """
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+        self._resolved = {}
+        self.hits = 0
+        self.misses = 0
+
+    def replace(self, text):
+        parts = []
+        last = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            token = match.group(0)
+            value = self._resolved.get(token, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                kind = match.lastgroup
+                value = self._resolved[token] = self._resolve(kind, match.group(kind), token)
+            else:
+                self.hits += 1
+            if value is None:
+                continue
+            parts.append(text[last:match.start()])
+            parts.append(value)
+            last = match.end()
+        if not parts:
+            return text
+        parts.append(text[last:])
+        return "".join(parts)
+
+
+class CaseNormalisedLookup:
+    """
+    Dictionary lookup that falls back to a case-normalised match. An exact
+    key always wins; among keys differing only in case, the one already in
+    normalised form is preferred.
+    """
+
+    def __init__(self, mapping, normalise):
+        self._exact = mapping
+        self._normalise = normalise
+        self._normalised = {}
+        for key, value in mapping.items():
+            if not isinstance(key, str):
+                continue
+            normalised_key = normalise(key)
+            if key == normalised_key or normalised_key not in self._normalised:
+                self._normalised[normalised_key] = value
+
+    def get(self, key, default=_MISSING):
+        value = self._exact.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._normalised.get(self._normalise(key), default)
+        return value
+
+
+def _is_filled(value):
+    return value is not None and str(value).strip() != ""
+
+
+def build_template_engine(user_data, placeholder_data):
+    """
+    Returns the PlaceholderEngine for a template engine document.
+
+    [KEY] comes from the work placeholders, then from the user data;
+    <<KEY>> from the firm placeholders; {{key}} from the user data, then
+    the work/firm placeholders, then the special COST placeholders. Lookups
+    ignore case. Unknown or empty placeholders stay in the text so they are
+    easy to spot.
+    """
+    placeholders = CaseNormalisedLookup(placeholder_data, str.upper)
+    user_values = CaseNormalisedLookup(user_data, str.lower)
+
+    def resolve(kind, key, token):
+        if kind == WORK:
+            if not _WORK_KEY.match(key):
+                return None
+            value = placeholders.get(token)
+            if value is _MISSING:
+                value = user_values.get(key, None)
+        elif kind == FIRM:
+            value = placeholders.get(token, None)
+        else:
+            value = user_values.get(key, None)
+            if value is None:
+                value = placeholders.get(f"[{key}]", None)
+            if value is None:
+                value = placeholders.get(f"<<{key}>>", None)
+            if value is None:
+                value = evaluate_special_placeholder(key, user_data)
+            if str(value) == token:
+                return None
+        return str(value) if _is_filled(value) else None
+
+    return PlaceholderEngine(resolve)
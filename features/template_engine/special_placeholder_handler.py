@@ -1,46 +1,145 @@
 import re
-from datetime import datetime
+from functools import lru_cache
 from decimal import Decimal, ROUND_HALF_UP
-from utils.helpers import format_currency_inr, number_to_indian_words
+from utils.helpers import number_to_indian_words
+from utils.inr_format import format_inr
 
+# Special placeholders are a base cost key followed by "_"-separated
+# modifiers, e.g. COST_1.18_00_IN_WORDS: the value of COST multiplied by
+# 1.18, rounded to the nearest 100 and written out in words. Each name is
+# compiled once into a CostExpression; later occurrences only look the base
+# value up and apply the prepared multiplier, rounding and output format.
+#
+# Modifiers (unknown parts are ignored):
+#   1.18      multiply by the number
+#   18PCT     take that percentage of the value
+#   GST       add 18% GST; GST12 adds 12%
+#   0 / 00    round to the nearest 10 / 100 (after all multipliers)
+#   IN_WORDS  Indian-English words ("... rupees only")
+#   LAKHS     amount in lakhs, e.g. "12.35 Lakhs"; CRORES likewise
+# New modifiers are added with register_modifier().
 
-def evaluate_special_placeholder(placeholder_name, data):
+DEFAULT_GST_RATE = Decimal(18)
 
-    # Only process placeholders starting with "COST"
-    if placeholder_name.startswith("COST"):
-        parts = placeholder_name.split("_")
-        base_cost_key = parts[0]  # e.g., "COST"
+_UNITS = {
+    "LAKHS": (Decimal(100000), "Lakhs"),
+    "CRORES": (Decimal(10000000), "Crores"),
+}
 
-        # Get the base cost value
-        base_value = data.get(base_cost_key)
-        if base_value is None or base_value == "":
-            return f"[{placeholder_name}]"  # Return original if base not found or empty
+_TWO_PLACES = Decimal("0.01")
+
+
+class CostExpression:
+    """A compiled special placeholder: base key, multiplier chain, rounding and output format."""
 
+    def __init__(self, name):
+        parts = name.split("_")
+        self.name = name
+        self.base_key = parts[0]  # e.g., "COST"
+        self.modifiers = parts[1:]
+        self.multiplier = Decimal(1)
+        self.round_to_nearest = None
+        self.output = format_inr
+
+    def multiply(self, factor):
+        self.multiplier *= factor
+
+    def evaluate(self, data):
+        """Returns the formatted value, or None when the base value is missing or not numeric."""
+        base_value = data.get(self.base_key)
+        if base_value is None or base_value == "":
+            return None
         try:
-            result = Decimal(str(base_value))
+            result = _to_decimal(str(base_value))
         except Exception:
-            return f"[{placeholder_name}]"  # Return original if base is not numeric
-
-        format_as_words = False
-        round_to_nearest = None
-
-        for part in parts[1:]:
-            if part == "IN" and "WORDS" in parts: # Check for IN_WORDS
-                format_as_words = True
-            elif part.strip() == "00": # Check for rounding to nearest 100
-                round_to_nearest = Decimal(100)
-            elif part.strip() == "0": # Check for rounding to nearest 10
-                round_to_nearest = Decimal(10)
-            elif part.replace('.', '', 1).isdigit(): # Check for numeric multiplier
-                result *= Decimal(part)
-
-        if round_to_nearest:
-            result = (result / round_to_nearest).to_integral_value(rounding=ROUND_HALF_UP) * round_to_nearest
-
-        if format_as_words:
-            return number_to_indian_words(float(result))
-        else:
-            return format_currency_inr(result)
+            return None
+
+        if self.multiplier != 1:
+            result *= self.multiplier
+        if self.round_to_nearest:
+            result = (result / self.round_to_nearest).to_integral_value(rounding=ROUND_HALF_UP) * self.round_to_nearest
+        return self.output(result)
+
+
+_MODIFIERS = []
+
+
+def register_modifier(pattern):
+    """
+    Decorator registering a modifier. pattern must match a whole modifier
+    part; the function receives the CostExpression being compiled and the
+    match object.
+    """
+    def decorator(func):
+        _MODIFIERS.append((re.compile(rf"(?:{pattern})\Z"), func))
+        compile_special_placeholder.cache_clear()
+        return func
+    return decorator
+
+
+@lru_cache(maxsize=256)
+def _to_decimal(text):
+    return Decimal(text)
+
+
+@lru_cache(maxsize=1024)
+def compile_special_placeholder(placeholder_name):
+    """Returns the CostExpression for a COST placeholder name, or None for any other name."""
+    # Only process placeholders starting with "COST"
+    if not placeholder_name.startswith("COST"):
+        return None
+
+    expression = CostExpression(placeholder_name)
+    for part in expression.modifiers:
+        part = part.strip()
+        for pattern, apply_modifier in _MODIFIERS:
+            match = pattern.match(part)
+            if match:
+                apply_modifier(expression, match)
+                break
+    return expression
+
+
+@register_modifier(r"IN")
+def _in_words(expression, match):
+    # IN_WORDS is split into two parts by the "_" separator
+    if "WORDS" in expression.modifiers:
+        expression.output = lambda value: number_to_indian_words(float(value))
+
+
+@register_modifier(r"0|00")
+def _round(expression, match):
+    expression.round_to_nearest = Decimal(10) ** len(match.group(0))
+
+
+@register_modifier(r"\d+\.?\d*|\.\d+")
+def _multiplier(expression, match):
+    expression.multiply(Decimal(match.group(0)))
+
+
+@register_modifier(r"(\d+(?:\.\d+)?)PCT")
+def _percent(expression, match):
+    expression.multiply(Decimal(match.group(1)) / 100)
+
+
+@register_modifier(r"GST(\d+(?:\.\d+)?)?")
+def _gst(expression, match):
+    rate = Decimal(match.group(1)) if match.group(1) else DEFAULT_GST_RATE
+    expression.multiply(1 + rate / 100)
+
+
+@register_modifier(r"LAKHS|CRORES")
+def _units(expression, match):
+    divisor, label = _UNITS[match.group(0)]
+    expression.output = lambda value: f"{(value / divisor).quantize(_TWO_PLACES, rounding=ROUND_HALF_UP)} {label}"
+
+
+def evaluate_special_placeholder(placeholder_name, data):
+    expression = compile_special_placeholder(placeholder_name)
+    if expression is not None:
+        result = expression.evaluate(data)
+        # Return original if base not found, empty or not numeric
+        return f"[{placeholder_name}]" if result is None else result
 
     # If not a COST-based placeholder, return from data or leave unchanged
     result = data.get(placeholder_name, f"[{placeholder_name}]")
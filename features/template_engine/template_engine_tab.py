@@ -3,6 +3,7 @@ from tkinter import ttk, filedialog, messagebox
 import os
 from datetime import datetime
 from features.template_engine.template_processor import TemplateProcessor
+from features.template_engine.letter_output import MERGED, ZIP
 from features.template_engine.data_manager import TemplateDataManager
 from features.template_engine.date_picker_widget import DatePickerWidget
 from utils.helpers import load_icon
@@ -125,6 +126,9 @@ class TemplateEngineTab(ttk.Frame):
         # Sort placeholders for consistent display
         sorted_placeholders = sorted(list(user_placeholders))
 
+        # Saved values and input history of every placeholder, read at once
+        saved_inputs = self.data_manager.load_template_data(self.template_path)
+
         row = 0
         for p_name in sorted_placeholders:
 
@@ -135,7 +139,7 @@ class TemplateEngineTab(ttk.Frame):
                 entry = DatePickerWidget(self.placeholder_inner_frame)
             else:
                 entry = ttk.Combobox(self.placeholder_inner_frame)
-                historical_data = self.data_manager.get_historical_data(self.template_path, p_name)
+                historical_data = saved_inputs.get(p_name, {}).get("history")
                 if historical_data:
                     entry['values'] = historical_data
             
@@ -150,7 +154,7 @@ class TemplateEngineTab(ttk.Frame):
         self.placeholder_canvas.config(scrollregion=self.placeholder_canvas.bbox("all"))
 
         # Attempt to load previously saved inputs for this template
-        self.load_inputs()
+        self.load_inputs(saved_inputs)
     
     def _create_widgets(self):
         """Create widgets in the form_frame instead of self"""
@@ -167,9 +171,13 @@ class TemplateEngineTab(ttk.Frame):
             messagebox.showwarning("No Work Selected", "Please select a work from the Works tab first.")
             return
 
+        filetypes = [("Word Documents", "*.docx")]
+        if self.firm_placeholders:
+            # Letters for many firms can be streamed into a zip, one .docx per firm
+            filetypes.append(("Zip of letters, one per firm", "*.zip"))
         output_file_path = filedialog.asksaveasfilename(
             defaultextension=".docx",
-            filetypes=[("Word Documents", "*.docx")],
+            filetypes=filetypes,
             initialfile=f"Filled_{os.path.basename(self.template_path)}"
         )
 
@@ -180,7 +188,8 @@ class TemplateEngineTab(ttk.Frame):
         values = {p_name: entry.get() for p_name, entry in self.placeholders.items()}
 
         try:
-            success, message = self.template_processor.replace_placeholders(self.template_path, values, self.work_id, output_file_path, self.firm_placeholders)
+            output_mode = ZIP if output_file_path.lower().endswith(".zip") else MERGED
+            success, message = self.template_processor.replace_placeholders(self.template_path, values, self.work_id, output_file_path, self.firm_placeholders, output_mode)
             if success:
                 messagebox.showinfo("Success", f"Document generated successfully to {output_file_path}")
             else:
@@ -200,17 +209,18 @@ class TemplateEngineTab(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Error saving inputs: {e}")
 
-    def load_inputs(self):
+    def load_inputs(self, loaded_data=None):
         if not self.template_path:
             return
         
         try:
-            loaded_data = self.data_manager.load_template_data(self.template_path)
+            if loaded_data is None:
+                loaded_data = self.data_manager.load_template_data(self.template_path)
             for p_name, entry in self.placeholders.items():
                 if p_name in loaded_data:
                     # Check if the data is in the new format (a dictionary)
                     if isinstance(loaded_data[p_name], dict):
-                        value = loaded_data[p_name].get("current", "")
+                        value = loaded_data[p_name].get("current") or ""
                     else:
                         # Assume old format (just the value)
                         value = loaded_data[p_name]
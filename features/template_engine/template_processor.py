@@ -1,68 +1,39 @@
+import os
 from docx import Document
 import re
 from features.template_engine.special_placeholder_handler import evaluate_special_placeholder
 from .work_data_provider import WorkDataProvider
+from .compiled_template import load_compiled_template
+from .placeholder_engine import build_template_engine
+from .placeholder_catalog import get_template_placeholders
+from .letter_output import MERGED, SPLIT, OUTPUT_MODES, SplitLetterWriter, ZipLetterWriter, merge_letters, write_merged_letters
 
 class TemplateProcessor:
     def __init__(self):
         pass
 
-    def extract_placeholders(self, doc_path):
-        document = Document(doc_path)
-        user_input_placeholders = set()
-        work_level_placeholders = set()
-        firm_level_placeholders = set()
-
-        def _extract_from_text(text_content):
-            # Find all user input placeholders: {{placeholder}}
-            found_user_input = re.findall(r"\{\{([a-zA-Z0-9_.]+)\}\}", text_content)
-            for p in found_user_input:
-                user_input_placeholders.add(p)
-            
-            # Find all work-level placeholders: [PLACEHOLDER]
-            found_work_level = re.findall(r"\[([A-Za-z0-9_]+)\]", text_content)
-            for p in found_work_level:
-                work_level_placeholders.add(p)
-            
-            # Find all firm-level placeholders: <<PLACEHOLDER>>
-            found_firm_level = re.findall(r"<<([A-Za-z0-9_]+)>>", text_content)
-            for p in found_firm_level:
-                firm_level_placeholders.add(p)
-            
-        # Extract from paragraphs in the main body
-        for paragraph in document.paragraphs:
-            _extract_from_text(paragraph.text)
-
-        # Extract from tables in the main body
-        for table in document.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        _extract_from_text(cell.text)
-
-        # Extract from headers and footers
-        for section in document.sections:
-            # Headers
-            header = section.header
-            for paragraph in header.paragraphs:
-                _extract_from_text(paragraph.text)
-            for table in header.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            _extract_from_text(cell.text)
-
-            # Footers
-            footer = section.footer
-            for paragraph in footer.paragraphs:
-                _extract_from_text(paragraph.text)
-            for table in footer.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            _extract_from_text(cell.text)
+    def _scan_placeholders(self, doc_path):
+        """
+        Returns the (user input, work-level, firm-level) placeholder names of
+        the template from the persistent placeholder catalog.
+        """
+        entry = get_template_placeholders(doc_path)
+        return entry.user, entry.work, entry.firm
 
-        # Filter for base placeholders only (for user input placeholders)
+    def _referenced_tokens(self, doc_path):
+        """
+        The "[KEY]" and "<<KEY>>" tokens the work data provider must resolve
+        for the template. {{key}} falls back to [KEY] and <<KEY>>, so user
+        input names are looked up in both forms.
+        """
+        user_input, work_level, firm_level = self._scan_placeholders(doc_path)
+        tokens = {f"[{name.upper()}]" for name in work_level | user_input}
+        tokens.update(f"<<{name.upper()}>>" for name in firm_level | user_input)
+        return tokens
+
+    @staticmethod
+    def _base_placeholders(user_input_placeholders):
+        """Filters out derived COST placeholders, leaving the ones the GUI asks for."""
         base_placeholders_for_gui = set()
         for p_name in user_input_placeholders:
             is_derived = False
@@ -75,206 +46,135 @@ class TemplateProcessor:
 
             if not is_derived:
                 base_placeholders_for_gui.add(p_name)
-        
+        return base_placeholders_for_gui
+
+    def extract_placeholders(self, doc_path):
+        user_input_placeholders, _, _ = self._scan_placeholders(doc_path)
         # For backward compatibility, return just the user input placeholders by default
         # New method extract_all_placeholders() can be used to get the full dictionary
-        return base_placeholders_for_gui
+        return self._base_placeholders(user_input_placeholders)
     
     def extract_all_placeholders(self, doc_path):
         """
         Enhanced version that returns all placeholder types for debugging and advanced use.
         Returns a dictionary with different placeholder types.
         """
-        document = Document(doc_path)
-        user_input_placeholders = set()
-        work_level_placeholders = set()
-        firm_level_placeholders = set()
-
-        def _extract_from_text(text_content):
-            # Find all user input placeholders: {{placeholder}}
-            found_user_input = re.findall(r"\{\{([a-zA-Z0-9_.]+)\}\}", text_content)
-            for p in found_user_input:
-                user_input_placeholders.add(p)
-            
-            # Find all work-level placeholders: [PLACEHOLDER]
-            found_work_level = re.findall(r"\[([A-Za-z0-9_]+)\]", text_content)
-            for p in found_work_level:
-                work_level_placeholders.add(p)
-            
-            # Find all firm-level placeholders: <<PLACEHOLDER>>
-            found_firm_level = re.findall(r"<<([A-Za-z0-9_]+)>>", text_content)
-            for p in found_firm_level:
-                firm_level_placeholders.add(p)
-            
-        # Extract from paragraphs in the main body
-        for paragraph in document.paragraphs:
-            _extract_from_text(paragraph.text)
-
-        # Extract from tables in the main body
-        for table in document.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        _extract_from_text(cell.text)
-
-        # Extract from headers and footers
-        for section in document.sections:
-            # Headers
-            header = section.header
-            for paragraph in header.paragraphs:
-                _extract_from_text(paragraph.text)
-            for table in header.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            _extract_from_text(cell.text)
-
-            # Footers
-            footer = section.footer
-            for paragraph in footer.paragraphs:
-                _extract_from_text(paragraph.text)
-            for table in footer.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            _extract_from_text(cell.text)
-
-        # Filter for base placeholders only (for user input placeholders)
-        base_placeholders_for_gui = set()
-        for p_name in user_input_placeholders:
-            is_derived = False
-            if p_name.startswith(("COST", "COSTAMC", "COSTRP", "COSTCON", "COSTCAMC")):
-                if re.search(r"_([0-9.]+)$|_IN_WORDS$|_0$|_00$", p_name):
-                    is_derived = True
-            
-            if p_name.startswith("DATE"):
-                is_derived = False
-
-            if not is_derived:
-                base_placeholders_for_gui.add(p_name)
-        
+        user_input_placeholders, work_level_placeholders, firm_level_placeholders = self._scan_placeholders(doc_path)
         # Return a dictionary with all placeholder types for advanced debugging
         return {
-            'user_input': base_placeholders_for_gui,
+            'user_input': self._base_placeholders(user_input_placeholders),
             'work_level': work_level_placeholders,
             'firm_level': firm_level_placeholders,
             'all_user_input': user_input_placeholders
         }
 
-    def generate_letters_for_firms(self, doc_path, data, work_id, output_path):
-        work_data_provider = WorkDataProvider(work_id)
-        firm_names = work_data_provider.get_firm_names_list().split(', ')
-        if not firm_names:
-            return False, "No firms found for this work."
+    def _render_firm_letters(self, compiled_template, doc_path, data, work_data_provider, firm_names):
+        """Yields (firm_name, rendered body, rendered header/footer parts) for each firm, one letter at a time."""
+        work_placeholder_data = work_data_provider.generate_placeholders(self._referenced_tokens(doc_path))
+        firm_columns = ['firm_name', 'pg_submitted', 'pg_no', 'submission_date', 'pg_amount', 'bank_name', 'bank_address']
 
-        master_document = Document()
-        for i, firm_name in enumerate(firm_names):
-            # Create a copy of the template for each firm
-            firm_document = Document(doc_path)
+        run_cache = {}
+        for firm_name in firm_names:
             firm_data = data.copy()
             firm_data['firm_name'] = firm_name # Add firm name to data
-            
-            # Get firm-specific placeholder data
-            firm_specific_work_data_provider = WorkDataProvider(work_id)
-            firm_placeholder_data = firm_specific_work_data_provider.generate_placeholders()
-            
-            # Update firm-specific data if needed
-            firm_doc_data = firm_specific_work_data_provider.get_firm_document_data(firm_name)
+
+            # Overlay the firm-level placeholders with this firm's data
+            firm_placeholder_data = dict(work_placeholder_data)
+            firm_doc_data = work_data_provider.get_firm_document_data(firm_name)
             if firm_doc_data:
-                # Update firm-level placeholders with specific firm's data
-                firm_columns = ['firm_name', 'pg_submitted', 'pg_no', 'submission_date', 'pg_amount', 'bank_name', 'bank_address']
                 for column in firm_columns:
                     if column in firm_doc_data:
                         firm_placeholder_data[f'<<{column.upper()}>>'] = firm_doc_data[column]
 
-            # Process all placeholders for this firm using two-pass system
-            for paragraph in firm_document.paragraphs:
-                self._replace_placeholders_two_pass(paragraph, firm_data, firm_placeholder_data)
-            for table in firm_document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            self._replace_placeholders_two_pass(paragraph, firm_data, firm_placeholder_data)
-            
-            # Process headers and footers for this firm
-            for section in firm_document.sections:
-                # Headers
-                header = section.header
-                for paragraph in header.paragraphs:
-                    self._replace_placeholders_two_pass(paragraph, firm_data, firm_placeholder_data)
-                for table in header.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            for paragraph in cell.paragraphs:
-                                self._replace_placeholders_two_pass(paragraph, firm_data, firm_placeholder_data)
-
-                # Footers
-                footer = section.footer
-                for paragraph in footer.paragraphs:
-                    self._replace_placeholders_two_pass(paragraph, firm_data, firm_placeholder_data)
-                for table in footer.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            for paragraph in cell.paragraphs:
-                                self._replace_placeholders_two_pass(paragraph, firm_data, firm_placeholder_data)
-
-            # Add the processed letter to the master document
-            for element in firm_document.element.body:
-                master_document.element.body.append(element)
-            
-            # Add a page break after each letter except the last one
-            if i < len(firm_names) - 1:
-                master_document.add_page_break()
+            engine = build_template_engine(firm_data, firm_placeholder_data)
+            yield firm_name, compiled_template.render_body(engine.replace, run_cache), compiled_template.render_parts(engine.replace, run_cache)
 
-        master_document.save(output_path)
+    def generate_letters_for_firms(self, doc_path, data, work_id, output_path, output_mode=MERGED, merge_path=None):
+        """
+        Generates one letter per firm of the work. The template is compiled
+        once and the work's placeholder data fetched once; each letter is a
+        copy of the compiled body with only its placeholder paragraphs
+        rewritten.
+
+        output_mode "merged" streams every letter into the output_path
+        document, sharing the template's media; headers and footers that
+        differ between firms give each letter its own section.
+        "split" writes each letter to its own .docx in the
+        output_path directory and "zip" appends it to the output_path zip
+        archive, as soon as it is rendered (see letter_output). With those
+        two, merge_path optionally receives all letters stitched into one
+        document as well.
+        """
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode}")
+
+        work_data_provider = WorkDataProvider(work_id)
+        firm_names = [doc.get('firm_name') for doc in work_data_provider.firm_documents if doc.get('firm_name')]
+        if not firm_names:
+            return False, "No firms found for this work."
+
+        compiled_template = load_compiled_template(doc_path)
+        letters = self._render_firm_letters(compiled_template, doc_path, data, work_data_provider, firm_names)
+
+        if output_mode != MERGED:
+            stem = os.path.splitext(os.path.basename(doc_path))[0]
+            if output_mode == SPLIT:
+                writer = SplitLetterWriter(output_path, stem)
+            else:
+                writer = ZipLetterWriter(output_path, stem)
+            with writer:
+                for firm_name, firm_body, firm_parts in letters:
+                    writer.write(compiled_template, firm_name, firm_body, firm_parts)
+            if merge_path:
+                merge_letters(compiled_template, writer, merge_path)
+            return True, f"{len(writer.names)} letters written to {output_path}."
+
+        write_merged_letters(compiled_template, ((firm_body, firm_parts) for _, firm_body, firm_parts in letters), output_path)
         return True, "Letters generated successfully."
 
-    def replace_placeholders(self, doc_path, data, work_id, output_path, firm_placeholders):
+    def replace_placeholders(self, doc_path, data, work_id, output_path, firm_placeholders, output_mode=MERGED):
         if firm_placeholders:
-            return self.generate_letters_for_firms(doc_path, data, work_id, output_path)
+            return self.generate_letters_for_firms(doc_path, data, work_id, output_path, output_mode)
 
         document = Document(doc_path)
         work_data_provider = WorkDataProvider(work_id)
         
-        # Get consolidated placeholder data for two-pass replacement
-        placeholder_data = work_data_provider.generate_placeholders()
-        
-        # Two-pass replacement system:
-        # Pass 1: Replace work-level [PLACEHOLDER] tokens
-        # Pass 2: Replace firm-level <<PLACEHOLDER>> tokens
-        
+        # Placeholder data and lookup tables are built once for the document
+        placeholder_data = work_data_provider.generate_placeholders(self._referenced_tokens(doc_path))
+        engine = build_template_engine(data, placeholder_data)
+
         # Process paragraphs in the main body
         for paragraph in document.paragraphs:
-            self._replace_placeholders_two_pass(paragraph, data, placeholder_data)
+            self._replace_placeholders_in_paragraph(paragraph, engine)
 
         # Process tables in the main body
         for table in document.tables:
             for row in table.rows:
                 for cell in row.cells:
                     for paragraph in cell.paragraphs:
-                        self._replace_placeholders_two_pass(paragraph, data, placeholder_data)
+                        self._replace_placeholders_in_paragraph(paragraph, engine)
 
         # Process headers and footers
         for section in document.sections:
             # Headers
             header = section.header
             for paragraph in header.paragraphs:
-                self._replace_placeholders_two_pass(paragraph, data, placeholder_data)
+                self._replace_placeholders_in_paragraph(paragraph, engine)
             for table in header.tables:
                 for row in table.rows:
                     for cell in row.cells:
                         for paragraph in cell.paragraphs:
-                            self._replace_placeholders_two_pass(paragraph, data, placeholder_data)
+                            self._replace_placeholders_in_paragraph(paragraph, engine)
 
             # Footers
             footer = section.footer
             for paragraph in footer.paragraphs:
-                self._replace_placeholders_two_pass(paragraph, data, placeholder_data)
+                self._replace_placeholders_in_paragraph(paragraph, engine)
             for table in footer.tables:
                 for row in table.rows:
                     for cell in row.cells:
                         for paragraph in cell.paragraphs:
-                            self._replace_placeholders_two_pass(paragraph, data, placeholder_data)
+                            self._replace_placeholders_in_paragraph(paragraph, engine)
 
         document.save(output_path)
         return True, "Document generated successfully."
@@ -319,150 +219,16 @@ class TemplateProcessor:
             if run_data['style']:
                 new_run.style = run_data['style']
 
-    def _replace_placeholders_two_pass(self, paragraph, user_data, placeholder_data):
+    def _replace_placeholders_in_paragraph(self, paragraph, engine):
         """
-        Enhanced merge routine that performs two passes:
-        1. Replace work-level [PLACEHOLDER] tokens
-        2. Replace firm-level <<PLACEHOLDER>> tokens
-        Fallback: unknown placeholders remain untouched for easier debugging
+        Replaces the [PLACEHOLDER], <<PLACEHOLDER>> and {{placeholder}} tokens
+        of a paragraph in one pass. Paragraphs without a replaced token keep
+        their runs; unknown placeholders remain untouched for easier debugging.
         """
         full_text = "".join([run.text for run in paragraph.runs])
-        
-        # Pass 1: Replace work-level [PLACEHOLDER] tokens
-        full_text = self._replace_work_level_placeholders(full_text, user_data, placeholder_data)
-        
-        # Pass 2: Replace firm-level <<PLACEHOLDER>> tokens  
-        full_text = self._replace_firm_level_placeholders(full_text, placeholder_data)
-        
-        # Pass 3: Replace user input {{placeholder}} tokens (existing functionality)
-        full_text = self._replace_user_input_placeholders(full_text, user_data, placeholder_data)
-        
-        # Update paragraph with the processed text
-        self._update_paragraph_text(paragraph, full_text)
-    
-    def _replace_work_level_placeholders(self, text, user_data, placeholder_data):
-        """
-        Pass 1: Replace work-level [PLACEHOLDER] tokens
-        """
-        # Find all work-level placeholders: [PLACEHOLDER]
-        matches = list(re.finditer(r'\[([A-Za-z0-9_]+)\]', text))
-        
-        if not matches:
-            return text
-            
-        result = text
-        # Process matches in reverse order to avoid index shifting
-        for match in reversed(matches):
-            placeholder_full = match.group(0)  # [PLACEHOLDER]
-            placeholder_key = match.group(1)   # PLACEHOLDER
-            
-            # Try to find replacement value
-            replacement_value = None
-            
-            # Check in placeholder_data first (generated from WorkDataProvider)
-            if placeholder_full in placeholder_data:
-                replacement_value = placeholder_data[placeholder_full]
-            # Check in user_data as fallback
-            elif placeholder_key in user_data:
-                replacement_value = user_data[placeholder_key]
-            elif placeholder_key.lower() in user_data:
-                replacement_value = user_data[placeholder_key.lower()]
-            
-            # Replace if value found, otherwise leave unchanged for debugging
-            if replacement_value is not None and str(replacement_value).strip() != "":
-                result = result[:match.start()] + str(replacement_value) + result[match.end():]
-            # If no replacement found, leave the placeholder untouched for debugging
-            
-        return result
-    
-    def _replace_firm_level_placeholders(self, text, placeholder_data):
-        """
-        Pass 2: Replace firm-level <<PLACEHOLDER>> tokens
-        This may loop over firms or pick a default firm based on placeholder_data
-        """
-        # Find all firm-level placeholders: <<PLACEHOLDER>>
-        matches = list(re.finditer(r'<<([A-Za-z0-9_]+)>>', text))
-        
-        if not matches:
-            return text
-            
-        result = text
-        # Process matches in reverse order to avoid index shifting
-        for match in reversed(matches):
-            placeholder_full = match.group(0)  # <<PLACEHOLDER>>
-            placeholder_key = match.group(1)   # PLACEHOLDER
-            
-            # Try to find replacement value
-            replacement_value = None
-            
-            # Check in placeholder_data (generated from WorkDataProvider)
-            if placeholder_full in placeholder_data:
-                replacement_value = placeholder_data[placeholder_full]
-            # Try with different case variations
-            elif f'<<{placeholder_key.upper()}>>' in placeholder_data:
-                replacement_value = placeholder_data[f'<<{placeholder_key.upper()}>>']  
-            elif f'<<{placeholder_key.lower()}>>' in placeholder_data:
-                replacement_value = placeholder_data[f'<<{placeholder_key.lower()}>>']    
-            
-            # Replace if value found, otherwise leave unchanged for debugging
-            if replacement_value is not None and str(replacement_value).strip() != "":
-                result = result[:match.start()] + str(replacement_value) + result[match.end():]
-            # If no replacement found, leave the placeholder untouched for debugging
-            
-        return result
-    
-    def _replace_user_input_placeholders(self, text, user_data, placeholder_data=None):
-        """
-        Pass 3: Replace user input {{placeholder}} tokens with enhanced database field matching
-        """
-        # Find all user input placeholders: {{placeholder}}
-        matches = list(re.finditer(r'\{\{([a-zA-Z0-9_.]+)\}\}', text))
-        
-        if not matches:
-            return text
-            
-        result = text
-        # Process matches in reverse order to avoid index shifting
-        for match in reversed(matches):
-            placeholder_full = match.group(0)  # {{placeholder}}
-            placeholder_key = match.group(1)   # placeholder
-            
-            # Try multiple replacement strategies in order of priority
-            replacement_value = None
-            
-            # Strategy 1: Check user_data first (highest priority)
-            if placeholder_key in user_data:
-                replacement_value = user_data[placeholder_key]
-            elif placeholder_key.lower() in user_data:
-                replacement_value = user_data[placeholder_key.lower()]
-            elif placeholder_key.upper() in user_data:
-                replacement_value = user_data[placeholder_key.upper()]
-            
-            # Strategy 2: Check for database field matches if placeholder_data is available
-            if replacement_value is None and placeholder_data:
-                # Try as work-level placeholder format
-                work_key = f'[{placeholder_key.upper()}]'
-                if work_key in placeholder_data:
-                    replacement_value = placeholder_data[work_key]
-                
-                # Try as firm-level placeholder format
-                if replacement_value is None:
-                    firm_key = f'<<{placeholder_key.upper()}>>'  
-                    if firm_key in placeholder_data:
-                        replacement_value = placeholder_data[firm_key]
-            
-            # Strategy 3: Use existing special placeholder handler (COST calculations, etc.)
-            if replacement_value is None:
-                replacement_value = evaluate_special_placeholder(placeholder_key, user_data)
-            
-            # Replace if value found and not empty, otherwise leave unchanged for debugging
-            if replacement_value is not None and str(replacement_value).strip() != "":
-                # Check if it's returning the original placeholder (no replacement found)
-                if str(replacement_value) != placeholder_full:
-                    result = result[:match.start()] + str(replacement_value) + result[match.end():]
-            # If no replacement found, leave the placeholder untouched for debugging
-            
-        return result
+        new_text = engine.replace(full_text)
+        if new_text != full_text:
+            self._update_paragraph_text(paragraph, new_text)
     
     def _update_paragraph_text(self, paragraph, new_text):
         """
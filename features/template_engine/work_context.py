@@ -0,0 +1,83 @@
+"""
+Snapshot of the database rows a work's documents are generated from.
+
+WorkContextSnapshot.load() reads the work, all of its firm_documents rows,
+the registration rows of every firm involved and the names of the firms that
+quoted rates, with one query each inside a single read transaction. The
+template engine's WorkDataProvider and AutodocGen's DataFetcher both read
+from it, so a run that produces many documents (one letter per firm, a
+document pack) queries the database once instead of once per firm and
+placeholder.
+"""
+
+from config import DATABASE_PATH
+from database.connection import read_transaction
+
+
+def _rows_as_dicts(cursor):
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class WorkContextSnapshot:
+    """
+    work:           the works row as {column: value}, or None if the work does not exist
+    firm_documents: the work's firm_documents rows as dicts, in insertion order
+    firms:          {firm name: {'id', 'name', 'representative', 'address'}} for the
+                    firms of firm_documents and firm_rates that are registered
+    quoting_firms:  names of the firms that quoted rates for the work's items
+    """
+
+    def __init__(self, work_id, work, firm_documents, firms, quoting_firms):
+        self.work_id = work_id
+        self.work = work
+        self.firm_documents = firm_documents
+        self.firms = firms
+        self.quoting_firms = quoting_firms
+        self._documents_by_firm = {}
+        for firm_doc in firm_documents:
+            self._documents_by_firm.setdefault(firm_doc.get('firm_name'), firm_doc)
+
+    @classmethod
+    def load(cls, work_id, db_path=None):
+        with read_transaction(db_path or DATABASE_PATH) as cursor:
+            cursor.execute("SELECT * FROM works WHERE id = ?", (work_id,))
+            works = _rows_as_dicts(cursor)
+
+            cursor.execute("SELECT * FROM firm_documents WHERE work_id = ? ORDER BY id", (work_id,))
+            firm_documents = _rows_as_dicts(cursor)
+
+            cursor.execute("""
+                SELECT DISTINCT fr.firm_name
+                FROM firm_rates fr
+                JOIN schedule_items si ON fr.schedule_item_id = si.id
+                WHERE si.work_id = ?
+            """, (work_id,))
+            quoting_firms = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute("""
+                SELECT id, name, representative, address FROM firms
+                WHERE name IN (
+                    SELECT firm_name FROM firm_documents WHERE work_id = ?
+                    UNION
+                    SELECT fr.firm_name FROM firm_rates fr
+                    JOIN schedule_items si ON fr.schedule_item_id = si.id
+                    WHERE si.work_id = ?
+                )
+            """, (work_id, work_id))
+            firms = {firm['name']: firm for firm in _rows_as_dicts(cursor)}
+
+        return cls(work_id, works[0] if works else None, firm_documents, firms, quoting_firms)
+
+    @property
+    def firm_names(self):
+        """Names of the firms with a firm_documents row, in row order."""
+        return [doc.get('firm_name') for doc in self.firm_documents if doc.get('firm_name')]
+
+    def firm_document(self, firm_name):
+        """The firm_documents row of firm_name, or None."""
+        return self._documents_by_firm.get(firm_name)
+
+    def firm(self, firm_name):
+        """The firms registration row of firm_name, or None."""
+        return self.firms.get(firm_name)
@@ -1,85 +1,127 @@
-from database import db_manager
-from database.managers import firm_manager
-from utils.helpers import format_currency_inr
+from utils.inr_format import format_inr
 from datetime import datetime
 from database.managers.database_utils import get_work_columns, get_firm_documents_columns
+from .work_context import WorkContextSnapshot
+
+_MISSING = object()
+
+# Aliases for backward compatibility or friendlier names, alias -> column.
+PLACEHOLDER_ALIASES = {
+    'WORK_NAME': 'NAME',  # Map [WORK_NAME] → [NAME]
+    # Add more aliases here as needed
+}
+
+# Firm placeholders read from the firms table rather than firm_documents,
+# placeholder name -> firms column.
+FIRM_REGISTRATION_PLACEHOLDERS = {
+    'FIRM_ADDRESS': 'address',
+    'FIRM_REPRESENTATIVE': 'representative',
+}
+
 
 class WorkDataProvider:
-    def __init__(self, work_id):
+    def __init__(self, work_id, snapshot=None):
+        """
+        snapshot is a WorkContextSnapshot already loaded for work_id, so
+        several providers (or AutodocGen) can share one read of the database.
+        """
         self.work_id = work_id
-        # Fetch ALL columns using SELECT * for both tables
-        self.work_details = db_manager.get_work_by_id_all_columns(work_id)
-        self.firm_documents = db_manager.get_firm_documents_all_columns(work_id)
-        # Fetch firm registration data (includes address)
-        self.firms_data = self._get_firms_data()
+        self.snapshot = snapshot or WorkContextSnapshot.load(work_id)
+        # ALL columns of the work and its firm_documents rows
+        self.work_details = self.snapshot.work
+        self.firm_documents = self.snapshot.firm_documents
+        # Composite placeholders are only built when a placeholder asks for
+        # them, then kept for the run.
+        self._firms_data = None
+        self._resolved = {}
+        self._special_placeholders = {
+            'CURRENT_DATE': lambda: datetime.now().strftime("%d-%m-%Y"),
+            'CURRENT_TIME': lambda: datetime.now().strftime("%H:%M:%S"),
+            'FIRM_PG_DETAILS': self._generate_firm_pg_details,
+            'ALL_FIRMS_PG_DETAILS': self._generate_all_firms_pg_details,
+        }
+
+    @property
+    def firms_data(self):
+        """Firm registration rows (includes address) of the firms in this work."""
+        if self._firms_data is None:
+            self._firms_data = self._get_firms_data()
+        return self._firms_data
 
     def _get_firms_data(self):
         """Get firm registration data for firms involved in this work."""
-        if not self.firm_documents:
-            return []
-        
-        # Get unique firm names from firm_documents
-        firm_names = list(set(doc.get('firm_name') for doc in self.firm_documents if doc.get('firm_name')))
-        
-        # Fetch firm registration data for these firms
         firms_data = []
-        for firm_name in firm_names:
-            firm_data = firm_manager.get_firm_by_name(firm_name)
+        for firm_name in dict.fromkeys(self.snapshot.firm_names):
+            firm_data = self.snapshot.firm(firm_name)
             if firm_data:
                 firms_data.append(firm_data)
-        
         return firms_data
 
-    def generate_placeholders(self):
-        """Generate a consolidated dictionary of all placeholders dynamically."""
-        # 1. Retrieve column lists via the new helper
-        work_columns = get_work_columns()
-        firm_columns = get_firm_documents_columns()
-        
-        # 2. Generate work placeholders: [COLUMN_NAME] format
-        work_placeholders = {}
+    def _resolve_work_placeholder(self, name):
+        if name in self._special_placeholders:
+            return self._special_placeholders[name]()
+        column = PLACEHOLDER_ALIASES.get(name, name).lower()
+        if self.work_details and column in self.work_details:
+            return self.work_details[column]
+        return _MISSING
+
+    def _resolve_firm_placeholder(self, name):
+        if name in FIRM_REGISTRATION_PLACEHOLDERS and self.firms_data:
+            # For multiple firms the last firm's registration data is used
+            return self.firms_data[-1].get(FIRM_REGISTRATION_PLACEHOLDERS[name])
+        column = name.lower()
+        # For multiple firms, we use the last firm's data for each placeholder
+        for firm_doc in reversed(self.firm_documents):
+            if column in firm_doc:
+                return firm_doc[column]
+        return _MISSING
+
+    def resolve_placeholder(self, token):
+        """
+        Returns the value of one "[WORK_KEY]" or "<<FIRM_KEY>>" token, or
+        _MISSING when the work has no such placeholder. Values are memoised
+        for the lifetime of the provider.
+        """
+        token = token.upper()
+        value = self._resolved.get(token, _MISSING)
+        if value is _MISSING and token not in self._resolved:
+            if token.startswith('[') and token.endswith(']'):
+                value = self._resolve_work_placeholder(token[1:-1])
+            elif token.startswith('<<') and token.endswith('>>'):
+                value = self._resolve_firm_placeholder(token[2:-2])
+            self._resolved[token] = value
+        return value
+
+    def _all_placeholder_tokens(self):
+        tokens = []
         if self.work_details:
-            for column in work_columns:
-                work_placeholders[f'[{column.upper()}]'] = self.work_details.get(column)
-        
-        # 3. Generate firm placeholders: <<COLUMN_NAME>> format
-        # Iterate over every firm row linked to the work
-        firm_placeholders = {}
-        for firm_doc in self.firm_documents:
-            for column in firm_columns:
-                # For multiple firms, we use the last firm's data for each placeholder
-                # (This follows the original behavior but could be modified as needed)
-                firm_placeholders[f'<<{column.upper()}>>'] = firm_doc.get(column)
-        
-        # 3.1. Add firm address placeholders from the firms table
-        for firm_data in self.firms_data:
-            firm_placeholders[f'<<FIRM_ADDRESS>>'] = firm_data.get('address')
-            firm_placeholders[f'<<FIRM_REPRESENTATIVE>>'] = firm_data.get('representative')
-        
-        # 4. Generate special placeholders
-        special_placeholders = {
-            '[CURRENT_DATE]': datetime.now().strftime("%d-%m-%Y"),
-            '[CURRENT_TIME]': datetime.now().strftime("%H:%M:%S"),
-            '[FIRM_PG_DETAILS]': self._generate_firm_pg_details(),
-            '[ALL_FIRMS_PG_DETAILS]': self._generate_all_firms_pg_details()
-        }
-        
-        # 5. Create consolidated dict from dynamic creation
-        consolidated_placeholders = {**work_placeholders, **firm_placeholders, **special_placeholders}
-        
-        # 6. Define aliases for backward compatibility or friendlier names
-        # Aliases are merged AFTER dynamic creation so future columns won't break them
-        aliases = {
-            '[WORK_NAME]': '[NAME]',  # Map [WORK_NAME] → [NAME]
-            # Add more aliases here as needed
-        }
-        
-        # 7. Apply aliases by checking if the target placeholder exists
-        for alias_key, target_key in aliases.items():
-            if target_key in consolidated_placeholders:
-                consolidated_placeholders[alias_key] = consolidated_placeholders[target_key]
-        
-        return consolidated_placeholders
+            tokens.extend(f'[{column.upper()}]' for column in self.work_details)
+        if self.firm_documents:
+            tokens.extend(f'<<{column.upper()}>>' for column in self.firm_documents[0])
+            tokens.extend(f'<<{name}>>' for name in FIRM_REGISTRATION_PLACEHOLDERS)
+        tokens.extend(f'[{name}]' for name in self._special_placeholders)
+        tokens.extend(f'[{alias}]' for alias in PLACEHOLDER_ALIASES)
+        return tokens
+
+    def generate_placeholders(self, referenced=None):
+        """
+        Generate a consolidated dictionary of placeholders.
+
+        referenced is an iterable of the "[KEY]" / "<<KEY>>" tokens a template
+        uses; only those are resolved, so the cost follows the template rather
+        than the schema and composite placeholders such as
+        [ALL_FIRMS_PG_DETAILS] are only built when the template contains them.
+        Without it every placeholder of the work is generated, as before.
+        """
+        if referenced is None:
+            referenced = self._all_placeholder_tokens()
+
+        placeholders = {}
+        for token in referenced:
+            value = self.resolve_placeholder(token)
+            if value is not _MISSING:
+                placeholders[token.upper()] = value
+        return placeholders
 
     def _generate_firm_pg_details(self):
         """Generate FIRM_PG_DETAILS multi-line string from firm rows."""
@@ -92,7 +134,7 @@ class WorkDataProvider:
             
             # Format PG Amount with Indian Rupee symbol
             pg_amount = firm_doc.get('pg_amount')
-            formatted_pg_amount = format_currency_inr(pg_amount) if pg_amount is not None else 'N/A'
+            formatted_pg_amount = format_inr(pg_amount) if pg_amount is not None else 'N/A'
             
             details_list.append(
                 f"{i+1}. {firm_doc.get('firm_name', 'N/A')} {pg_status} {firm_doc.get('pg_no') or 'N/A'}, "
@@ -107,14 +149,11 @@ class WorkDataProvider:
         """Generate ALL_FIRMS_PG_DETAILS multi-line string from all firm rows."""
         # For now, this is the same as _generate_firm_pg_details
         # But it could be extended to include additional details per firm
-        return self._generate_firm_pg_details()
+        return self.resolve_placeholder('[FIRM_PG_DETAILS]')
     
     def get_firm_document_data(self, firm_name):
         """Get firm document data for a specific firm name."""
-        for firm_doc in self.firm_documents:
-            if firm_doc.get('firm_name') == firm_name:
-                return firm_doc
-        return None
+        return self.snapshot.firm_document(firm_name)
 
     def get_firm_names_list(self):
         """Get comma-separated list of firm names for this work."""
@@ -123,7 +162,7 @@ class WorkDataProvider:
 
     def get_firm_pg_details_block(self):
         """Legacy method - now delegates to the new implementation."""
-        return self._generate_firm_pg_details()
+        return self.resolve_placeholder('[FIRM_PG_DETAILS]')
     
     def get_available_placeholders(self):
         """Get a dictionary of all available placeholders with their descriptions."""
@@ -302,29 +341,16 @@ class WorkDataProvider:
     
     def get_data(self, key):
         """Get data for a specific placeholder key with alias support."""
-        # Define aliases for backward compatibility or friendlier names
-        # Aliases are merged AFTER dynamic creation so future columns won't break them
-        aliases = {
-            'WORK_NAME': 'NAME',  # Map [WORK_NAME] → [NAME]
-            # Add more aliases here as needed
-        }
-        
         # Check if the key is an alias, if so use the actual column name
-        actual_key = aliases.get(key, key)
+        actual_key = PLACEHOLDER_ALIASES.get(key, key)
         
         # Try to get data from work_details first
         if self.work_details and actual_key.lower() in self.work_details:
             return self.work_details[actual_key.lower()]
         
-        # Handle special cases
-        if key == 'CURRENT_DATE':
-            return datetime.now().strftime("%d-%m-%Y")
-        elif key == 'CURRENT_TIME':
-            return datetime.now().strftime("%H:%M:%S")
-        elif key == 'FIRM_PG_DETAILS':
-            return self._generate_firm_pg_details()
-        elif key == 'ALL_FIRMS_PG_DETAILS':
-            return self._generate_all_firms_pg_details()
+        # Handle special cases, memoised like the generated placeholders
+        if key in self._special_placeholders:
+            return self.resolve_placeholder(f'[{key}]')
         
         # Return None if key not found (will be handled by caller)
         return None
@@ -5,11 +5,54 @@ from utils import helpers as utils_helpers
 from datetime import datetime
 from features.vitiation.vitiation_data_exporter import export_vitiation_data_to_excel
 
+
+def build_vitiation_report_items(work_id):
+    """Flattens the work's schedule into report rows numbered with sr_no."""
+    snapshot = db_manager.get_work_schedule_snapshot(work_id)
+    processed_schedule_items = []
+    root_items = snapshot['root_items']
+
+    # Recursive function to flatten the hierarchy and add sr_no
+    def flatten_and_process_recursive(items_list, parent_sr_prefix=""):
+        sr_counter = 1
+        for item in items_list:
+            current_sr_no = f"{parent_sr_prefix}.{sr_counter}" if parent_sr_prefix else str(sr_counter)
+            sr_counter += 1
+            processed_item = item.copy()
+            processed_item['sr_no'] = current_sr_no
+            processed_schedule_items.append(processed_item)
+            if item['children']:
+                flatten_and_process_recursive(item['children'], current_sr_no)
+
+    flatten_and_process_recursive(root_items)
+    return processed_schedule_items
+
+
+def _vitiation_report_job(job, work_details, selected_firms, selected_variation_name, file_path):
+    job.report(0, 2, "Reading schedule items")
+    processed_schedule_items = build_vitiation_report_items(work_details['work_id'])
+    if not processed_schedule_items:
+        return False, "No schedule items to report."
+    job.raise_if_cancelled()
+    job.report(1, 2, "Writing workbook")
+    success, message = export_vitiation_data_to_excel(
+        work_details,
+        processed_schedule_items,
+        file_path,
+        selected_firms,
+        selected_variation_name # Pass the selected variation name
+    )
+    if success:
+        return True, f"Vitiation report generated successfully: {file_path}"
+    return False, f"Error generating report: {message}"
+
+
 class VitiationReportDialog(tk.Toplevel):
-    def __init__(self, parent, work_id):
+    def __init__(self, parent, work_id, job_executor):
         super().__init__(parent)
         self.parent = parent
         self.work_id = work_id
+        self.job_executor = job_executor
         self.work_details = db_manager.get_work_by_id(work_id)
         self.work_name = self.work_details['work_name'] if self.work_details else "N/A"
         self.title(f"Generate Vitiation Report for: {self.work_name}")
@@ -80,41 +123,6 @@ class VitiationReportDialog(tk.Toplevel):
         if not self.selected_firms:
             utils_helpers.show_toast(self, "Please select at least one firm.", "warning")
             return
-        
-        # Load schedule items directly here, as the treeview is removed
-        all_items_from_db = db_manager.get_schedule_items(self.work_id)
-        processed_schedule_items = []
-        item_map = {item['item_id']: dict(item) for item in all_items_from_db}
-        for item_id, item_data in item_map.items():
-            item_data['children'] = []
-            item_data['firm_rates'] = db_manager.get_firm_rates(item_id)
-            item_data['variations'] = db_manager.get_schedule_item_variations(item_id) # Load variations
-            item_data['level'] = 0
-        for item_id, item_data in item_map.items():
-            parent_id = item_data.get('parent_item_id')
-            if parent_id is not None and parent_id in item_map:
-                item_map[parent_id]['children'].append(item_data)
-        root_items = [item for item in item_map.values() if item.get('parent_item_id') is None]
-        root_items.sort(key=lambda x: x['item_name'])
-
-        # Recursive function to flatten the hierarchy and add sr_no
-        def flatten_and_process_recursive(items_list, parent_sr_prefix=""):
-            sr_counter = 1
-            for item in items_list:
-                current_sr_no = f"{parent_sr_prefix}.{sr_counter}" if parent_sr_prefix else str(sr_counter)
-                sr_counter += 1
-                processed_item = item.copy()
-                processed_item['sr_no'] = current_sr_no
-                processed_schedule_items.append(processed_item)
-                if item['children']:
-                    item['children'].sort(key=lambda x: x['item_name'])
-                    flatten_and_process_recursive(item['children'], current_sr_no)
-        
-        flatten_and_process_recursive(root_items)
-
-        if not processed_schedule_items:
-            utils_helpers.show_toast(self, "No schedule items to report.", "warning")
-            return
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
@@ -124,16 +132,20 @@ class VitiationReportDialog(tk.Toplevel):
         if not file_path:
             utils_helpers.show_toast(self, "Report generation cancelled.", "info")
             return
-        
-        success, message = export_vitiation_data_to_excel(
-            self.work_details,
-            processed_schedule_items, # Use the locally processed items
-            file_path,
-            self.selected_firms,
-            selected_variation_name # Pass the selected variation name
+
+        def on_done(result):
+            success, message = result
+            utils_helpers.show_toast(self.parent, message, "success" if success else "error")
+
+        def on_error(e):
+            utils_helpers.show_toast(self.parent, f"Error generating report: {e}", "error")
+
+        # The report is built and written in the background; the dialog can
+        # close right away and the result is shown on the main window.
+        self.job_executor.submit(
+            f"Vitiation Report - {self.work_name}", _vitiation_report_job,
+            self.work_details, self.selected_firms, selected_variation_name, file_path,
+            on_done=on_done, on_error=on_error
         )
-        if success:
-            utils_helpers.show_toast(self.parent, f"Vitiation report generated successfully: {file_path}", "success")
-            self.destroy()
-        else:
-            utils_helpers.show_toast(self, f"Error generating report: {message}", "error")
\ No newline at end of file
+        utils_helpers.show_toast(self.parent, "Vitiation report started in the background.", "info")
+        self.destroy()
@@ -2,6 +2,7 @@ import pandas as pd
 from database import db_manager
 from features.vitiation import vitiation_excel_structure
 from xlsxwriter.utility import xl_col_to_name
+from utils.inr_format import xlsx_inr_format
 
 def get_col_letter(col_idx):
     return xl_col_to_name(col_idx)
@@ -13,7 +14,7 @@ def export_vitiation_data_to_excel(work_details, schedule_items, output_path, se
             worksheet = workbook.add_worksheet('Vitiation Report')
 
             # Define formats
-            currency_format_inr = workbook.add_format({'num_format': '₹ #,##,##0.00', 'border': 1})
+            currency_format_inr = workbook.add_format({'num_format': xlsx_inr_format("₹ "), 'border': 1})
             cell_format = workbook.add_format({'border': 1})
             numeric_format = workbook.add_format({'border': 1, 'num_format': '#,##0.00'})
 
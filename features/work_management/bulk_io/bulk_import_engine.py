@@ -0,0 +1,327 @@
+"""
+Shared bulk import path for works and schedule items.
+
+Files are streamed in fixed-size chunks. Each chunk is cleaned and validated
+column-wise in pandas, invalid rows are collected in an ImportReport with
+their spreadsheet row number, and the valid rows are written with one
+executemany per chunk. The whole import runs in a single transaction.
+"""
+
+from datetime import date, datetime
+from itertools import islice
+import pandas as pd
+from openpyxl import load_workbook
+from config import DATABASE_PATH
+from database import db_manager
+from database.connection import transaction
+
+DATE_FORMAT = "%d-%m-%Y"
+
+# Rows read, validated and inserted per batch when streaming a file.
+DEFAULT_CHUNK_SIZE = 5000
+
+# First data row of a sheet/CSV with a header line, as the user sees it.
+FIRST_DATA_ROW = 2
+
+WORK_COLUMNS = {
+    'Work Name': 'name',
+    'Description': 'description',
+    'Justification': 'justification',
+    'Section': 'section',
+    'Work Type': 'work_type',
+    'File No': 'file_no',
+    'Estimate No': 'estimate_no',
+    'Tender Cost': 'tender_cost',
+    'Tender Opening Date': 'tender_opening_date',
+    'LOA No': 'loa_no',
+    'LOA Date': 'loa_date',
+    'Work Commence Date': 'work_commence_date',
+}
+WORK_NUMERIC_COLUMNS = {'tender_cost'}
+
+SCHEDULE_ITEM_COLUMNS = {
+    'Item ID': 'source_item_id',
+    'Item Name': 'item_name',
+    'Quantity': 'quantity',
+    'Unit': 'unit',
+    'Parent Item ID': 'parent_item_id',
+}
+
+
+class ImportReport:
+    def __init__(self, entity):
+        self.entity = entity
+        self.imported = 0
+        self.errors = []  # [(row_number, message)]
+
+    def add_errors(self, row_numbers, message):
+        self.errors.extend((int(row), message) for row in row_numbers)
+
+    @property
+    def success(self):
+        return self.imported > 0 or not self.errors
+
+    def message(self, max_errors=10):
+        message = f"Successfully imported {self.imported} {self.entity}."
+        if self.errors:
+            errors = sorted(self.errors)
+            message += f" {len(errors)} row(s) skipped:"
+            message += "".join(f"\nRow {row}: {error}" for row, error in errors[:max_errors])
+            if len(errors) > max_errors:
+                message += f"\n...and {len(errors) - max_errors} more."
+        return message
+
+
+def _clean_text(series):
+    """Strips text, turns blanks into NA, and renders dates/whole numbers the way the UI types them."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.strftime(DATE_FORMAT)
+    elif pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        # Numbers such as file numbers are read as float when the column has blanks.
+        series = series.astype('Int64')
+    elif series.dtype == object:
+        series = series.map(lambda v: v.strftime(DATE_FORMAT) if isinstance(v, (datetime, date)) else v)
+    cleaned = series.astype('string').str.strip()
+    return cleaned.mask(cleaned == '')
+
+
+def _clean_number(series):
+    """Returns (numbers, invalid_mask); thousands separators are accepted."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float), pd.Series(False, index=series.index)
+    text = _clean_text(series).str.replace(',', '', regex=False)
+    numbers = pd.to_numeric(text, errors='coerce')
+    return numbers, text.notna() & numbers.isna()
+
+
+def _prepare(df, columns):
+    """Renames known headers, adds missing ones and drops fully blank rows."""
+    df = df.rename(columns=columns).reindex(columns=list(columns.values()))
+    df.index = df.index + FIRST_DATA_ROW
+    return df.dropna(how='all')
+
+
+def _isin(series, container):
+    """series.isin(container) in time proportional to the series, for large, growing sets/dicts."""
+    return series.isin([value for value in series.dropna().unique() if value in container])
+
+
+def _records(df):
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def iter_table_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the data rows of a CSV or Excel file as DataFrames of at most
+    chunk_size rows, indexed by 0-based data row position. CSV files are
+    read with read_csv(chunksize=...) and .xlsx files row by row through
+    openpyxl's read-only mode, so memory stays bounded by chunk_size.
+    """
+    lower_path = file_path.lower()
+    if lower_path.endswith('.csv'):
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+        return
+    if not lower_path.endswith(('.xlsx', '.xlsm')):
+        # Legacy .xls cannot be streamed by openpyxl.
+        yield pd.read_excel(file_path)
+        return
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        width = len(columns)
+        start = 0
+        while True:
+            batch = [tuple(row[:width]) + (None,) * (width - len(row)) for row in islice(rows, chunk_size)]
+            if not batch:
+                break
+            yield pd.DataFrame(batch, columns=columns, index=range(start, start + len(batch)))
+            start += len(batch)
+    finally:
+        workbook.close()
+
+
+def count_data_rows(file_path):
+    """Returns the number of data rows for progress reporting, or None if it is not known up front."""
+    if not file_path.lower().endswith(('.xlsx', '.xlsm')):
+        return None
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        max_row = workbook.active.max_row
+        return max_row - 1 if max_row else None
+    finally:
+        workbook.close()
+
+
+def _as_chunks(data):
+    return [data] if isinstance(data, pd.DataFrame) else data
+
+
+def import_works(data, progress_callback=None, total_rows=None):
+    """
+    Imports works from a DataFrame or an iterable of DataFrame chunks (see
+    iter_table_chunks) in one transaction. progress_callback, if given, is
+    called with (rows_processed, total_rows) after every chunk.
+    """
+    report = ImportReport("works")
+    processed = 0
+    with transaction(DATABASE_PATH):
+        existing_names = {work[1] for work in db_manager.get_works()}
+        imported_names = set()
+        for chunk in _as_chunks(data):
+            df = _prepare(chunk, WORK_COLUMNS)
+            for column in df.columns:
+                if column not in WORK_NUMERIC_COLUMNS:
+                    df[column] = _clean_text(df[column])
+            df['tender_cost'], bad_cost = _clean_number(df['tender_cost'])
+
+            missing_name = df['name'].isna()
+            report.add_errors(df.index[missing_name], "Work Name is empty")
+            report.add_errors(df.index[bad_cost & ~missing_name], "Tender Cost is not a number")
+            valid = ~missing_name & ~bad_cost
+
+            duplicate = valid & (df['name'].duplicated() | _isin(df['name'], imported_names))
+            report.add_errors(df.index[duplicate], "Duplicate Work Name in file")
+            existing = valid & ~duplicate & _isin(df['name'], existing_names)
+            report.add_errors(df.index[existing], "A work with this name already exists")
+            valid &= ~duplicate & ~existing
+
+            report.imported += db_manager.add_works_bulk(_records(df[valid]))
+            imported_names.update(df.loc[valid, 'name'])
+            processed += len(chunk)
+            if progress_callback:
+                progress_callback(processed, total_rows)
+    return report
+
+
+class _ScheduleItemImport:
+    """
+    Cross-chunk state of one schedule item import: which file Item IDs were
+    imported (and under which new id), which were rejected, and rows whose
+    parent appears later in the file.
+    """
+
+    def __init__(self, work_id, report):
+        self.work_id = work_id
+        self.report = report
+        self.existing_ids = {item['item_id'] for item in db_manager.get_schedule_items(work_id)}
+        self.new_ids = {}         # file Item ID -> id of the imported row
+        self.rejected_ids = set() # file Item IDs of skipped rows
+        self.seen_ids = set()     # every accepted file Item ID, for duplicate checks
+        self.pending = []
+
+    def validate(self, chunk):
+        df = _prepare(chunk, SCHEDULE_ITEM_COLUMNS)
+        df['item_name'] = _clean_text(df['item_name'])
+        df['unit'] = _clean_text(df['unit'])
+        df['quantity'], bad_quantity = _clean_number(df['quantity'])
+        df['source_item_id'], bad_source_id = _clean_number(df['source_item_id'])
+        df['parent_item_id'], bad_parent_id = _clean_number(df['parent_item_id'])
+
+        checks = [
+            (df['item_name'].isna(), "Item Name is empty"),
+            (df['unit'].isna(), "Unit is empty"),
+            (bad_quantity, "Quantity is not a number"),
+            (df['quantity'].isna() & ~bad_quantity, "Quantity is empty"),
+            (bad_source_id, "Item ID is not a number"),
+            (bad_parent_id, "Parent Item ID is not a number"),
+        ]
+        valid = pd.Series(True, index=df.index)
+        for failed, message in checks:
+            self.report.add_errors(df.index[valid & failed], message)
+            valid &= ~failed
+        self.rejected_ids.update(df.loc[~valid, 'source_item_id'].dropna())
+
+        has_source_id = df['source_item_id'].notna()
+        duplicate = valid & has_source_id & (df['source_item_id'].duplicated() | _isin(df['source_item_id'], self.seen_ids))
+        self.report.add_errors(df.index[duplicate], "Duplicate Item ID in file")
+        valid &= ~duplicate
+        self.seen_ids.update(df.loc[valid & has_source_id, 'source_item_id'])
+        return df[valid]
+
+    def insert(self, df, final=False):
+        """
+        Inserts the rows of df whose parent is known. A Parent Item ID refers
+        to a file Item ID when one has been seen, otherwise to an existing
+        item of the work. Rows whose parent was skipped are skipped too; rows
+        whose parent has not been seen yet are kept for the end of the file.
+        """
+        parent = df['parent_item_id']
+        accepted = pd.Series(True, index=df.index)
+        deferred = pd.Series(False, index=df.index)
+        while True:
+            resolved = (
+                parent.isna()
+                | parent.isin(df.loc[accepted, 'source_item_id'].dropna())
+                | _isin(parent, self.new_ids)
+                | (_isin(parent, self.existing_ids) & ~_isin(parent, self.seen_ids) & ~_isin(parent, self.rejected_ids))
+            )
+            blocked = accepted & ~resolved
+            if not blocked.any():
+                break
+            skipped_parent = blocked & _isin(parent, self.rejected_ids)
+            self.report.add_errors(df.index[skipped_parent], "Parent item was skipped")
+            if final:
+                self.report.add_errors(df.index[blocked & ~skipped_parent], "Parent Item ID not found in file or work")
+                rejected = blocked
+            else:
+                rejected = skipped_parent
+                deferred |= blocked & ~skipped_parent
+            self.rejected_ids.update(df.loc[rejected, 'source_item_id'].dropna())
+            accepted &= ~blocked
+        if deferred.any():
+            self.pending.append(df[deferred])
+
+        rows = df[accepted]
+        position = {source_id: i for i, source_id in enumerate(rows['source_item_id']) if pd.notna(source_id)}
+        items = []
+        columns = zip(rows['item_name'].tolist(), rows['unit'].tolist(), rows['quantity'].tolist(), rows['parent_item_id'].tolist())
+        for item_name, unit, quantity, parent_id in columns:
+            item = {'item_name': item_name, 'unit': unit, 'quantity': quantity}
+            if parent_id in position:
+                item['parent_index'] = position[parent_id]
+            elif parent_id in self.new_ids:
+                item['parent_item_id'] = self.new_ids[parent_id]
+            elif pd.notna(parent_id):
+                item['parent_item_id'] = int(parent_id)
+            items.append(item)
+
+        item_ids = db_manager.add_schedule_items_bulk(self.work_id, items)
+        self.new_ids.update((source_id, item_ids[i]) for source_id, i in position.items())
+        self.report.imported += len(item_ids)
+
+    def finish(self):
+        if self.pending:
+            self.insert(pd.concat(self.pending), final=True)
+
+
+def import_schedule_items(data, work_id, progress_callback=None, total_rows=None):
+    """
+    Imports schedule items into work_id from a DataFrame or an iterable of
+    DataFrame chunks (see iter_table_chunks) in one transaction.
+    progress_callback, if given, is called with (rows_processed, total_rows)
+    after every chunk.
+    """
+    report = ImportReport("schedule items")
+    processed = 0
+    with transaction(DATABASE_PATH):
+        state = _ScheduleItemImport(work_id, report)
+        for chunk in _as_chunks(data):
+            state.insert(state.validate(chunk))
+            processed += len(chunk)
+            if progress_callback:
+                progress_callback(processed, total_rows)
+        state.finish()
+    return report
+
+
+def import_works_from_file(file_path, progress_callback=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    return import_works(iter_table_chunks(file_path, chunk_size), progress_callback, count_data_rows(file_path))
+
+
+def import_schedule_items_from_file(file_path, work_id, progress_callback=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    return import_schedule_items(iter_table_chunks(file_path, chunk_size), work_id, progress_callback, count_data_rows(file_path))
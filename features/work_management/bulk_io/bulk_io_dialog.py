@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from .bulk_io_manager import BulkIOManager
+from .import_runner import BackgroundImport
 from .schedule_item_bulk_dialog import ScheduleItemBulkIODialog
 from utils.helpers import show_toast
 
@@ -26,6 +27,7 @@ class BulkIODialog(tk.Toplevel):
         ttk.Button(import_works_frame, text="Browse", command=self._browse_import_file).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(import_works_frame, text="Import Excel", command=self._import_excel).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(import_works_frame, text="Import CSV", command=self._import_csv).pack(side=tk.LEFT, padx=5, pady=5)
+        self.background_import = BackgroundImport(main_frame, self._on_import_done)
 
         # Export Section (Works)
         export_works_frame = ttk.LabelFrame(main_frame, text="Export Works")
@@ -69,10 +71,10 @@ class BulkIODialog(tk.Toplevel):
             show_toast(self, "Selected file is not an Excel file.", "error")
             return
 
-        success, message = self.bulk_io_manager.import_works_from_excel(file_path)
-        show_toast(self, message, "success" if success else "error")
-        if success and hasattr(self.parent, 'load_works'):
-            self.parent.load_works() # Refresh the works list in the main window
+        if self.background_import.running:
+            show_toast(self, "An import is already running.", "warning")
+            return
+        self.background_import.start(self.bulk_io_manager.import_works_from_excel, file_path)
 
     def _export_excel(self):
         file_path = self.export_file_path.get()
@@ -96,7 +98,12 @@ class BulkIODialog(tk.Toplevel):
             show_toast(self, "Selected file is not a CSV file.", "error")
             return
 
-        success, message = self.bulk_io_manager.import_works_from_csv(file_path)
+        if self.background_import.running:
+            show_toast(self, "An import is already running.", "warning")
+            return
+        self.background_import.start(self.bulk_io_manager.import_works_from_csv, file_path)
+
+    def _on_import_done(self, success, message):
         show_toast(self, message, "success" if success else "error")
         if success and hasattr(self.parent, 'load_works'):
             self.parent.load_works() # Refresh the works list in the main window
@@ -2,38 +2,16 @@
 import pandas as pd
 import os
 from database import db_manager
+from .bulk_import_engine import import_works_from_file
 
 class BulkIOManager:
     def __init__(self):
         pass
 
-    def import_works_from_excel(self, file_path):
+    def import_works_from_excel(self, file_path, progress_callback=None):
         try:
-            df = pd.read_excel(file_path)
-            imported_count = 0
-            for index, row in df.iterrows():
-                name = row.get('Work Name')
-                description = row.get('Description')
-                justification = row.get('Justification')
-                section = row.get('Section')
-                work_type = row.get('Work Type')
-                file_no = row.get('File No')
-                estimate_no = row.get('Estimate No')
-                tender_cost = row.get('Tender Cost')
-                tender_opening_date = row.get('Tender Opening Date')
-                loa_no = row.get('LOA No')
-                loa_date = row.get('LOA Date')
-                work_commence_date = row.get('Work Commence Date')
-
-                if name:
-                    work_id = db_manager.add_work(
-                        name, description, justification, section, work_type,
-                        file_no, estimate_no, tender_cost, tender_opening_date,
-                        loa_no, loa_date, work_commence_date
-                    )
-                    if work_id:
-                        imported_count += 1
-            return True, f"Successfully imported {imported_count} works."
+            report = import_works_from_file(file_path, progress_callback)
+            return report.success, report.message()
         except Exception as e:
             return False, f"Error importing data: {e}"
 
@@ -50,33 +28,10 @@ class BulkIOManager:
         except Exception as e:
             return False, f"Error exporting data: {e}"
 
-    def import_works_from_csv(self, file_path):
+    def import_works_from_csv(self, file_path, progress_callback=None):
         try:
-            df = pd.read_csv(file_path)
-            imported_count = 0
-            for index, row in df.iterrows():
-                name = row.get('Work Name')
-                description = row.get('Description')
-                justification = row.get('Justification')
-                section = row.get('Section')
-                work_type = row.get('Work Type')
-                file_no = row.get('File No')
-                estimate_no = row.get('Estimate No')
-                tender_cost = row.get('Tender Cost')
-                tender_opening_date = row.get('Tender Opening Date')
-                loa_no = row.get('LOA No')
-                loa_date = row.get('LOA Date')
-                work_commence_date = row.get('Work Commence Date')
-
-                if name:
-                    work_id = db_manager.add_work(
-                        name, description, justification, section, work_type,
-                        file_no, estimate_no, tender_cost, tender_opening_date,
-                        loa_no, loa_date, work_commence_date
-                    )
-                    if work_id:
-                        imported_count += 1
-            return True, f"Successfully imported {imported_count} works."
+            report = import_works_from_file(file_path, progress_callback)
+            return report.success, report.message()
         except Exception as e:
             return False, f"Error importing data: {e}"
 
@@ -0,0 +1,74 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+from utils.helpers import show_toast
+
+class BackgroundImport:
+    """
+    Runs a bulk import on a worker thread so the dialog stays responsive.
+    The worker only records progress; the Tk thread polls it with after()
+    and updates the progress bar, then hands the (success, message) result
+    to on_done. The dialog holding the progress bar cannot be closed while
+    an import runs, so the result always reaches on_done.
+    """
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, parent, on_done):
+        self.parent = parent
+        self.on_done = on_done
+        self.frame = ttk.Frame(parent)
+        self.progress_bar = ttk.Progressbar(self.frame, mode='determinate', length=300)
+        self.progress_bar.pack(side=tk.LEFT, padx=5, pady=5, expand=True, fill=tk.X)
+        self.status_var = tk.StringVar()
+        ttk.Label(self.frame, textvariable=self.status_var, width=25).pack(side=tk.LEFT, padx=5, pady=5)
+        self._thread = None
+        self._progress = (0, None)
+        self._result = None
+        self.window = self.frame.winfo_toplevel()
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close_request)
+
+    def _on_close_request(self):
+        if self.running:
+            show_toast(self.window, "Please wait for the import to finish before closing.", "warning")
+            return
+        self.window.destroy()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, import_func, *args):
+        self._progress = (0, None)
+        self._result = None
+        self.progress_bar.configure(value=0)
+        self.status_var.set("Starting import...")
+        self.frame.pack(pady=5, fill=tk.X)
+        self._thread = threading.Thread(target=self._run, args=(import_func, args), daemon=True)
+        self._thread.start()
+        self.parent.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _run(self, import_func, args):
+        try:
+            self._result = import_func(*args, progress_callback=self._on_progress)
+        except Exception as e:
+            self._result = (False, f"Error importing data: {e}")
+
+    def _on_progress(self, processed, total):
+        # Called on the worker thread; a tuple assignment is atomic.
+        self._progress = (processed, total)
+
+    def _poll(self):
+        if not self.frame.winfo_exists():
+            return
+        processed, total = self._progress
+        if total:
+            self.progress_bar.configure(maximum=total, value=min(processed, total))
+            self.status_var.set(f"{processed:,} of {total:,} rows")
+        else:
+            self.progress_bar.configure(maximum=100, value=(processed // 1000) % 100)
+            self.status_var.set(f"{processed:,} rows")
+        if self.running:
+            self.parent.after(self.POLL_INTERVAL_MS, self._poll)
+            return
+        self.frame.pack_forget()
+        self.on_done(*self._result)
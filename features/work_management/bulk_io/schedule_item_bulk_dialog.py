@@ -2,6 +2,7 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from .schedule_item_bulk_manager import ScheduleItemBulkManager
+from .import_runner import BackgroundImport
 from database import db_manager
 from utils.helpers import show_toast
 
@@ -40,6 +41,7 @@ class ScheduleItemBulkIODialog(tk.Toplevel):
         ttk.Button(import_frame, text="Browse", command=self._browse_import_file).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(import_frame, text="Import Excel", command=self._import_excel).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(import_frame, text="Import CSV", command=self._import_csv).pack(side=tk.LEFT, padx=5, pady=5)
+        self.background_import = BackgroundImport(main_frame, self._on_import_done)
 
         # Export Section
         export_frame = ttk.LabelFrame(main_frame, text="Export Schedule Items")
@@ -95,10 +97,10 @@ class ScheduleItemBulkIODialog(tk.Toplevel):
             show_toast(self, "Selected file is not an Excel file.", "error")
             return
 
-        success, message = self.schedule_item_bulk_manager.import_schedule_items_from_excel(file_path, self.selected_work_id)
-        show_toast(self, message, "success" if success else "error")
-        if success and hasattr(self.main_window_instance, 'load_works'):
-            self.main_window_instance.load_works() # Refresh the works list in the main window
+        if self.background_import.running:
+            show_toast(self, "An import is already running.", "warning")
+            return
+        self.background_import.start(self.schedule_item_bulk_manager.import_schedule_items_from_excel, file_path, self.selected_work_id)
 
     def _export_excel(self):
         if not self.selected_work_id:
@@ -130,7 +132,12 @@ class ScheduleItemBulkIODialog(tk.Toplevel):
             show_toast(self, "Selected file is not a CSV file.", "error")
             return
 
-        success, message = self.schedule_item_bulk_manager.import_schedule_items_from_csv(file_path, self.selected_work_id)
+        if self.background_import.running:
+            show_toast(self, "An import is already running.", "warning")
+            return
+        self.background_import.start(self.schedule_item_bulk_manager.import_schedule_items_from_csv, file_path, self.selected_work_id)
+
+    def _on_import_done(self, success, message):
         show_toast(self, message, "success" if success else "error")
         if success and hasattr(self.main_window_instance, 'load_works'):
             self.main_window_instance.load_works() # Refresh the works list in the main window
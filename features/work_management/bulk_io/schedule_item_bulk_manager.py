@@ -1,32 +1,16 @@
 
 import pandas as pd
 from database import db_manager
+from .bulk_import_engine import import_schedule_items_from_file
 
 class ScheduleItemBulkManager:
     def __init__(self):
         pass
 
-    def import_schedule_items_from_excel(self, file_path, work_id):
+    def import_schedule_items_from_excel(self, file_path, work_id, progress_callback=None):
         try:
-            df = pd.read_excel(file_path)
-            imported_count = 0
-            for index, row in df.iterrows():
-                item_name = row.get('Item Name')
-                quantity = row.get('Quantity')
-                unit = row.get('Unit')
-                parent_item_id = row.get('Parent Item ID')
-
-                if item_name and quantity is not None and unit:
-                    # Ensure parent_item_id is None if not provided or invalid
-                    if pd.isna(parent_item_id):
-                        parent_item_id = None
-
-                    item_id = db_manager.add_schedule_item(
-                        work_id, item_name, unit, quantity, parent_item_id
-                    )
-                    if item_id:
-                        imported_count += 1
-            return True, f"Successfully imported {imported_count} schedule items."
+            report = import_schedule_items_from_file(file_path, work_id, progress_callback)
+            return report.success, report.message()
         except Exception as e:
             return False, f"Error importing data: {e}"
 
@@ -49,26 +33,10 @@ class ScheduleItemBulkManager:
         except Exception as e:
             return False, f"Error exporting data: {e}"
 
-    def import_schedule_items_from_csv(self, file_path, work_id):
+    def import_schedule_items_from_csv(self, file_path, work_id, progress_callback=None):
         try:
-            df = pd.read_csv(file_path)
-            imported_count = 0
-            for index, row in df.iterrows():
-                item_name = row.get('Item Name')
-                quantity = row.get('Quantity')
-                unit = row.get('Unit')
-                parent_item_id = row.get('Parent Item ID')
-
-                if item_name and quantity is not None and unit:
-                    if pd.isna(parent_item_id):
-                        parent_item_id = None
-
-                    item_id = db_manager.add_schedule_item(
-                        work_id, item_name, unit, quantity, parent_item_id
-                    )
-                    if item_id:
-                        imported_count += 1
-            return True, f"Successfully imported {imported_count} schedule items."
+            report = import_schedule_items_from_file(file_path, work_id, progress_callback)
+            return report.success, report.message()
         except Exception as e:
             return False, f"Error importing data: {e}"
 
@@ -21,6 +21,54 @@ from features.calculation.calculation_tab import CalculationTab
 from features.work_management.firm_registration.firm_registration_tab import FirmRegistrationTab
 from features.AutodocGen.autodoc_manager import AutodocManager
 from .bulk_io.bulk_io_dialog import BulkIODialog
+from utils.background_jobs import JobExecutor, JobQueuePanel
+
+
+def _price_variation_export_job(job, work_details, output_path, selected_firms, variation_name):
+    job.report(0, 2, "Reading schedule items")
+    schedule_items = db_manager.get_schedule_items(work_details['work_id'])
+    job.raise_if_cancelled()
+    job.report(1, 2, "Writing workbook")
+    success, message = export_price_variation_data_to_excel(work_details, schedule_items, output_path, selected_firms, variation_name)
+    if success:
+        return True, f"Price Variation Report exported successfully: {output_path}"
+    return False, f"Error exporting Price Variation Report: {message}"
+
+
+def _estimate_export_job(job, work_id, selected_firm, estimate_no):
+    from features.estimates.export_runner import run_export
+    job.report(0, 1, "Building estimate")
+    file_path = run_export(work_id, selected_firm, estimate_no)
+    if not file_path:
+        return False, "No data to export for the selected firm."
+    return True, f"Estimate Report generated successfully: {file_path}"
+
+
+def _comparison_export_job(job, work_id, file_path):
+    job.report(0, 1, "Building comparison")
+    ComparisonExporter(work_id).export_to_excel(file_path)
+    return True, f"Comparison report exported successfully: {file_path}"
+
+
+def _single_firm_export_job(job, work_id, selected_firm, file_path):
+    job.report(0, 1, "Building report")
+    SingleFirmExporter(work_id, selected_firm).export_to_excel(file_path)
+    return True, f"Single firm report for {selected_firm} exported successfully: {file_path}"
+
+
+def _work_export_job(job, work_details, file_path):
+    work_id = work_details['work_id']
+    job.report(0, 2, "Reading schedule items")
+    schedule_items = db_manager.get_schedule_items(work_id)
+    snapshot_items = db_manager.get_work_schedule_snapshot(work_id)['items']
+    firm_rates_by_item = {item_id: item['firm_rates'] for item_id, item in snapshot_items.items()}
+    job.raise_if_cancelled()
+    job.report(1, 2, "Writing workbook")
+    success, message = export_work_to_excel(work_details, schedule_items, firm_rates_by_item, file_path)
+    if success:
+        return True, f"Work exported successfully: {file_path}"
+    return False, f"Error exporting work: {message}"
+
 
 class MainWindow:
     def __init__(self, root):
@@ -35,6 +83,13 @@ class MainWindow:
     def _create_widgets(self):
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        # Exports run on the job executor. The panel shows below the notebook
+        # while there are jobs; packing it before the notebook keeps its space.
+        self.job_executor = JobExecutor(self.root)
+        self.job_panel = JobQueuePanel(self.root, self.job_executor, pack_options={
+            'side': tk.BOTTOM, 'fill': tk.X, 'padx': 5, 'pady': (0, 5), 'before': self.notebook})
+        self.root.bind("<Destroy>", self._on_root_destroy, add="+")
         self.works_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.works_frame, text="Works")
 
@@ -59,7 +114,7 @@ class MainWindow:
         self.about_tab = AboutTab(self.notebook)
         self.notebook.add(self.about_tab, text="About")
         
-        self.autodoc_manager = AutodocManager(self.root, db_manager.DATABASE_PATH)
+        self.autodoc_manager = AutodocManager(self.root, db_manager.DATABASE_PATH, self.job_executor)
         
         
         # Pack the frames
@@ -177,6 +232,7 @@ class MainWindow:
             context_menu.add_separator()
             context_menu.add_command(label="Letters", image=self.report_icon, compound=tk.LEFT, command=lambda: self.autodoc_manager.generate_document(work_id, "Letters"))
             context_menu.add_command(label="Office Notes", image=self.report_icon, compound=tk.LEFT, command=lambda: self.autodoc_manager.generate_document(work_id, "OfficeNotes"))
+            context_menu.add_command(label="Document Pack...", image=self.report_icon, compound=tk.LEFT, command=lambda: self.autodoc_manager.generate_document_pack(work_id))
             
             
             context_menu.add_separator()
@@ -212,7 +268,7 @@ class MainWindow:
             utils_helpers.show_toast(self.root, "Please select a work to generate Variation Report.", "warning")
             return
         work_id = int(selected_item[0])
-        VariationReportDialog(self.root, work_id)
+        VariationReportDialog(self.root, work_id, self.job_executor)
 
     def _export_vitiation_report(self):
         selected_item = self.works_tree.selection()
@@ -220,7 +276,7 @@ class MainWindow:
             utils_helpers.show_toast(self.root, "Please select a work to generate Vitiation Report.", "warning")
             return
         work_id = int(selected_item[0])
-        VitiationReportDialog(self.root, work_id)
+        VitiationReportDialog(self.root, work_id, self.job_executor)
 
     def _export_price_variation_report(self):
         selected_item = self.works_tree.selection()
@@ -232,8 +288,7 @@ class MainWindow:
         if not work_details:
             utils_helpers.show_toast(self.root, "Failed to retrieve work details.", "error")
             return
-        schedule_items = db_manager.get_schedule_items(work_id)
-        
+
         # Get unique firm names for the selected work
         firm_names = db_manager.get_unique_firm_names_by_work_id(work_id)
         if not firm_names:
@@ -254,12 +309,9 @@ class MainWindow:
         if not output_path:
             utils_helpers.show_toast(self.root, "Export cancelled.", "info")
             return
-        
-        success, message = export_price_variation_data_to_excel(work_details, schedule_items, output_path, selected_firms, variation_name)
-        if success:
-            utils_helpers.show_toast(self.root, f"Price Variation Report exported successfully: {output_path}", "success")
-        else:
-            utils_helpers.show_toast(self.root, f"Error exporting Price Variation Report: {message}", "error")
+
+        self._submit_export(f"Price Variation Report - {work_details['work_name']}", "Price Variation Report",
+                            _price_variation_export_job, work_details, output_path, selected_firms, variation_name)
 
     def _export_estimate_report(self):
         selected_item = self.works_tree.selection()
@@ -288,15 +340,8 @@ class MainWindow:
             utils_helpers.show_toast(self.root, "Estimate number input cancelled.", "info")
             return
 
-        # Call the new export_runner with work_id, selected_firm, and estimate_no
-        from features.estimates.export_runner import run_export
-        try:
-            run_export(work_id, selected_firm, estimate_no)
-            utils_helpers.show_toast(self.root, "Estimate Report generated successfully.", "success")
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            utils_helpers.show_toast(self.root, f"Error generating Estimate Report: {e}", "error")
+        self._submit_export(f"Estimate Report - {work_details['work_name']}", "Estimate Report",
+                            _estimate_export_job, work_id, selected_firm, estimate_no)
 
     def _export_comparison_report(self):
         selected_item = self.works_tree.selection()
@@ -316,14 +361,8 @@ class MainWindow:
         if not file_path:
             utils_helpers.show_toast(self.root, "Export cancelled.", "info")
             return
-        try:
-            exporter = ComparisonExporter(work_id)
-            exporter.export_to_excel(file_path)
-            utils_helpers.show_toast(self.root, f"Comparison report exported successfully: {file_path}", "success")
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            utils_helpers.show_toast(self.root, f"Error exporting comparison report: {e}", "error")
+        self._submit_export(f"Comparison Report - {work_details['work_name']}", "comparison report",
+                            _comparison_export_job, work_id, file_path)
 
     def _export_single_firm_report(self):
         selected_item = self.works_tree.selection()
@@ -356,14 +395,27 @@ class MainWindow:
         if not file_path:
             utils_helpers.show_toast(self.root, "Export cancelled.", "info")
             return
-        try:
-            exporter = SingleFirmExporter(work_id, selected_firm)
-            exporter.export_to_excel(file_path)
-            utils_helpers.show_toast(self.root, f"Single firm report for {selected_firm} exported successfully: {file_path}", "success")
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            utils_helpers.show_toast(self.root, f"Error exporting single firm report: {e}", "error")
+        self._submit_export(f"Single Firm Report - {selected_firm}", "single firm report",
+                            _single_firm_export_job, work_id, selected_firm, file_path)
+
+    def _submit_export(self, title, report_name, job_func, *args):
+        """
+        Runs job_func(job, *args) on the job executor. The job returns
+        (success, message), which is shown as a toast when it finishes.
+        """
+        def on_done(result):
+            success, message = result
+            utils_helpers.show_toast(self.root, message, "success" if success else "error")
+
+        def on_error(e):
+            utils_helpers.show_toast(self.root, f"Error exporting {report_name}: {e}", "error")
+
+        self.job_executor.submit(title, job_func, *args, on_done=on_done, on_error=on_error)
+        utils_helpers.show_toast(self.root, f"{title} started in the background.", "info")
+
+    def _on_root_destroy(self, event):
+        if event.widget is self.root:
+            self.job_executor.shutdown()
 
     def _ask_for_price_variation_options(self, firm_names, work_id):
         dialog = tk.Toplevel(self.root)
@@ -542,8 +594,6 @@ class MainWindow:
         if not work_details:
             utils_helpers.show_toast(self.root, "Failed to retrieve work details.", "error")
             return
-        schedule_items = db_manager.get_schedule_items(work_id)
-        firm_rates_by_item = {item['item_id']: db_manager.get_firm_rates(item['item_id']) for item in schedule_items}
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
             filetypes=[("Excel files", "*.xlsx")],
@@ -552,11 +602,8 @@ class MainWindow:
         if not file_path:
             utils_helpers.show_toast(self.root, "Export cancelled.", "info")
             return
-        success, message = export_work_to_excel(work_details, schedule_items, firm_rates_by_item, file_path)
-        if success:
-            utils_helpers.show_toast(self.root, f"Work exported successfully: {file_path}", "success")
-        else:
-            utils_helpers.show_toast(self.root, f"Error exporting work: {message}", "error")
+        self._submit_export(f"Work Export - {work_details['work_name']}", "work",
+                            _work_export_job, work_details, file_path)
 
     
 
@@ -3,6 +3,7 @@ from tkinter import ttk
 from database import db_manager
 from utils import helpers as utils_helpers
 from utils.helpers import load_icon
+from utils.inr_format import format_inr_array
 from utils.modern_components import add_mousewheel_support
 from features.vitiation.QuantityVariationDialog import QuantityVariationDialog
 from features.work_management.variation_manager import VariationManager
@@ -169,8 +170,9 @@ class ScheduleItemsTab(ttk.Frame):
         if not work_id:
             return
 
+        snapshot = db_manager.get_work_schedule_snapshot(work_id)
         base_columns = ["description", "quantity", "unit", "unit_rate", "labour_rate", "total_cost"]
-        variation_names = db_manager.get_variation_names_for_work(work_id)
+        variation_names = snapshot['variation_names']
         self.schedule_tree["columns"] = base_columns + variation_names
 
         self.schedule_tree.heading("description", text="Description")
@@ -183,24 +185,17 @@ class ScheduleItemsTab(ttk.Frame):
             self.schedule_tree.heading(v_name, text=v_name)
             self.schedule_tree.column(v_name, width=90, stretch=tk.NO, anchor=tk.CENTER)
 
-        all_items_from_db = db_manager.get_schedule_items(work_id)
-        item_map = {item['item_id']: dict(item) for item in all_items_from_db}
-        for item_id, item_data in item_map.items():
-            item_data['children'] = []
-            item_data['level'] = 0
-            item_data['firm_rates'] = db_manager.get_firm_rates(item_id)
-            item_data['variations'] = db_manager.get_schedule_item_variations(item_id)
-            reference_firm = self.reference_firm_var.get()
+        reference_firm = self.reference_firm_var.get()
+        for item_data in snapshot['items'].values():
             display_cost = next((rate['unit_rate'] * item_data['quantity'] for rate in item_data['firm_rates'] if rate['firm_name'] == reference_firm), 0)
             item_data['display_cost'] = display_cost
-        for item_id, item_data in item_map.items():
-            parent_id = item_data.get('parent_item_id')
-            if parent_id is not None and parent_id in item_map:
-                item_map[parent_id]['children'].append(item_data)
-        root_items = [item for item in item_map.values() if item.get('parent_item_id') is None]
-        root_items.sort(key=lambda x: x['item_name'])
-
-        def insert_item_recursive(items_list, parent_iid="", parent_sr_prefix="", level=0):
+        root_items = snapshot['root_items']
+
+        # Walk the tree first, then format the three currency columns of all
+        # rows in one batch before inserting them.
+        rows = []
+
+        def collect_item_recursive(items_list, parent_iid="", parent_sr_prefix="", level=0):
             sr_counter = 1
             for item in items_list:
                 current_sr_no = f"{parent_sr_prefix}.{sr_counter}" if parent_sr_prefix else str(sr_counter)
@@ -209,25 +204,25 @@ class ScheduleItemsTab(ttk.Frame):
                 processed_item['level'] = level
                 processed_item['sr_no'] = current_sr_no
                 self.processed_schedule_items.append(processed_item)
-                indent = "    " * level
-                display_description = f"{indent}{item['item_name']}"
-                
-                reference_firm = self.reference_firm_var.get()
+
                 unit_rate = next((rate['unit_rate'] for rate in item['firm_rates'] if rate['firm_name'] == reference_firm), 0)
                 labour_rate = next((rate['labour_rate'] for rate in item['firm_rates'] if rate['firm_name'] == reference_firm), 0)
-                
-                total_cost = unit_rate * item['quantity']
-                
-                variation_values = [item['variations'].get(v_name, 0) for v_name in variation_names]
-
-                values = (display_description, item['quantity'], item['unit'], utils_helpers.format_currency_inr(unit_rate), utils_helpers.format_currency_inr(labour_rate), utils_helpers.format_currency_inr(total_cost)) + tuple(variation_values)
-                self.schedule_tree.insert(parent_iid, tk.END, iid=item['item_id'], text=current_sr_no, values=values)
-                self.schedule_tree.item(item['item_id'], open=True) # Expand the item
+                rows.append((parent_iid, item, current_sr_no, level, unit_rate, labour_rate, unit_rate * item['quantity']))
                 if item['children']:
-                    item['children'].sort(key=lambda x: x['item_name'])
-                    insert_item_recursive(item['children'], item['item_id'], current_sr_no, level + 1)
+                    collect_item_recursive(item['children'], item['item_id'], current_sr_no, level + 1)
+
+        collect_item_recursive(root_items)
+
+        unit_rates, labour_rates, total_costs = (
+            format_inr_array([row[column] for row in rows]) for column in (4, 5, 6)
+        )
+        for n, (parent_iid, item, current_sr_no, level, _, _, _) in enumerate(rows):
+            indent = "    " * level
+            display_description = f"{indent}{item['item_name']}"
+            variation_values = [item['variations'].get(v_name, 0) for v_name in variation_names]
 
-        insert_item_recursive(root_items)
+            values = (display_description, item['quantity'], item['unit'], unit_rates[n], labour_rates[n], total_costs[n]) + tuple(variation_values)
+            self.schedule_tree.insert(parent_iid, tk.END, iid=item['item_id'], text=current_sr_no, values=values, open=True) # Expand the item
 
     def get_processed_schedule_items(self):
         return self.processed_schedule_items
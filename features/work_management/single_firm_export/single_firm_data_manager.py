@@ -8,6 +8,7 @@ class SingleFirmDataManager:
     def get_single_firm_data(self):
         work_details = db_manager.get_work_by_id(self.work_id)
         schedule_items = db_manager.get_schedule_items(self.work_id)
+        firm_rates = db_manager.get_firm_rates_for_work(self.work_id, self.selected_firm_name)
 
         data = {
             'work_name': work_details['work_name'],
@@ -23,11 +24,9 @@ class SingleFirmDataManager:
                 'unit': item['unit'],
                 'unit_rate': None
             }
-            firm_rates = db_manager.get_firm_rates(item['item_id'])
-            for rate in firm_rates:
-                if rate['firm_name'] == self.selected_firm_name:
-                    item_data['unit_rate'] = rate['unit_rate']
-                    break
+            firm_rate = firm_rates.get(item['item_id'])
+            if firm_rate:
+                item_data['unit_rate'] = firm_rate['rate']
             data['schedule_items'].append(item_data)
 
         return data
@@ -1,7 +1,7 @@
 import pandas as pd
 from .single_firm_data_manager import SingleFirmDataManager
 from .single_firm_excel_structure import SingleFirmExcelStructure
-from utils.helpers import format_currency_inr
+from utils.inr_format import INR_XLSX_FORMAT
 
 class SingleFirmExporter:
     def __init__(self, work_id, selected_firm_name):
@@ -30,7 +30,7 @@ class SingleFirmExporter:
         data_format = workbook.add_format({
             'border': 1
         })
-        currency_format = workbook.add_format({'num_format': '₹#,##,##0.00'})
+        currency_format = workbook.add_format({'num_format': INR_XLSX_FORMAT})
         percentage_format = workbook.add_format({'num_format': '0.00%'}) 
 
         # Manually write multi-level headers
@@ -1,7 +1,8 @@
+import multiprocessing
 import tkinter as tk
 from database.db_manager import create_tables
-from features.firm_documents.firm_documents_manager import create_firm_documents_table
 from features.work_management.main_window import MainWindow
+from features.template_engine.placeholder_catalog import start_catalog_warm_up
 from utils.styles import set_theme
 
 try:
@@ -11,12 +12,13 @@ except ImportError:
     print("Starting CMS Application (version information not available)")
 
 def main():
-    create_tables()  # Initialize SQLite database
-    create_firm_documents_table() # Create firm documents table
+    create_tables()  # Create or upgrade the SQLite schema (one PRAGMA read when current)
+    start_catalog_warm_up()  # Index the bundled templates in the background
     root = tk.Tk()
     # set_theme() is called by MainWindow now
     app = MainWindow(root)
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Document pack workers in the frozen build
     main()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+import time
+from utils.background_jobs import JobExecutor, DONE, FAILED, CANCELLED, QUEUED
+
+class FakeRoot:
+    """Stands in for the Tk root: after() callbacks are run by pump()."""
+    def __init__(self):
+        self.pending = []
+        self.thread = threading.current_thread()
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self, executor, timeout=5):
+        deadline = time.time() + timeout
+        while executor.active_jobs() and time.time() < deadline:
+            callbacks, self.pending = self.pending, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.01)
+        executor.process_events()
+
+def test_background_jobs():
+    print("--- Testing Background Job Executor ---")
+    root = FakeRoot()
+    executor = JobExecutor(root, max_workers=1)
+    events = []
+    executor.add_listener(lambda job: events.append((job and job.id, job and job.status, threading.current_thread() is root.thread)))
+    try:
+        # 1. Result and progress reach the Tk thread
+        print("Step 1: Running a job with progress...")
+        results = []
+        def work(job, n):
+            for i in range(n):
+                job.report(i, n, f"Step {i}")
+            return n * 2
+        job = executor.submit("Double", work, 3, on_done=lambda r: results.append((r, threading.current_thread() is root.thread)))
+        root.pump(executor)
+        assert job.status == DONE and job.done == 3 and job.total == 3
+        assert results == [(6, True)]
+        assert all(on_tk_thread for _, _, on_tk_thread in events)
+        print("SUCCESS: Result and progress delivered on the Tk thread.")
+
+        # 2. Failures go to on_error
+        print("\nStep 2: Running a failing job...")
+        errors = []
+        def fail(job):
+            raise ValueError("boom")
+        job = executor.submit("Fail", fail, on_done=lambda r: results.append(r), on_error=errors.append)
+        root.pump(executor)
+        assert job.status == FAILED and str(errors[0]) == "boom"
+        assert len(results) == 1
+        print("SUCCESS: Exception reported through on_error.")
+
+        # 3. Cancelling a running job and a queued one
+        print("\nStep 3: Cancelling jobs...")
+        started = threading.Event()
+        release = threading.Event()
+        def slow(job):
+            started.set()
+            release.wait(5)
+            job.raise_if_cancelled()
+            return "finished"
+        running = executor.submit("Slow", slow, on_done=results.append)
+        queued = executor.submit("Queued", slow, on_done=results.append)
+        assert started.wait(5)
+        assert queued.status == QUEUED
+        queued.cancel()
+        running.cancel()
+        release.set()
+        root.pump(executor)
+        assert running.status == CANCELLED and queued.status == CANCELLED
+        assert len(results) == 1, "on_done must not run for cancelled jobs"
+        print("SUCCESS: Running and queued jobs cancelled.")
+
+        # 4. Clearing finished jobs
+        executor.clear_finished()
+        assert executor.jobs == []
+        print("SUCCESS: Finished jobs cleared.")
+    finally:
+        executor.shutdown(wait=True)
+
+if __name__ == "__main__":
+    test_background_jobs()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+from datetime import datetime
+import pandas as pd
+from database import db_manager
+from features.work_management.bulk_io.bulk_io_manager import BulkIOManager
+from features.work_management.bulk_io.schedule_item_bulk_manager import ScheduleItemBulkManager
+from features.work_management.bulk_io.bulk_import_engine import import_schedule_items_from_file
+
+def test_bulk_import_schedule_items():
+    print("--- Testing Bulk Schedule Item Import ---")
+    db_manager.create_tables()
+
+    work_name = f"Bulk Import Test Work {datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    work_id = db_manager.add_work(name=work_name, description="Test work for bulk import.")
+    assert work_id, "Could not create work"
+    existing_id = db_manager.add_schedule_item(work_id, "Existing Parent", "job", 1)
+    try:
+        # 1. Re-imported export with an in-file tree, an existing parent and bad rows
+        print("Step 1: Importing schedule items from CSV...")
+        df = pd.DataFrame([
+            {'Item ID': 901, 'Item Name': 'Child', 'Quantity': 2, 'Unit': 'm3', 'Parent Item ID': 900},
+            {'Item ID': 900, 'Item Name': ' Parent ', 'Quantity': '1,000', 'Unit': 'job', 'Parent Item ID': None},
+            {'Item ID': 902, 'Item Name': 'Under Existing', 'Quantity': 5, 'Unit': 'nos', 'Parent Item ID': existing_id},
+            {'Item ID': 903, 'Item Name': 'No Unit', 'Quantity': 5, 'Unit': None, 'Parent Item ID': None},
+            {'Item ID': 904, 'Item Name': 'Bad Qty', 'Quantity': 'abc', 'Unit': 'nos', 'Parent Item ID': None},
+            {'Item ID': 905, 'Item Name': 'Orphan', 'Quantity': 1, 'Unit': 'nos', 'Parent Item ID': 903},
+        ])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, "items.csv")
+            df.to_csv(csv_path, index=False)
+            success, message = ScheduleItemBulkManager().import_schedule_items_from_csv(csv_path, work_id)
+        print(message)
+        assert success
+        assert message.startswith("Successfully imported 3 schedule items. 3 row(s) skipped:")
+        assert "Row 5: Unit is empty" in message
+        assert "Row 6: Quantity is not a number" in message
+        assert "Row 7: Parent item was skipped" in message
+        print("SUCCESS: Valid rows imported and invalid rows reported.")
+
+        # 2. Parent links resolved to the new ids
+        print("\nStep 2: Checking parent mapping...")
+        items = {item['item_name']: item for item in db_manager.get_schedule_items(work_id)}
+        assert items['Parent']['quantity'] == 1000
+        assert items['Child']['parent_item_id'] == items['Parent']['item_id']
+        assert items['Under Existing']['parent_item_id'] == existing_id
+        print("SUCCESS: Parent Item IDs mapped to the imported and existing items.")
+    finally:
+        db_manager.delete_work(work_id)
+
+def test_bulk_import_works():
+    print("--- Testing Bulk Work Import ---")
+    db_manager.create_tables()
+
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    names = [f"Bulk Work A {stamp}", f"Bulk Work B {stamp}"]
+    df = pd.DataFrame([
+        {'Work Name': names[0], 'Description': 'First', 'File No': 123, 'Tender Cost': 1500.5, 'LOA Date': datetime(2024, 1, 15)},
+        {'Work Name': names[1], 'Description': 'Second', 'File No': None, 'Tender Cost': None, 'LOA Date': None},
+        {'Work Name': names[0], 'Description': 'Duplicate', 'File No': None, 'Tender Cost': None, 'LOA Date': None},
+        {'Work Name': None, 'Description': 'Nameless', 'File No': None, 'Tender Cost': None, 'LOA Date': None},
+    ])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        xlsx_path = os.path.join(temp_dir, "works.xlsx")
+        df.to_excel(xlsx_path, index=False)
+        success, message = BulkIOManager().import_works_from_excel(xlsx_path)
+    print(message)
+    try:
+        assert success
+        assert "Successfully imported 2 works. 2 row(s) skipped:" in message
+        assert "Row 4: Duplicate Work Name in file" in message
+        assert "Row 5: Work Name is empty" in message
+        works = {w[1]: w for w in db_manager.get_works() if w[1] in names}
+        assert works[names[0]][6] == "123" and works[names[0]][8] == 1500.5 and works[names[0]][11] == "15-01-2024"
+        print("SUCCESS: Works imported with cleaned values.")
+    finally:
+        for work in db_manager.get_works():
+            if work[1] in names:
+                db_manager.delete_work(work[0])
+
+def test_streaming_import_in_chunks():
+    print("--- Testing Streaming Schedule Item Import ---")
+    db_manager.create_tables()
+
+    work_name = f"Streaming Import Test Work {datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    work_id = db_manager.add_work(name=work_name, description="Test work for streaming import.")
+    assert work_id, "Could not create work"
+    try:
+        # Children reference parents that arrive in a later chunk
+        rows = [{'Item ID': 100 + i, 'Item Name': f"Child {i}", 'Quantity': i, 'Unit': 'nos', 'Parent Item ID': 1}
+                for i in range(5)]
+        rows.append({'Item ID': 1, 'Item Name': 'Late Parent', 'Quantity': 1, 'Unit': 'job', 'Parent Item ID': None})
+        rows.append({'Item ID': 2, 'Item Name': 'Dangling', 'Quantity': 1, 'Unit': 'job', 'Parent Item ID': 999999999})
+        progress = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            xlsx_path = os.path.join(temp_dir, "items.xlsx")
+            pd.DataFrame(rows).to_excel(xlsx_path, index=False)
+            report = import_schedule_items_from_file(
+                xlsx_path, work_id, lambda done, total: progress.append((done, total)), chunk_size=2
+            )
+        print(report.message())
+        assert progress == [(2, 7), (4, 7), (6, 7), (7, 7)]
+        assert report.imported == 6
+        assert report.errors == [(8, "Parent Item ID not found in file or work")]
+        items = {item['item_name']: item for item in db_manager.get_schedule_items(work_id)}
+        parent_id = items['Late Parent']['item_id']
+        assert all(items[f"Child {i}"]['parent_item_id'] == parent_id for i in range(5))
+        print("SUCCESS: Chunks streamed with progress and forward parent references resolved.")
+    finally:
+        db_manager.delete_work(work_id)
+
+if __name__ == '__main__':
+    test_bulk_import_schedule_items()
+    test_streaming_import_in_chunks()
+    test_bulk_import_works()
@@ -0,0 +1,42 @@
+import numpy as np
+from datetime import datetime
+from database import db_manager
+from features.comparison.comparison_data_manager import ComparisonDataManager
+
+def test_comparison_matrix():
+    print("--- Testing Comparison Rate Matrix ---")
+    db_manager.create_tables()
+
+    work_name = f"Comparison Matrix Test Work {datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    work_id = db_manager.add_work(name=work_name, description="Test work for comparison matrix.")
+    assert work_id, "Could not create work"
+    try:
+        item1_id = db_manager.add_schedule_item(work_id, "Item 1", "m3", 100)
+        item2_id = db_manager.add_schedule_item(work_id, "Item 2", "nos", 20)
+        db_manager.upsert_firm_rate(item1_id, "Firm A", 1500)
+        db_manager.upsert_firm_rate(item2_id, "Firm A", 500)
+        db_manager.upsert_firm_rate(item1_id, "Firm B", 1400)
+        db_manager.upsert_firm_rate(item1_id, "Firm C", 1500)
+        db_manager.upsert_firm_rate(item2_id, "Firm C", 500)
+
+        # 1. Rates pivot into an item x firm matrix, NaN where a firm did not quote
+        print("Step 1: Building the rate matrix...")
+        manager = ComparisonDataManager(work_id)
+        data = manager.get_comparison_data()
+        assert data['firm_names'] == ["Firm A", "Firm B", "Firm C"]
+        np.testing.assert_array_equal(data['rate_matrix'], [[1500, 1400, 1500], [500, np.nan, 500]])
+        print("SUCCESS: Rate matrix matches the stored firm rates.")
+
+        # 2. Totals, ranks and variation from L-1
+        print("\nStep 2: Computing the firm summary...")
+        summary = manager.compute_firm_summary(data)
+        np.testing.assert_allclose(summary['totals'], [160000, 140000, 160000])
+        np.testing.assert_allclose(summary['totals_with_gst'], [188800, 165200, 188800])
+        assert summary['ranks'].tolist() == [2, 1, 2]
+        np.testing.assert_allclose(summary['above_l1'], [20000 / 140000, 0, 20000 / 140000])
+        print("SUCCESS: Totals, L-n positions and variation from L-1 are correct.")
+    finally:
+        db_manager.delete_work(work_id)
+
+if __name__ == '__main__':
+    test_comparison_matrix()
@@ -0,0 +1,91 @@
+"""
+Tests for the shared SQLite connection provider.
+
+Checks that connections are reused per thread, isolated across threads,
+tuned with the expected PRAGMAs and that transaction() commits/rolls back.
+"""
+
+import os
+import tempfile
+import threading
+from database.connection import get_connection, transaction, close_all_connections
+
+
+def _temp_db_path():
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
+        return temp_db.name
+
+
+def _cleanup(path):
+    close_all_connections()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+def test_connection_reuse_and_pragmas():
+    print("--- Testing connection reuse and PRAGMAs ---")
+    path = _temp_db_path()
+    try:
+        first = get_connection(path)
+        second = get_connection(path)
+        if first is second:
+            print("SUCCESS: Same thread reuses the pooled connection")
+        else:
+            print("FAILURE: A new connection was opened for the same thread")
+        assert first is second
+
+        journal_mode = first.execute("PRAGMA journal_mode").fetchone()[0]
+        temp_store = first.execute("PRAGMA temp_store").fetchone()[0]
+        print(f"journal_mode={journal_mode}, temp_store={temp_store}")
+        assert journal_mode.lower() == "wal"
+        assert temp_store == 2  # MEMORY
+
+        other = {}
+        thread = threading.Thread(target=lambda: other.setdefault('conn', get_connection(path)))
+        thread.start()
+        thread.join()
+        if other['conn'] is not first:
+            print("SUCCESS: Each thread gets its own connection")
+        else:
+            print("FAILURE: Connection was shared across threads")
+        assert other['conn'] is not first
+    finally:
+        _cleanup(path)
+
+
+def test_transaction_commit_and_rollback():
+    print("\n--- Testing transaction commit and rollback ---")
+    path = _temp_db_path()
+    try:
+        with transaction(path) as cursor:
+            cursor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+            cursor.execute("INSERT INTO t (name) VALUES ('a')")
+
+        try:
+            with transaction(path) as cursor:
+                cursor.execute("INSERT INTO t (name) VALUES ('b')")
+                with transaction(path) as inner:
+                    inner.execute("INSERT INTO t (name) VALUES ('a')")  # violates UNIQUE
+        except Exception as e:
+            print(f"Expected error inside transaction: {e}")
+
+        names = [row[0] for row in get_connection(path).execute("SELECT name FROM t ORDER BY name")]
+        if names == ['a']:
+            print("SUCCESS: Failed outer transaction rolled back nested work")
+        else:
+            print(f"FAILURE: Unexpected rows after rollback: {names}")
+        assert names == ['a']
+
+        close_all_connections()
+        names = [row[0] for row in get_connection(path).execute("SELECT name FROM t")]
+        if names == ['a']:
+            print("SUCCESS: Data survives closing every pooled connection")
+        assert names == ['a']
+    finally:
+        _cleanup(path)
+
+
+if __name__ == '__main__':
+    test_connection_reuse_and_pragmas()
+    test_transaction_commit_and_rollback()
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+from docx import Document
+from features.AutodocGen.document_pack import MANIFEST_NAME, generate_document_pack, plan_pack
+from features.template_engine.generation_benchmark import create_synthetic_work, delete_synthetic_work
+
+def _templates(temp_dir):
+    letter = Document()
+    letter.add_paragraph("MULTI_FIRM_IDENTIFIER")
+    letter.add_paragraph("To <<FIRM_NAME>>, <<FIRM_ADDRESS>>")
+    letter.add_paragraph("Subject: [NAME], PG No. <<PG_NO>>")
+    letter_path = os.path.join(temp_dir, "PG Letter.docx")
+    letter.save(letter_path)
+
+    note = Document()
+    note.add_paragraph("Office note for [NAME], file [FILE_NO]")
+    note_path = os.path.join(temp_dir, "Office Note.docx")
+    note.save(note_path)
+    return letter_path, note_path
+
+def test_plan_pack():
+    print("--- Testing Document Pack Plan ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        letter_path, note_path = _templates(temp_dir)
+        pack = plan_pack([letter_path, note_path], ["Firm A", "Firm/B"], "out")
+        assert [(os.path.basename(d.template_path), d.firm_name) for d in pack] == [
+            ("PG Letter.docx", "Firm A"), ("PG Letter.docx", "Firm/B"), ("Office Note.docx", None)
+        ]
+        assert os.path.basename(pack[1].output_path) == "PG Letter_Firm_B.docx"
+        print("Step 1: Firm-specific templates are planned once per firm, others once.")
+
+        other_dir = os.path.join(temp_dir, "other")
+        os.makedirs(other_dir)
+        _, other_note_path = _templates(other_dir)
+        pack = plan_pack([letter_path, note_path, other_note_path], ["A/B", "A:B"], "out")
+        names = [os.path.basename(d.output_path) for d in pack]
+        assert names == ["PG Letter_A_B.docx", "PG Letter_A_B_2.docx", "Office Note.docx", "Office Note_4.docx"], names
+        print("Step 2: Clashing template and firm names get distinct output files.")
+        print("SUCCESS: Document packs are planned with one output file per document.")
+
+def test_generate_document_pack():
+    print("--- Testing Document Pack Generation ---")
+    work_id, firm_names = create_synthetic_work(3, label="pack ")
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            letter_path, note_path = _templates(temp_dir)
+            outputs = {}
+            for workers in (1, 2):
+                output_dir = os.path.join(temp_dir, f"pack_{workers}")
+                progress = []
+                manifest = generate_document_pack(
+                    work_id, [letter_path, note_path], output_dir, firm_names,
+                    merged_pack_path=os.path.join(output_dir, "pack.docx"), max_workers=workers,
+                    progress=lambda done, total, message: progress.append((done, total))
+                )
+                assert manifest['workers'] == workers
+                assert manifest['planned'] == manifest['generated'] == 4 and manifest['failed'] == 0, manifest
+                assert progress[-1] == (4, 4)
+                with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+                    assert json.load(f)['documents'] == manifest['documents']
+                outputs[workers] = {
+                    entry['file']: [p.text for p in Document(os.path.join(output_dir, entry['file'])).paragraphs]
+                    for entry in manifest['documents']
+                }
+                print(f"Step {workers}: {manifest['generated']} documents with {workers} worker(s) in {manifest['seconds']}s.")
+
+            assert outputs[1] == outputs[2]
+            second_letter = outputs[1][os.path.basename(plan_pack([letter_path], firm_names, "")[1].output_path)]
+            assert second_letter[1] == f"To {firm_names[1]}, 2 Industrial Area", second_letter
+            assert "MULTI_FIRM_IDENTIFIER" not in second_letter[0]
+            assert outputs[1]["Office Note.docx"][0].startswith("Office note for Benchmark Work 3 firms")
+
+            merged = [p.text for p in Document(os.path.join(temp_dir, "pack_2", "pack.docx")).paragraphs]
+            assert sum(1 for text in merged if text.startswith("To ")) == 3
+            assert sum(1 for text in merged if text.startswith("Office note for")) == 1
+        print("SUCCESS: Parallel and serial packs match and the merged pack holds every document.")
+    finally:
+        delete_synthetic_work(work_id, firm_names)
+
+if __name__ == '__main__':
+    test_plan_pack()
+    test_generate_document_pack()
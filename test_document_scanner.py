@@ -0,0 +1,61 @@
+import os
+import tempfile
+from docx import Document
+from database import db_manager
+from features.template_engine.document_scanner import iter_paragraph_texts
+from features.template_engine.template_processor import TemplateProcessor
+from features.AutodocGen.placeholder_parser import PlaceholderParser
+
+def test_document_scanner():
+    print("--- Testing lxml Document Scanner ---")
+    db_manager.create_tables()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = os.path.join(temp_dir, "scan.docx")
+        document = Document()
+        paragraph = document.add_paragraph("Dear <<FIRM_NAME>>, ")
+        paragraph.add_run("[NA")
+        paragraph.add_run("ME]").bold = True
+        paragraph.add_run().add_tab()
+        paragraph.add_run("{{COST_IN_WORDS}}")
+        table = document.add_table(rows=2, cols=2)
+        merged = table.cell(0, 0).merge(table.cell(0, 1))
+        merged.text = "Merged {{COST}}"
+        nested = table.cell(1, 0).add_table(rows=1, cols=1)
+        nested.cell(0, 0).text = "Nested [LOA_NO]"
+        document.sections[0].header.paragraphs[0].text = "Header [FILE_NO]"
+        document.sections[0].footer.paragraphs[0].text = "Footer [ALL_FIRMS_PG_DETAILS]"
+        # A second section sharing the first one's header and footer
+        document.add_section()
+        document.add_paragraph("Second section {{REF_NO}}")
+        document.save(template_path)
+
+        # 1. Paragraph texts, split runs joined, each paragraph once
+        print("Step 1: Scanning paragraph texts...")
+        texts = list(iter_paragraph_texts(template_path))
+        assert "Dear <<FIRM_NAME>>, [NAME]\t{{COST_IN_WORDS}}" in texts
+        assert texts.count("Merged {{COST}}") == 1
+        assert "Nested [LOA_NO]" in texts
+        assert texts.count("Header [FILE_NO]") == 1
+        print("SUCCESS: Body, merged and nested cells, header and footer scanned once.")
+
+        # 2. TemplateProcessor extraction
+        print("\nStep 2: Extracting template engine placeholders...")
+        placeholders = TemplateProcessor().extract_all_placeholders(template_path)
+        assert placeholders['all_user_input'] == {"COST_IN_WORDS", "COST", "REF_NO"}
+        assert placeholders['user_input'] == {"COST", "REF_NO"}
+        assert placeholders['work_level'] == {"NAME", "LOA_NO", "FILE_NO", "ALL_FIRMS_PG_DETAILS"}
+        assert placeholders['firm_level'] == {"FIRM_NAME"}
+        assert TemplateProcessor().extract_placeholders(template_path) == {"COST", "REF_NO"}
+        print("SUCCESS: Placeholder types extracted.")
+
+        # 3. AutodocGen parser extraction
+        print("\nStep 3: Extracting AutodocGen placeholders...")
+        user_input, work_data, firm, all_firms_pg = PlaceholderParser().extract_placeholders(template_path)
+        assert user_input == {"COST_IN_WORDS", "COST", "REF_NO"}
+        assert work_data == {"NAME", "LOA_NO", "FILE_NO", "ALL_FIRMS_PG_DETAILS"}
+        assert firm == {"FIRM_NAME"}
+        assert all_firms_pg == {"[ALL_FIRMS_PG_DETAILS]"}
+        print("SUCCESS: PlaceholderParser uses the shared scanner.")
+
+if __name__ == "__main__":
+    test_document_scanner()
@@ -0,0 +1,120 @@
+import gc
+import os
+import tempfile
+import tracemalloc
+import zipfile
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+from database import db_manager
+from features.template_engine.docx_merge import DocumentMerger
+from features.template_engine.template_processor import TemplateProcessor
+from features.template_engine.generation_benchmark import create_synthetic_work, delete_synthetic_work
+
+def _logo(temp_dir, name, color):
+    path = os.path.join(temp_dir, name)
+    Image.new("RGB", (120, 60), color).save(path)
+    return path
+
+def _letter(temp_dir, name, logo_path, header_text):
+    document = Document()
+    header = document.sections[0].header.paragraphs[0]
+    header.text = header_text
+    header.add_run().add_picture(logo_path, width=Inches(0.5))
+    document.add_picture(logo_path, width=Inches(0.5))
+    document.add_paragraph(f"Letter {name}")
+    path = os.path.join(temp_dir, f"{name}.docx")
+    document.save(path)
+    return path
+
+def _package_parts(path, prefix):
+    with zipfile.ZipFile(path) as package:
+        return sorted(name for name in package.namelist() if name.startswith(prefix))
+
+def test_merge_shares_repeated_parts():
+    print("--- Testing Shared Parts When Merging Documents ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        red = _logo(temp_dir, "red.png", (200, 30, 30))
+        blue = _logo(temp_dir, "blue.png", (30, 30, 200))
+        paths = [_letter(temp_dir, f"firm{n}", red, "Letter head") for n in range(6)]
+
+        merger = DocumentMerger(Document(paths[0]))
+        for path in paths[1:]:
+            merger.append(Document(path))
+        merged_path = merger.save(os.path.join(temp_dir, "merged.docx"))
+        assert merger.imported == 0, merger.imported
+        assert len(_package_parts(merged_path, "word/media/")) == 1
+        merged = Document(merged_path)
+        assert len(merged.inline_shapes) == 6
+        assert [p.text for p in merged.paragraphs if p.text.startswith("Letter ")] == [f"Letter firm{n}" for n in range(6)]
+        print("Step 1: Six letters with the same logo share one image part.")
+
+        paths.append(_letter(temp_dir, "other", blue, "Other head"))
+        merger = DocumentMerger(Document(paths[0]))
+        for path in paths[1:]:
+            merger.append(Document(path), keep_sections=True)
+        merged_path = merger.save(os.path.join(temp_dir, "sections.docx"))
+        assert len(_package_parts(merged_path, "word/media/")) == 2
+        assert len(_package_parts(merged_path, "word/header")) == 2
+        merged = Document(merged_path)
+        assert [s.header.paragraphs[0].text for s in merged.sections] == ["Letter head"] * 6 + ["Other head"]
+        header_images = {rel.target_part.partname for s in merged.sections for rel in s.header.part.rels.values()}
+        assert len(header_images) == 2, header_images
+        print("Step 2: Kept sections reuse identical headers; a different header and logo are imported once.")
+    print("SUCCESS: Repeated media and header parts are stored once.")
+
+def test_merge_memory_is_flat():
+    print("--- Testing Merge Memory Across Appends ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Noise does not compress, so each loaded letter carries a large image blob
+        logo_path = os.path.join(temp_dir, "logo.png")
+        Image.frombytes("RGB", (400, 400), os.urandom(400 * 400 * 3)).save(logo_path)
+        letter_path = _letter(temp_dir, "firm", logo_path, "Letter head")
+
+        tracemalloc.start()
+        try:
+            merger = DocumentMerger(Document(letter_path))
+            retained = []
+            for n in range(30):
+                merger.append(Document(letter_path))
+                if n in (4, 29):
+                    gc.collect()
+                    retained.append(tracemalloc.get_traced_memory()[0] / 1024)
+        finally:
+            tracemalloc.stop()
+        growth = retained[1] - retained[0]
+        assert growth < 25 * 100, f"{growth:.0f} KiB retained by 25 more appends"
+        assert len(_package_parts(merger.save(os.path.join(temp_dir, "merged.docx")), "word/media/")) == 1
+        print(f"Step 1: 25 more appends retain {growth:.0f} KiB; appended documents are released.")
+    print("SUCCESS: Merging does not keep appended documents alive.")
+
+def test_merged_letters_share_template_parts():
+    print("--- Testing Merged Letter Output Size ---")
+    work_id, firm_names = create_synthetic_work(8, label="merge ")
+    try:
+        work_name = db_manager.get_work_by_id(work_id)['work_name']
+        with tempfile.TemporaryDirectory() as temp_dir:
+            logo_path = _logo(temp_dir, "logo.png", (200, 30, 30))
+            template_path = _letter(temp_dir, "Template", logo_path, "Ref [NAME]")
+            output_path = os.path.join(temp_dir, "letters.docx")
+            success, message = TemplateProcessor().generate_letters_for_firms(template_path, {}, work_id, output_path)
+            assert success, message
+            assert len(_package_parts(output_path, "word/media/")) == 1
+            assert len(_package_parts(output_path, "word/header")) == 1
+            merged = Document(output_path)
+            assert len(merged.inline_shapes) == 8
+            assert len(merged.sections) == 1
+            assert merged.sections[0].header.paragraphs[0].text == f"Ref {work_name}"
+            print("Step 1: Eight merged letters share one image and one header, filled with the work's data.")
+
+            template_path = _letter(temp_dir, "Firm Template", logo_path, "Ref [NAME] to <<FIRM_NAME>>")
+            success, message = TemplateProcessor().generate_letters_for_firms(template_path, {}, work_id, output_path)
+            assert success, message
+            assert len(_package_parts(output_path, "word/media/")) == 1
+            merged = Document(output_path)
+            assert [s.header.paragraphs[0].text for s in merged.sections] == [f"Ref {work_name} to {firm}" for firm in firm_names]
+            assert [p.text for p in merged.paragraphs if p.text.startswith("Letter ")] == ["Letter Firm Template"] * 8
+            print("Step 2: A header with a firm placeholder gives each letter its own section and header.")
+        print("SUCCESS: Merged letters are written into the template package.")
+    finally:
+        delete_synthetic_work(work_id, firm_names)
@@ -10,6 +10,11 @@ sys.path.append('.')
 from features.AutodocGen.data_fetcher import DataFetcher
 from features.AutodocGen.document_generator import DocumentGenerator
 from config import DATABASE_PATH
+import tempfile
+import time
+from database import db_manager
+from database.connection import get_connection
+from features.AutodocGen.enquiry_table_formatter import EnquiryTableFormatter
 
 def test_enquiry_table():
     """Test that ENQUIRY_TABLE placeholder creates a proper table"""
@@ -80,5 +85,50 @@ def test_enquiry_table():
         import traceback
         traceback.print_exc()
 
+def test_enquiry_table_bulk_builder():
+    """A 2,000-item enquiry table is built with one rates query and in well under a second"""
+    print("--- Testing Enquiry Table Bulk Builder ---")
+    db_manager.create_tables()
+    work_id = db_manager.add_work(name=f"Enquiry Table Test {time.time()}", description="Enquiry table test work")
+    try:
+        item_ids = db_manager.add_schedule_items_bulk(work_id, [
+            {'item_name': f"Item {n} <pipes & fittings>", 'unit': 'Nos', 'quantity': n + 1} for n in range(2000)
+        ])
+        db_manager.upsert_firm_rate(item_ids[0], "Reference Firm", 100.0)
+        db_manager.upsert_firm_rate(item_ids[1], "Reference Firm", 250.5)
+        print("Step 1: Created a work with 2,000 schedule items.")
+
+        document = Document()
+        document.add_paragraph("Enquiry Details:")
+        document.add_paragraph("End of enquiry table.")
+        statements = []
+        conn = get_connection(DATABASE_PATH)
+        conn.set_trace_callback(statements.append)
+        start = time.perf_counter()
+        try:
+            EnquiryTableFormatter().create_enquiry_table_at_location(document, work_id, "Reference Firm", 0)
+        finally:
+            conn.set_trace_callback(None)
+        elapsed = time.perf_counter() - start
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 2, selects
+        assert elapsed < 1.0, f"Table took {elapsed:.2f}s"
+        print(f"Step 2: Table built in {elapsed:.3f}s with {len(selects)} queries.")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "enquiry_table.docx")
+            document.save(output_path)
+            table = Document(output_path).tables[0]
+        assert len(table.rows) == 2004
+        assert [c.text for c in table.rows[0].cells] == ["SN", "Schedule Items", "Qty", "Unit", "ELS KYN Estimate", "ELS KYN Estimate", "Firm Quoted", "Firm Quoted"]
+        assert [c.text for c in table.rows[2].cells][:6] == ["1", "Item 0 <pipes & fittings>", "1.0", "Nos", "₹ 100.00/-", "₹ 100.00/-"]
+        assert table.rows[3].cells[5].text == "₹ 501.00/-"
+        assert table.rows[4].cells[4].text == "₹ 0.00/-"
+        assert [c.text for c in table.rows[-1].cells][4:6] == ["Grand Total", "₹ 709.18/-"]
+        print("SUCCESS: Enquiry table rows, merged headers and totals are correct.")
+    finally:
+        db_manager.delete_work(work_id)
+
 if __name__ == "__main__":
     test_enquiry_table()
+    test_enquiry_table_bulk_builder()
@@ -0,0 +1,38 @@
+from datetime import datetime
+from database import db_manager
+from features.estimates.data_loader import load_data
+
+def test_estimate_data_loader():
+    print("--- Testing Estimate Data Loader ---")
+    db_manager.create_tables()
+
+    work_name = f"Estimate Loader Test Work {datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    work_id = db_manager.add_work(name=work_name, description="Estimate loader test", work_type_subcategory="M&P")
+    assert work_id, "Could not create work"
+    try:
+        item1_id = db_manager.add_schedule_item(work_id, "Item 1", "m3", 10)
+        item2_id = db_manager.add_schedule_item(work_id, "Item 2", "nos", 4)
+        db_manager.upsert_firm_rate(item1_id, "Firm A", 150, 20)
+        db_manager.upsert_firm_rate(item1_id, "Firm B", 999)
+        db_manager.upsert_firm_rate(item2_id, "Firm B", 50)
+
+        # 1. Bulk lookup matches the per-item lookup
+        print("Step 1: Comparing bulk firm rates with per-item lookups...")
+        rates = db_manager.get_firm_rates_for_work(work_id, "Firm A")
+        assert rates == {item1_id: db_manager.get_firm_rate_for_item(item1_id, "Firm A")}
+        print("SUCCESS: get_firm_rates_for_work matches get_firm_rate_for_item.")
+
+        # 2. load_data uses the map and leaves unrated items empty
+        print("\nStep 2: Loading estimate data...")
+        data, subcategory = load_data(work_id, "Firm A")
+        assert subcategory == "M&P"
+        assert [(row['description'], row['rate'], row['labour_rate']) for row in data[1:]] == [
+            ("Item 1", 150.0, 20.0),
+            ("Item 2", None, None),
+        ]
+        print("SUCCESS: Estimate rows carry the selected firm's rates.")
+    finally:
+        db_manager.delete_work(work_id)
+
+if __name__ == '__main__':
+    test_estimate_data_loader()
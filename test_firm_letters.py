@@ -0,0 +1,79 @@
+import os
+import tempfile
+from datetime import datetime
+from docx import Document
+from docx.oxml.ns import qn
+from database import db_manager
+from database.connection import transaction
+from features.template_engine.template_processor import TemplateProcessor
+from features.template_engine.compiled_template import load_compiled_template
+
+def _text(element):
+    return "".join(t.text for t in element.iter(qn('w:t')))
+
+def test_generate_letters_for_firms():
+    print("--- Testing Compiled Template Letters ---")
+    db_manager.create_tables()
+
+    work_name = f"Letters Test Work {datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    work_id = db_manager.add_work(name=work_name, description="Test work for firm letters.")
+    assert work_id, "Could not create work"
+    firms = ["Alpha Builders", "Beta Electricals", "Gamma Works"]
+    try:
+        for n, firm in enumerate(firms):
+            db_manager.add_firm_document(work_id, firm, f"PG-{n}", 1000.0 * (n + 1), "State Bank", "Main Road",
+                                         "", "", "01-01-2025", 1, 0, "FDR", "", "")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_path = os.path.join(temp_dir, "letter.docx")
+            output_path = os.path.join(temp_dir, "letters.docx")
+            template = Document()
+            template.add_paragraph("To <<FIRM_NAME>>, PG No. <<PG_NO>>")
+            static = template.add_paragraph()
+            static.add_run("Static bold text").bold = True
+            table = template.add_table(rows=1, cols=2)
+            table.cell(0, 0).text = "Work: [NAME]"
+            table.cell(0, 1).text = "Ref {{REF_NO}}"
+            template.sections[0].header.paragraphs[0].text = "Ref [NAME] to <<FIRM_NAME>>"
+            template.sections[0].footer.paragraphs[0].text = "Page footer"
+            template.save(template_path)
+
+            # 1. Only placeholder paragraphs become slots
+            print("Step 1: Compiling the template...")
+            compiled = load_compiled_template(template_path)
+            assert [text for _, text in compiled.slots] == ["To <<FIRM_NAME>>, PG No. <<PG_NO>>", "Work: [NAME]", "Ref {{REF_NO}}"]
+            assert load_compiled_template(template_path) is compiled, "Unchanged template should come from the cache"
+            header_parts = [part for part in compiled.parts.values() if part.slots]
+            assert [text for part in header_parts for _, text in part.slots] == ["Ref [NAME] to <<FIRM_NAME>>"]
+            header = compiled.render_part(header_parts[0].name, lambda text: text.replace("<<FIRM_NAME>>", "Alpha"))
+            assert _text(header) == "Ref [NAME] to Alpha"
+            assert _text(header_parts[0].element) == "Ref [NAME] to <<FIRM_NAME>>", "Rendering works on a copy"
+            print("SUCCESS: Slots recorded and compiled template cached.")
+
+            # 2. One letter per firm with that firm's data
+            print("\nStep 2: Generating letters...")
+            success, message = TemplateProcessor().generate_letters_for_firms(template_path, {"REF_NO": "R-7"}, work_id, output_path)
+            assert success, message
+            output = Document(output_path)
+            texts = [p.text for p in output.paragraphs]
+            for n, firm in enumerate(firms):
+                assert f"To {firm}, PG No. PG-{n}" in texts
+            assert texts.count("Static bold text") == len(firms)
+            assert all(p.runs[0].bold for p in output.paragraphs if p.text == "Static bold text"), "Static paragraphs keep their runs"
+            cells = [cell.text for table in output.tables for cell in table.rows[0].cells]
+            assert cells == [f"Work: {work_name}", "Ref R-7"] * len(firms)
+            print("SUCCESS: Each firm's letter filled from one compiled template.")
+
+            # 3. Editing the template recompiles it
+            template.add_paragraph("Dear <<FIRM_NAME>>")
+            template.save(template_path)
+            os.utime(template_path, ns=(0, 0))
+            assert load_compiled_template(template_path) is not compiled
+            print("SUCCESS: Changed template recompiled.")
+    finally:
+        with transaction(db_manager.DATABASE_PATH) as cursor:
+            cursor.execute("DELETE FROM firm_documents WHERE work_id = ?", (work_id,))
+        db_manager.delete_work(work_id)
+
+if __name__ == "__main__":
+    test_generate_letters_for_firms()
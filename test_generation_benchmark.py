@@ -0,0 +1,51 @@
+import os
+import tempfile
+from docx import Document
+from config import DATABASE_PATH
+from database.connection import get_connection
+from features.template_engine.generation_benchmark import (
+    build_synthetic_template, compare_results, load_results, run_benchmark, save_results,
+)
+
+def test_synthetic_template_shape():
+    print("--- Testing Synthetic Benchmark Template ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = build_synthetic_template(os.path.join(temp_dir, "t.docx"), paragraphs=6, tables=2, table_rows=3)
+        doc = Document(path)
+        assert len(doc.tables) == 2 and all(len(t.rows) == 3 for t in doc.tables)
+        text = "\n".join(p.text for p in doc.paragraphs)
+        assert "[NAME]" in text and "<<FIRM_NAME>>" in text and "[ALL_FIRMS_PG_DETAILS]" in text
+        assert "[FILE_NO]" in doc.sections[0].header.paragraphs[0].text
+        print("SUCCESS: Template has the requested paragraphs, tables and header.")
+
+def _benchmark_catalog_entries():
+    cursor = get_connection(DATABASE_PATH).execute(
+        "SELECT COUNT(*) FROM template_catalog WHERE path LIKE ?", ("%benchmark_template.docx",))
+    return cursor.fetchone()[0]
+
+def test_benchmark_run_and_compare():
+    print("--- Testing Generation Benchmark ---")
+    catalog_entries = _benchmark_catalog_entries()
+    results = run_benchmark(firm_counts=(1, 3), repeat=1, paragraphs=6, tables=1, table_rows=2, progress=None)
+    assert _benchmark_catalog_entries() == catalog_entries
+    cases = {(r['case'], r['firms']) for r in results['results']}
+    assert len(cases) == 6, cases
+    for r in results['results']:
+        assert r['wall_s'] > 0 and r['peak_kib'] > 0 and r['sql'] >= 0, r
+    print("Step 1: Every case was measured for every firm count.")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "baseline.json")
+        save_results(results, path)
+        baseline = load_results(path)
+    assert compare_results(baseline, results) == []
+
+    slower = {'results': [dict(r, wall_s=r['wall_s'] * 2, sql=r['sql'] + 1) for r in baseline['results']]}
+    regressions = compare_results(baseline, slower)
+    assert {r['metric'] for r in regressions} == {'wall_s', 'sql'}, regressions
+    print("Step 2: Slower runs and extra SQL statements are reported as regressions.")
+    print("SUCCESS: Benchmark results round-trip and compare.")
+
+if __name__ == '__main__':
+    test_synthetic_template_shape()
+    test_benchmark_run_and_compare()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from docx import Document
+from config import DATABASE_PATH
+from database.connection import get_connection
+from features.AutodocGen.data_fetcher import DataFetcher
+from features.AutodocGen.document_generator import DocumentGenerator
+from features.AutodocGen.generation_context import GenerationContext
+from features.template_engine.generation_benchmark import create_synthetic_work, delete_synthetic_work
+
+def test_generation_context_counts_hits_and_misses():
+    print("--- Testing Generation Context ---")
+    context = GenerationContext(work_id=1)
+    calls = []
+    compute = lambda: calls.append(1) or "value"
+    assert context.get('pg', compute) == "value"
+    assert context.get('pg', compute) == "value"
+    assert context.get('firm', compute, "A") == "value"
+    assert context.get('firm', compute, "B") == "value"
+    context.record('placeholders', hits=5, misses=2)
+    assert len(calls) == 3
+    assert context.stats() == {
+        'firm': {'hits': 0, 'misses': 2},
+        'pg': {'hits': 1, 'misses': 1},
+        'placeholders': {'hits': 5, 'misses': 2},
+    }
+    print("SUCCESS: Values are computed once per key and counted.")
+
+def test_generate_shares_values_across_document_parts():
+    print("--- Testing Generation Context in DocumentGenerator ---")
+    work_id, firm_names = create_synthetic_work(3, label="context ")
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template = Document()
+            template.sections[0].header.paragraphs[0].text = "<<FIRM_NAME>> [ALL_FIRMS_PG_DETAILS]"
+            for _ in range(5):
+                template.add_paragraph("[ALL_FIRMS_PG_DETAILS] <<FIRM_ADDRESS>> <<PG_NO>>")
+            template.add_paragraph("[ENQUIRY_TABLE]")
+            template.add_paragraph("[ENQUIRY_TABLE]")
+            cell = template.add_table(rows=1, cols=2).rows[0].cells[0]
+            cell.text = "[ALL_FIRMS_PG_DETAILS] <<FIRM_REPRESENTATIVE>>"
+            template_path = os.path.join(temp_dir, "template.docx")
+            template.save(template_path)
+
+            generator = DocumentGenerator(DataFetcher(DATABASE_PATH))
+            data = {'work_id': work_id, 'firm_name': firm_names[1]}
+            statements = []
+            conn = get_connection(DATABASE_PATH)
+            conn.set_trace_callback(statements.append)
+            try:
+                generator.generate(template_path, data, os.path.join(temp_dir, "out.docx"), is_firm_specific=True)
+            finally:
+                conn.set_trace_callback(None)
+
+            stats = generator.last_stats
+            print(f"Step 1: Cache statistics {stats}")
+            assert stats['all_firms_pg_details'] == {'hits': 0, 'misses': 1}
+            assert stats['enquiry_table'] == {'hits': 1, 'misses': 1}
+            assert stats['reference_firm']['misses'] == 1 and stats['reference_firm']['hits'] == 1
+            assert stats['placeholders']['hits'] >= 10
+
+            selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+            schedule_queries = [s for s in selects if s.startswith("SELECT id, parent_item_id")]
+            assert len(schedule_queries) == 1, schedule_queries  # loaded once for both tables
+            print(f"Step 2: {len(selects)} SELECT statements for the whole document.")
+
+            output = Document(os.path.join(temp_dir, "out.docx"))
+            header_text = output.sections[0].header.paragraphs[0].text
+            assert header_text.startswith(firm_names[1]) and "[ALL_FIRMS_PG_DETAILS]" not in header_text
+            assert "2 Industrial Area PG/2" in output.paragraphs[0].text
+            assert "Representative 2" in output.tables[0].rows[0].cells[0].text
+        print("SUCCESS: Expensive values are computed once per generate() call.")
+    finally:
+        delete_synthetic_work(work_id, firm_names)
+
+if __name__ == '__main__':
+    test_generation_context_counts_hits_and_misses()
+    test_generate_shares_values_across_document_parts()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from openpyxl import load_workbook
+from utils.inr_format import format_inr, format_inr_array, INR_XLSX_FORMAT
+from utils.helpers import format_currency_inr
+
+def test_inr_format():
+    print("--- Testing INR Formatting ---")
+
+    # 1. Scalar formatting with lakh/crore grouping
+    print("Step 1: Formatting single amounts...")
+    assert format_inr(0) == "₹ 0.00/-"
+    assert format_inr(123) == "₹ 123.00/-"
+    assert format_inr(1234567.891) == "₹ 12,34,567.89/-"
+    assert format_inr(123456789.5) == "₹ 12,34,56,789.50/-"
+    assert format_inr(-1234.5) == "₹ -1,234.50/-"
+    assert format_inr(-123) == "₹ -123.00/-"
+    assert format_inr(-0.0) == "₹ 0.00/-"
+    assert format_currency_inr("2500") == "₹ 2,500.00/-"
+    print("SUCCESS: Scalar amounts formatted.")
+
+    # 2. Batch formatting matches the scalar path
+    print("\nStep 2: Formatting a column in one call...")
+    rng = np.random.default_rng(7)
+    values = np.concatenate([rng.uniform(-1e9, 1e9, 5000), [0, 0.005, 1.115, 99999.995, 1e15, -0.001]])
+    batch = format_inr_array(values)
+    assert list(batch) == [format_inr(v) for v in values]
+    assert list(format_inr_array([1.5, None, float("nan")], na="-")) == ["₹ 1.50/-", "-", "-"]
+    series = format_inr_array(pd.Series([1234567.0, None], index=[5, 6]))
+    assert list(series.index) == [5, 6] and series[5] == "₹ 12,34,567.00/-" and series[6] == ""
+    assert format_inr_array(np.array([[1, 2], [3, 4e6]]))[1, 1] == "₹ 40,00,000.00/-"
+    assert format_inr_array([]).shape == (0,)
+    print("SUCCESS: Batch output identical to format_inr.")
+
+    # 3. Ten thousand rows
+    print("\nStep 3: Formatting 10,000 rows...")
+    rates = rng.uniform(0, 1e7, 10000)
+    start = time.perf_counter()
+    format_inr_array(rates)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5, f"Batch formatting took {elapsed:.2f}s"
+    print(f"SUCCESS: 10,000 amounts formatted in {elapsed:.3f}s.")
+
+    # 4. Excel number format
+    print("\nStep 4: Writing the xlsx number format...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "inr.xlsx")
+        workbook = xlsxwriter.Workbook(path)
+        worksheet = workbook.add_worksheet()
+        worksheet.write(0, 0, 12345678.9, workbook.add_format({'num_format': INR_XLSX_FORMAT}))
+        workbook.close()
+        cell = load_workbook(path).active["A1"]
+        assert cell.number_format == INR_XLSX_FORMAT
+        assert cell.number_format.startswith('[>=10000000]"₹"##\\,##\\,##\\,##0.00')
+    print("SUCCESS: Workbook cells carry the lakh/crore format.")
+
+if __name__ == "__main__":
+    test_inr_format()
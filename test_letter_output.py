@@ -0,0 +1,97 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import zipfile
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+from database import db_manager
+from features.template_engine.template_processor import TemplateProcessor
+from features.template_engine.generation_benchmark import create_synthetic_work, delete_synthetic_work
+
+def _letter_template(temp_dir):
+    logo_path = os.path.join(temp_dir, "logo.png")
+    Image.new("RGB", (64, 64), (200, 30, 30)).save(logo_path)
+    template = Document()
+    template.sections[0].header.paragraphs[0].text = "Ref [NAME] to <<FIRM_NAME>>"
+    template.add_picture(logo_path, width=Inches(0.5))
+    template.add_paragraph("To <<FIRM_NAME>>")
+    template.add_paragraph("Subject: [NAME]")
+    for n in range(30):
+        template.add_paragraph(f"Body paragraph {n} of the letter.")
+    path = os.path.join(temp_dir, "Letter.docx")
+    template.save(path)
+    return path
+
+def _peak_kib(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+def test_split_and_zip_letters():
+    print("--- Testing Streaming Letter Output ---")
+    work_id, firm_names = create_synthetic_work(4, label="letters ")
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_path = _letter_template(temp_dir)
+            processor = TemplateProcessor()
+
+            split_dir = os.path.join(temp_dir, "split")
+            merged_path = os.path.join(temp_dir, "merged.docx")
+            success, message = processor.generate_letters_for_firms(template_path, {}, work_id, split_dir, output_mode="split", merge_path=merged_path)
+            assert success, message
+            files = sorted(os.listdir(split_dir))
+            assert len(files) == 4, files
+            work_name = db_manager.get_work_by_id(work_id)['work_name']
+            letter = Document(os.path.join(split_dir, f"Letter_{firm_names[2]}.docx"))
+            assert letter.paragraphs[1].text == f"To {firm_names[2]}"
+            assert letter.sections[0].header.paragraphs[0].text == f"Ref {work_name} to {firm_names[2]}"
+            assert len(letter.inline_shapes) == 1
+            print("Step 1: One .docx per firm keeps the template's logo, with its header filled for the firm.")
+
+            zip_path = os.path.join(temp_dir, "letters.zip")
+            success, message = processor.generate_letters_for_firms(template_path, {}, work_id, zip_path, output_mode="zip")
+            assert success, message
+            with zipfile.ZipFile(zip_path) as archive:
+                assert sorted(archive.namelist()) == files
+                zipped = Document(io.BytesIO(archive.read(f"Letter_{firm_names[0]}.docx")))
+            assert zipped.sections[0].header.paragraphs[0].text == f"Ref {work_name} to {firm_names[0]}"
+            print("Step 2: The zip archive holds the same letters.")
+
+            merged = Document(merged_path)
+            assert [p.text for p in merged.paragraphs if p.text.startswith("To ")] == [f"To {firm}" for firm in firm_names]
+            assert len(merged.inline_shapes) == 4
+            with zipfile.ZipFile(merged_path) as package:
+                media = [name for name in package.namelist() if name.startswith("word/media/")]
+            assert len(media) == 1, media
+            assert [section.header.paragraphs[0].text for section in merged.sections] == [f"Ref {work_name} to {firm}" for firm in firm_names]
+            print("Step 3: The merged document shares a single copy of the logo and keeps each firm's header.")
+        print("SUCCESS: Letters are streamed to files or a zip and merged.")
+    finally:
+        delete_synthetic_work(work_id, firm_names)
+
+def test_split_output_memory_is_flat():
+    print("--- Testing Streaming Letter Output Memory ---")
+    peaks = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = _letter_template(temp_dir)
+        processor = TemplateProcessor()
+        for firm_count in (5, 60):
+            work_id, firm_names = create_synthetic_work(firm_count, label="memory ")
+            try:
+                output_dir = os.path.join(temp_dir, f"split_{firm_count}")
+                peaks[firm_count] = _peak_kib(lambda: processor.generate_letters_for_firms(template_path, {}, work_id, output_dir, output_mode="split"))
+                assert len(os.listdir(output_dir)) == firm_count
+            finally:
+                delete_synthetic_work(work_id, firm_names)
+    print(f"Step 1: Peak memory {peaks[5]:.0f} KiB for 5 firms, {peaks[60]:.0f} KiB for 60 firms.")
+    assert peaks[60] < peaks[5] * 1.5, peaks
+    print("SUCCESS: Memory does not grow with the number of firms.")
+
+if __name__ == '__main__':
+    test_split_and_zip_letters()
+    test_split_output_memory_is_flat()
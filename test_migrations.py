@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+from database.connection import close_all_connections, get_connection
+from database.migrations import LATEST_VERSION, apply_migrations, get_schema_version
+
+def _columns(db_path, table):
+    return [col[1] for col in get_connection(db_path).execute(f"PRAGMA table_info({table})")]
+
+def test_fresh_database_migrates_once():
+    print("--- Testing Migrations on a Fresh Database ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "fresh.db")
+        try:
+            assert apply_migrations(db_path) == list(range(1, LATEST_VERSION + 1))
+            assert get_schema_version(db_path) == LATEST_VERSION
+            assert 'computer_no' in _columns(db_path, 'works')
+            assert 'ib_notarized_date' in _columns(db_path, 'firm_documents')
+            assert 'firm_address' not in _columns(db_path, 'firm_documents')
+            print("SUCCESS: Fresh database created at the latest version.")
+
+            assert apply_migrations(db_path) == []
+            print("SUCCESS: Second run is a no-op.")
+        finally:
+            close_all_connections()
+
+def test_legacy_database_is_upgraded():
+    print("--- Testing Migrations on a Legacy Database ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "legacy.db")
+        # Layout written by the pre-migration startup code
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE works (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, description TEXT, section TEXT);
+            INSERT INTO works (name, description, section) VALUES ('Legacy Work', 'Old', 'S1');
+            CREATE TABLE firm_documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, work_id INTEGER, firm_name TEXT NOT NULL,
+                pg_no TEXT, pg_amount REAL, firm_address TEXT, pg_type TEXT
+            );
+            INSERT INTO firm_documents (work_id, firm_name, pg_no, pg_amount, firm_address, pg_type)
+            VALUES (1, 'Firm A', 'PG-1', 500.0, 'Somewhere', 'FDR');
+            CREATE TABLE firm_documents_new (id INTEGER PRIMARY KEY);
+        """)
+        conn.close()
+        try:
+            apply_migrations(db_path)
+            conn = get_connection(db_path)
+            assert conn.execute("SELECT name, section, computer_no FROM works").fetchall() == [('Legacy Work', 'S1', None)]
+            assert 'firm_address' not in _columns(db_path, 'firm_documents')
+            assert conn.execute("SELECT work_id, firm_name, pg_no, pg_amount, pg_type, pg_submitted FROM firm_documents").fetchall() == [
+                (1, 'Firm A', 'PG-1', 500.0, 'FDR', 0)
+            ]
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            assert 'firm_documents_new' not in tables and 'firms' in tables
+            print("SUCCESS: Legacy columns added and firm_documents rebuilt with its data.")
+        finally:
+            close_all_connections()
+
+if __name__ == '__main__':
+    test_fresh_database_migrates_once()
+    test_legacy_database_is_upgraded()
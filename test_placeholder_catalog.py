@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import time
+from docx import Document
+from database.connection import close_all_connections
+from database.migrations import apply_migrations
+from features.template_engine import placeholder_catalog
+from features.template_engine.placeholder_catalog import (
+    get_template_placeholders, find_templates_using, warm_up_catalog, USER, WORK, FIRM, SPECIAL
+)
+
+def test_placeholder_catalog():
+    print("--- Testing Persistent Placeholder Catalog ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "catalog.db")
+        apply_migrations(db_path)
+        letters_dir = os.path.join(temp_dir, "Letters")
+        os.makedirs(letters_dir)
+
+        letter_path = os.path.join(letters_dir, "letter.docx")
+        document = Document()
+        document.add_paragraph("MULTI_FIRM_IDENTIFIER")
+        document.add_paragraph("To <<FIRM_NAME>> for [NAME], cost {{COST}}")
+        document.add_paragraph("[ALL_FIRMS_PG_DETAILS] [NAME]")
+        document.save(letter_path)
+        note_path = os.path.join(letters_dir, "note.docx")
+        note = Document()
+        note.add_paragraph("Note on [LOA_NO]")
+        note.save(note_path)
+
+        try:
+            # 1. Warm-up indexes every template with kinds and locations
+            print("Step 1: Warming up the catalog...")
+            assert warm_up_catalog([letters_dir], db_path) == 2
+            entry = get_template_placeholders(letter_path, db_path)
+            assert entry.user == {"COST"} and entry.firm == {"FIRM_NAME"}
+            assert entry.work == {"NAME", "ALL_FIRMS_PG_DETAILS"} and entry.special == {"ALL_FIRMS_PG_DETAILS"}
+            assert entry.locations[(WORK, "NAME")] == ["word/document.xml#1", "word/document.xml#2"]
+            assert entry.is_multi_firm
+            print("SUCCESS: Placeholder sets, locations and multi-firm flag catalogued.")
+
+            # 2. Unchanged files and identical content are not scanned again
+            print("\nStep 2: Serving entries without rescanning...")
+            scans = []
+            original_scan = placeholder_catalog.scan_template
+            placeholder_catalog.scan_template = lambda path: scans.append(path) or original_scan(path)
+            try:
+                get_template_placeholders(letter_path, db_path)
+                copy_path = os.path.join(letters_dir, "letter_copy.docx")
+                shutil.copyfile(letter_path, copy_path)
+                assert get_template_placeholders(copy_path, db_path).firm == {"FIRM_NAME"}
+                assert scans == [], "Unchanged or identical templates should come from the catalog"
+
+                # An edited template is rescanned
+                note.add_paragraph("<<PG_NO>>")
+                note.save(note_path)
+                os.utime(note_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+                assert get_template_placeholders(note_path, db_path).firm == {"PG_NO"}
+                assert len(scans) == 1
+            finally:
+                placeholder_catalog.scan_template = original_scan
+            print("SUCCESS: Catalog reused by mtime/size and content hash.")
+
+            # 3. Which templates use a placeholder
+            print("\nStep 3: Querying templates by placeholder...")
+            users = find_templates_using("FIRM_NAME", FIRM, db_path)
+            assert [os.path.basename(p) for p in users] == ["letter.docx", "letter_copy.docx"]
+            assert [os.path.basename(p) for p in find_templates_using("LOA_NO", db_path=db_path)] == ["note.docx"]
+            assert find_templates_using("COST", USER, db_path) and find_templates_using("ALL_FIRMS_PG_DETAILS", SPECIAL, db_path)
+            print("SUCCESS: Templates found by placeholder name.")
+
+            # 4. Deleted templates are pruned on the next warm-up
+            os.remove(copy_path)
+            warm_up_catalog([letters_dir], db_path)
+            assert len(find_templates_using("FIRM_NAME", FIRM, db_path)) == 1
+            print("SUCCESS: Missing templates pruned.")
+        finally:
+            close_all_connections()
+
+if __name__ == "__main__":
+    test_placeholder_catalog()
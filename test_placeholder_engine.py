@@ -0,0 +1,42 @@
+import time
+from features.template_engine.placeholder_engine import PlaceholderEngine, build_template_engine
+
+def test_placeholder_engine():
+    print("--- Testing Single-Pass Placeholder Engine ---")
+    placeholder_data = {'[NAME]': 'Work A', '[EMPTY]': '', '<<FIRM_NAME>>': 'Firm X', '<<PG_NO>>': 'PG1'}
+    user_data = {'REF': 'R1', 'lower_key': 'lv', 'COST': '1000'}
+    engine = build_template_engine(user_data, placeholder_data)
+
+    # 1. All three forms in one scan, case-insensitive
+    print("Step 1: Replacing mixed placeholders...")
+    text = "[NAME]/[name] <<FIRM_NAME>>/<<firm_name>> {{REF}}/{{ref}} {{LOWER_KEY}} {{pg_no}} {{COST_IN_WORDS}}"
+    assert engine.replace(text) == "Work A/Work A Firm X/Firm X R1/R1 lv PG1 one thousand rupees only"
+    print("SUCCESS: Work, firm and user placeholders replaced.")
+
+    # 2. Unknown and empty placeholders stay for debugging; values are not rescanned
+    print("\nStep 2: Leaving unknown placeholders untouched...")
+    assert engine.replace("[UNKNOWN] <<UNK>> [EMPTY] [DATE:DD-MM] plain") == "[UNKNOWN] <<UNK>> [EMPTY] [DATE:DD-MM] plain"
+    nested = build_template_engine({'A': '[NAME]'}, placeholder_data)
+    assert nested.replace("{{A}}") == "[NAME]"
+    print("SUCCESS: Unresolved tokens left in place.")
+
+    # 3. Each distinct token is resolved once
+    print("\nStep 3: Memoising resolutions...")
+    calls = []
+    counting = PlaceholderEngine(lambda kind, key, token: calls.append(token) or key.lower())
+    assert counting.replace("[A] [A] <<B>> [A]") == "a a b a"
+    assert calls == ["[A]", "<<B>>"]
+    print("SUCCESS: Repeated tokens resolved from the cache.")
+
+    # 4. Long paragraphs stay linear
+    print("\nStep 4: Replacing a long paragraph...")
+    long_text = "[NAME] filler text " * 20000
+    start = time.perf_counter()
+    result = engine.replace(long_text)
+    elapsed = time.perf_counter() - start
+    assert result == "Work A filler text " * 20000
+    assert elapsed < 1.0, f"Long paragraph took {elapsed:.2f}s"
+    print(f"SUCCESS: 20,000 placeholders replaced in {elapsed:.3f}s.")
+
+if __name__ == "__main__":
+    test_placeholder_engine()
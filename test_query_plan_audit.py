@@ -0,0 +1,35 @@
+import os
+import tempfile
+from database.connection import close_all_connections
+from database.migrations import apply_migrations
+from database.query_plan_audit import AUDITED_QUERIES, audit_query_plans, build_benchmark_database
+
+def test_query_plan_audit_reports_scans_without_indexes():
+    print("--- Testing Query Plan Audit (unindexed schema) ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "unindexed.db")
+        try:
+            apply_migrations(db_path, target_version=1)
+            # The template catalog tables only exist from migration 3 on.
+            baseline_queries = [q for q in AUDITED_QUERIES if 'template_catalog' not in q[1]]
+            findings = audit_query_plans(db_path, baseline_queries)
+            assert any(f['query'] == 'get_schedule_items' for f in findings), findings
+            print("SUCCESS: Audit reports scans on the baseline schema.")
+        finally:
+            close_all_connections()
+
+def test_query_plan_audit_on_benchmark_database():
+    print("--- Testing Query Plan Audit ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "benchmark.db")
+        try:
+            build_benchmark_database(db_path, works=5, items_per_work=50)
+            findings = audit_query_plans(db_path)
+            assert findings == [], f"Full scans found: {findings}"
+            print("SUCCESS: Every audited query uses an index.")
+        finally:
+            close_all_connections()
+
+if __name__ == '__main__':
+    test_query_plan_audit_reports_scans_without_indexes()
+    test_query_plan_audit_on_benchmark_database()
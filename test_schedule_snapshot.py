@@ -0,0 +1,44 @@
+from datetime import datetime
+from database import db_manager
+
+def test_work_schedule_snapshot():
+    print("--- Testing Work Schedule Snapshot ---")
+    db_manager.create_tables()
+
+    work_name = f"Snapshot Test Work {datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    work_id = db_manager.add_work(name=work_name, description="Test work for schedule snapshot.")
+    assert work_id, "Could not create work"
+    try:
+        # 1. Build a small tree with rates and variations
+        print("Step 1: Adding schedule items, firm rates and variations...")
+        parent_id = db_manager.add_schedule_item(work_id, "B Parent", "job", 1)
+        child_b = db_manager.add_schedule_item(work_id, "Z Child", "m3", 10, parent_id)
+        child_a = db_manager.add_schedule_item(work_id, "A Child", "nos", 5, parent_id)
+        other_id = db_manager.add_schedule_item(work_id, "A Root", "m2", 3)
+        db_manager.upsert_firm_rate(child_a, "Firm A", 100, 10)
+        db_manager.upsert_firm_rate(child_a, "Firm B", 120)
+        db_manager.upsert_firm_rate(other_id, "Firm A", 50)
+        db_manager.add_schedule_item_variation(child_a, "Var 1", 7)
+        db_manager.add_schedule_item_variation(child_b, "Var 2", 12)
+
+        # 2. Compare the snapshot with the per-item accessors
+        print("\nStep 2: Comparing snapshot with per-item queries...")
+        snapshot = db_manager.get_work_schedule_snapshot(work_id)
+        items = snapshot['items']
+        for item in db_manager.get_schedule_items(work_id):
+            snap_item = items[item['item_id']]
+            assert snap_item['firm_rates'] == db_manager.get_firm_rates(item['item_id'])
+            assert snap_item['variations'] == db_manager.get_schedule_item_variations(item['item_id'])
+        print("SUCCESS: Snapshot rates and variations match per-item queries.")
+
+        # 3. Tree grouping and ordering
+        print("\nStep 3: Checking tree grouping...")
+        assert [i['item_id'] for i in snapshot['root_items']] == [other_id, parent_id]
+        assert [c['item_id'] for c in items[parent_id]['children']] == [child_a, child_b]
+        assert snapshot['variation_names'] == ["Var 1", "Var 2"]
+        print("SUCCESS: Items grouped into a name-sorted parent/child tree.")
+    finally:
+        db_manager.delete_work(work_id)
+
+if __name__ == '__main__':
+    test_work_schedule_snapshot()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+from database.connection import get_connection, close_all_connections
+from database.migrations import apply_migrations
+from database.schema_registry import get_table_schema, get_column_names, invalidate_schema
+
+def test_schema_registry():
+    print("--- Testing Schema Metadata Registry ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "schema.db")
+        try:
+            apply_migrations(db_path, target_version=2)
+
+            # 1. Columns are read once, then served from memory
+            print("Step 1: Loading table metadata...")
+            statements = []
+            conn = get_connection(db_path)
+            conn.set_trace_callback(statements.append)
+            try:
+                works = get_table_schema("works", db_path)
+                for _ in range(100):
+                    get_column_names("works", db_path)
+            finally:
+                conn.set_trace_callback(None)
+            assert len([s for s in statements if "table_info" in s]) == 1, statements
+            print("SUCCESS: One PRAGMA table_info for 101 lookups.")
+
+            # 2. Typed column descriptors
+            print("\nStep 2: Reading column descriptors...")
+            assert works.column_names[:2] == ["id", "name"]
+            assert works.by_name["id"].primary_key and works.by_name["id"].python_type is int
+            assert works.by_name["name"].not_null and works.by_name["name"].affinity == "TEXT"
+            assert works.by_name["tender_cost"].python_type is float
+            assert works.user_version == 2
+            names = get_column_names("works", db_path)
+            names.append("scratch")
+            assert "scratch" not in get_column_names("works", db_path), "Callers get their own list"
+            print("SUCCESS: Columns carry their type affinity.")
+
+            # 3. A migration that bumps user_version invalidates the cache
+            print("\nStep 3: Migrating the database...")
+            assert get_column_names("template_catalog", db_path) == []
+            apply_migrations(db_path)
+            catalog = get_table_schema("template_catalog", db_path)
+            assert "sha256" in catalog and catalog.user_version > 2
+            assert get_table_schema("works", db_path) is not works
+            invalidate_schema()
+            print("SUCCESS: Schema reloaded after the migration.")
+        finally:
+            invalidate_schema(db_path)
+            close_all_connections()
+
+if __name__ == "__main__":
+    test_schema_registry()
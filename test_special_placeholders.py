@@ -0,0 +1,54 @@
+import time
+from decimal import Decimal
+from features.template_engine.special_placeholder_handler import (
+    evaluate_special_placeholder, compile_special_placeholder, register_modifier
+)
+from utils.helpers import number_to_indian_words
+
+def test_special_placeholders():
+    print("--- Testing Compiled Special Placeholders ---")
+    data = {'COST': '123456.78', 'COSTAMC': 1000, 'NAME': 'Work A'}
+
+    # 1. Existing modifiers keep their results
+    print("Step 1: Evaluating multipliers, rounding and words...")
+    assert evaluate_special_placeholder("COST", data) == "₹ 1,23,456.78/-"
+    assert evaluate_special_placeholder("COST_1.18", data) == "₹ 1,45,679.00/-"
+    assert evaluate_special_placeholder("COST_1.18_00", data) == "₹ 1,45,700.00/-"
+    assert evaluate_special_placeholder("COST_0", data) == "₹ 1,23,460.00/-"
+    assert evaluate_special_placeholder("COSTAMC_2_IN_WORDS", data) == "two thousand rupees only"
+    assert evaluate_special_placeholder("COST_1.18_00_IN_WORDS", data) == "one lakh, forty-five thousand, seven hundred rupees only"
+    assert evaluate_special_placeholder("COSTCON_IN_WORDS", data) == "[COSTCON_IN_WORDS]"
+    assert evaluate_special_placeholder("NAME", data) == "Work A"
+    assert evaluate_special_placeholder("OTHER", data) == "[OTHER]"
+    print("SUCCESS: Existing COST placeholders unchanged.")
+
+    # 2. Percent, GST and unit modifiers
+    print("\nStep 2: Evaluating percent, GST and units...")
+    assert evaluate_special_placeholder("COSTAMC_18PCT", data) == "₹ 180.00/-"
+    assert evaluate_special_placeholder("COSTAMC_GST", data) == "₹ 1,180.00/-"
+    assert evaluate_special_placeholder("COSTAMC_GST12", data) == "₹ 1,120.00/-"
+    assert evaluate_special_placeholder("COST_LAKHS", data) == "1.23 Lakhs"
+    assert evaluate_special_placeholder("COST_100_CRORES", data) == "1.23 Crores"
+    print("SUCCESS: New modifiers applied.")
+
+    # 3. Custom modifiers and the compiled cache
+    print("\nStep 3: Registering a modifier...")
+    @register_modifier(r"HALF")
+    def _half(expression, match):
+        expression.multiply(Decimal("0.5"))
+    assert evaluate_special_placeholder("COSTAMC_HALF", data) == "₹ 500.00/-"
+    assert compile_special_placeholder("COST_1.18_00") is compile_special_placeholder("COST_1.18_00")
+    assert number_to_indian_words(5) == "five" and number_to_indian_words(5.0) == "five rupees only"
+    print("SUCCESS: Modifier registered; expressions compiled once.")
+
+    # 4. Many occurrences render without re-parsing
+    print("\nStep 4: Evaluating 20,000 placeholders...")
+    start = time.perf_counter()
+    for _ in range(20000):
+        evaluate_special_placeholder("COST_1.18_00_IN_WORDS", data)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0, f"Evaluation took {elapsed:.2f}s"
+    print(f"SUCCESS: 20,000 evaluations in {elapsed:.3f}s.")
+
+if __name__ == "__main__":
+    test_special_placeholders()
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+from database import db_manager, migrations
+from database.connection import close_all_connections, get_connection, transaction
+from database.migrations import apply_migrations
+from features.template_engine.data_manager import TemplateDataManager
+
+def test_template_input_history():
+    print("--- Testing Template Input History ---")
+    db_manager.create_tables()
+    template_path = os.path.join("Templates", "History Test Template.docx")
+    manager = TemplateDataManager()
+    try:
+        # 1. Saving keeps current values and a deduplicated history
+        print("Step 1: Saving inputs...")
+        assert manager.save_template_data(template_path, {"REF_NO": "R-1", "COST": "1000"}) == 2
+        assert manager.save_template_data(template_path, {"REF_NO": "R-2", "COST": "1000"}) == 1
+        assert manager.save_template_data(template_path, {"REF_NO": "R-1", "COST": "1000"}) == 1
+        assert manager.save_template_data(template_path, {"REF_NO": "R-1", "COST": "1000"}) == 0
+        loaded = manager.load_template_data(template_path)
+        assert loaded["REF_NO"] == {"current": "R-1", "history": ["R-1", "R-2"]}
+        assert loaded["COST"] == {"current": "1000", "history": ["1000"]}
+        assert manager.get_historical_data(template_path, "REF_NO") == ["R-1", "R-2"]
+        print("SUCCESS: Only changed fields written; history deduplicated in order.")
+
+        # 2. Many fields are saved in one transaction
+        print("\nStep 2: Saving a large template...")
+        statements = []
+        conn = get_connection(db_manager.DATABASE_PATH)
+        conn.set_trace_callback(statements.append)
+        try:
+            manager.save_template_data(template_path, {f"FIELD_{n}": str(n) for n in range(500)})
+        finally:
+            conn.set_trace_callback(None)
+        assert statements.count("COMMIT") == 1, "All fields should be saved in a single transaction"
+        assert len(manager.load_template_data(template_path)) == 502
+        print("SUCCESS: 500 fields saved in one transaction.")
+    finally:
+        with transaction(db_manager.DATABASE_PATH) as cursor:
+            cursor.execute("DELETE FROM template_data WHERE template_name = ?", ("History Test Template.docx",))
+            cursor.execute("DELETE FROM template_input_history WHERE template_name = ?", ("History Test Template.docx",))
+
+def test_template_data_json_import():
+    print("\n--- Testing Template Data JSON Import ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = os.path.join(temp_dir, "template_data")
+        os.makedirs(data_dir)
+        with open(os.path.join(data_dir, "Letter.docx.json"), "w") as f:
+            json.dump({"REF_NO": {"current": "R-9", "history": ["R-1", "R-9"]}, "OLD": "plain value"}, f, indent=4)
+        with open(os.path.join(data_dir, "Broken.docx.json"), "w") as f:
+            f.write("{not json")
+
+        db_path = os.path.join(temp_dir, "import.db")
+        original_dir = migrations.LEGACY_TEMPLATE_DATA_DIR
+        migrations.LEGACY_TEMPLATE_DATA_DIR = data_dir
+        try:
+            apply_migrations(db_path)
+            conn = get_connection(db_path)
+            current = dict(conn.execute("SELECT placeholder_name, value FROM template_data WHERE template_name = 'Letter.docx'"))
+            history = conn.execute("SELECT placeholder_name, value FROM template_input_history ORDER BY rowid").fetchall()
+            assert current == {"REF_NO": "R-9", "OLD": "plain value"}
+            assert history == [("REF_NO", "R-1"), ("REF_NO", "R-9"), ("OLD", "plain value")]
+            print("SUCCESS: JSON files imported; unreadable files skipped.")
+        finally:
+            migrations.LEGACY_TEMPLATE_DATA_DIR = original_dir
+            close_all_connections()
+
+if __name__ == "__main__":
+    test_template_input_history()
+    test_template_data_json_import()
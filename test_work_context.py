@@ -0,0 +1,86 @@
+import os
+import tempfile
+from datetime import datetime
+from docx import Document
+from config import DATABASE_PATH
+from database import db_manager
+from database.connection import get_connection, transaction
+from database.managers import firm_manager
+from features.template_engine.work_context import WorkContextSnapshot
+from features.template_engine.work_data_provider import WorkDataProvider
+from features.AutodocGen.data_fetcher import DataFetcher
+from features.AutodocGen.document_generator import DocumentGenerator
+
+def test_work_context_snapshot():
+    print("--- Testing Shared Work Context Snapshot ---")
+    db_manager.create_tables()
+
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    work_id = db_manager.add_work(name=f"Snapshot Work {stamp}", description="Test work for the work context snapshot.")
+    assert work_id, "Could not create work"
+    firms = [f"Snapshot Firm A {stamp}", f"Snapshot Firm B {stamp}"]
+    try:
+        for n, firm in enumerate(firms):
+            firm_manager.add_firm(firm, f"Rep {n}", f"Address {n}")
+            db_manager.add_firm_document(work_id, firm, f"PG-{n}", 1000.0 * (n + 1), "State Bank", "Main Road",
+                                         "", "", "01-01-2025", 1, 0, "FDR", "", "")
+
+        # 1. One query per table inside one read transaction
+        print("Step 1: Loading the snapshot...")
+        statements = []
+        conn = get_connection(DATABASE_PATH)
+        conn.set_trace_callback(statements.append)
+        try:
+            snapshot = WorkContextSnapshot.load(work_id)
+        finally:
+            conn.set_trace_callback(None)
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 4, selects
+        assert statements[0] == "BEGIN" and statements[-1] == "COMMIT", statements
+        assert snapshot.firm_names == firms
+        assert snapshot.firm(firms[1])['address'] == "Address 1"
+        assert snapshot.firm_document(firms[0])['pg_no'] == "PG-0"
+        print("SUCCESS: Work, firm documents and firms loaded together.")
+
+        # 2. The template engine and AutodocGen read the same snapshot
+        print("\nStep 2: Sharing the snapshot...")
+        provider = WorkDataProvider(work_id, snapshot)
+        assert provider.generate_placeholders({"<<FIRM_ADDRESS>>"}) == {"<<FIRM_ADDRESS>>": "Address 1"}
+        fetcher = DataFetcher(DATABASE_PATH)
+        fetcher._snapshots[work_id] = snapshot
+        firm_data = fetcher.fetch_firm_data(firms[0], work_id)
+        assert firm_data['pg_no'] == "PG-0" and firm_data['firm_address'] == "Address 0"
+        assert fetcher.fetch_work_data(work_id)['work_name'] == f"Snapshot Work {stamp}"
+        assert [doc[2] for doc in fetcher.fetch_all_firms_pg_details(work_id)] == firms
+        print("SUCCESS: Both engines read the shared snapshot.")
+
+        # 3. Documents of one session do not query the database again
+        print("\nStep 3: Generating several documents from one snapshot...")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_path = os.path.join(temp_dir, "letter.docx")
+            template = Document()
+            template.add_paragraph("To <<FIRM_NAME>> at <<FIRM_ADDRESS>> for [NAME]")
+            template.save(template_path)
+            generator = DocumentGenerator(fetcher)
+            statements.clear()
+            conn.set_trace_callback(statements.append)
+            try:
+                for n, firm in enumerate(firms):
+                    output_path = os.path.join(temp_dir, f"out{n}.docx")
+                    generator.generate(template_path, {'work_id': work_id, 'firm_name': firm}, output_path, True)
+            finally:
+                conn.set_trace_callback(None)
+            assert statements == [], statements
+            texts = [Document(os.path.join(temp_dir, f"out{n}.docx")).paragraphs[0].text for n in range(len(firms))]
+            assert texts == [f"To {firm} at Address {n} for Snapshot Work {stamp}" for n, firm in enumerate(firms)]
+        fetcher.reset()
+        assert fetcher.work_context(work_id) is not snapshot
+        print("SUCCESS: Session documents generated without further queries.")
+    finally:
+        with transaction(DATABASE_PATH) as cursor:
+            cursor.execute("DELETE FROM firm_documents WHERE work_id = ?", (work_id,))
+            cursor.executemany("DELETE FROM firms WHERE name = ?", [(firm,) for firm in firms])
+        db_manager.delete_work(work_id)
+
+if __name__ == "__main__":
+    test_work_context_snapshot()
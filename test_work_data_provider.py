@@ -0,0 +1,51 @@
+from datetime import datetime
+from database import db_manager
+from database.connection import transaction
+from features.template_engine.work_data_provider import WorkDataProvider
+
+def test_lazy_placeholder_resolution():
+    print("--- Testing Demand-Driven Placeholder Resolution ---")
+    db_manager.create_tables()
+
+    work_name = f"Lazy Placeholder Work {datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    work_id = db_manager.add_work(name=work_name, description="Test work for lazy placeholders.")
+    assert work_id, "Could not create work"
+    try:
+        for n, firm in enumerate(["Alpha Builders", "Beta Electricals"]):
+            db_manager.add_firm_document(work_id, firm, f"PG-{n}", 1000.0 * (n + 1), "State Bank", "Main Road",
+                                         "", "", "01-01-2025", 1, 0, "FDR", "", "")
+
+        # 1. Only referenced placeholders are resolved
+        print("Step 1: Resolving the placeholders a template references...")
+        provider = WorkDataProvider(work_id)
+        pg_details_calls = []
+        original_pg_details = provider._special_placeholders['FIRM_PG_DETAILS']
+        provider._special_placeholders['FIRM_PG_DETAILS'] = lambda: pg_details_calls.append(1) or original_pg_details()
+        placeholders = provider.generate_placeholders({"[name]", "[WORK_NAME]", "<<PG_NO>>", "[NOT_A_COLUMN]"})
+        assert placeholders == {"[NAME]": work_name, "[WORK_NAME]": work_name, "<<PG_NO>>": "PG-1"}
+        assert pg_details_calls == [], "Composite placeholders should not be built unless referenced"
+        print("SUCCESS: Unreferenced and composite placeholders skipped.")
+
+        # 2. Composite placeholders are memoised for the run
+        print("\nStep 2: Memoising composite placeholders...")
+        details = provider.generate_placeholders({"[FIRM_PG_DETAILS]", "[ALL_FIRMS_PG_DETAILS]"})
+        assert details["[FIRM_PG_DETAILS]"] == details["[ALL_FIRMS_PG_DETAILS]"]
+        assert "1. Alpha Builders submitted the PG No. PG-0" in details["[FIRM_PG_DETAILS]"]
+        assert provider.get_data("FIRM_PG_DETAILS") == details["[FIRM_PG_DETAILS]"]
+        assert pg_details_calls == [1], "PG details should be built once"
+        print("SUCCESS: PG details built once and shared.")
+
+        # 3. Without a reference set every placeholder is generated
+        print("\nStep 3: Generating every placeholder...")
+        everything = WorkDataProvider(work_id).generate_placeholders()
+        assert everything["[NAME]"] == work_name and everything["[WORK_NAME]"] == work_name
+        assert everything["<<FIRM_NAME>>"] == "Beta Electricals"
+        assert "[CURRENT_DATE]" in everything and "[ALL_FIRMS_PG_DETAILS]" in everything
+        print("SUCCESS: Full placeholder set generated.")
+    finally:
+        with transaction(db_manager.DATABASE_PATH) as cursor:
+            cursor.execute("DELETE FROM firm_documents WHERE work_id = ?", (work_id,))
+        db_manager.delete_work(work_id)
+
+if __name__ == "__main__":
+    test_lazy_placeholder_resolution()
@@ -0,0 +1,272 @@
+"""
+Background jobs for long-running work started from the Tk UI.
+
+JobExecutor runs job functions on a small thread pool. Worker threads never
+touch Tk: they post events to a queue and the Tk thread drains it from an
+after() loop, so progress updates, completion callbacks and the job panel
+all run on the main loop while the user keeps editing.
+
+A job function receives its Job as the first argument and reports with
+job.report(done, total, message). Cancellation is cooperative: cancel()
+sets a flag that the function checks with job.raise_if_cancelled() between
+steps; a job still waiting in the queue is dropped without running.
+"""
+
+import queue
+import threading
+import traceback
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+QUEUED = "Queued"
+RUNNING = "Running"
+DONE = "Done"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its job has been cancelled."""
+
+
+class Job:
+    def __init__(self, job_id, title, executor):
+        self.id = job_id
+        self.title = title
+        self.status = QUEUED
+        self.done = 0
+        self.total = None
+        self.message = ""
+        self.result = None
+        self.error = None
+        self._executor = executor
+        self._cancel_event = threading.Event()
+        self._future = None
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def report(self, done, total=None, message=None):
+        """Records progress from the worker thread; shown on the next poll."""
+        self._executor._post(self, "progress", (done, total, message))
+
+    def raise_if_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        """
+        Requests cancellation. A queued job is dropped immediately; a running
+        job stops at its next raise_if_cancelled() check.
+        """
+        if self.finished:
+            return
+        self._cancel_event.set()
+        if self._future is not None and self._future.cancel():
+            self._executor._post(self, "cancelled", None)
+
+
+class JobExecutor:
+    """
+    Thread pool for background jobs owned by a Tk root. Callbacks passed to
+    submit() and listeners added with add_listener() are always called on
+    the Tk thread.
+    """
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self.jobs = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cms-job")
+        self._events = queue.Queue()
+        self._callbacks = {}
+        self._listeners = []
+        self._next_id = 1
+        self._polling = False
+
+    def submit(self, title, func, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Queues func(job, *args, **kwargs) and returns the Job. on_done(result)
+        runs when it returns, on_error(exception) when it raises; neither is
+        called for a cancelled job.
+        """
+        job = Job(self._next_id, title, self)
+        self._next_id += 1
+        self.jobs.append(job)
+        self._callbacks[job.id] = (on_done, on_error)
+        job._future = self._pool.submit(self._run, job, func, args, kwargs)
+        self._notify(job)
+        self._schedule_poll()
+        return job
+
+    def add_listener(self, listener):
+        """
+        listener(job) is called whenever a job is added or changes state, and
+        listener(None) when finished jobs are cleared from the list.
+        """
+        self._listeners.append(listener)
+
+    def active_jobs(self):
+        return [job for job in self.jobs if not job.finished]
+
+    def clear_finished(self):
+        self.jobs = [job for job in self.jobs if not job.finished]
+        self._notify(None)
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            job.cancel()
+
+    def shutdown(self, wait=False):
+        self.cancel_all()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancel_requested:
+            self._post(job, "cancelled", None)
+            return
+        self._post(job, "started", None)
+        try:
+            result = func(job, *args, **kwargs)
+        except JobCancelled:
+            self._post(job, "cancelled", None)
+        except Exception as e:
+            traceback.print_exc()
+            self._post(job, "failed", e)
+        else:
+            self._post(job, "done", result)
+
+    def _post(self, job, kind, payload):
+        self._events.put((job, kind, payload))
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        self.process_events()
+        if self.active_jobs() or not self._events.empty():
+            self._schedule_poll()
+
+    def process_events(self):
+        """Applies queued worker events. Must be called on the Tk thread."""
+        while True:
+            try:
+                job, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if job.finished:
+                continue
+            if kind == "started":
+                job.status = RUNNING
+            elif kind == "progress":
+                done, total, message = payload
+                job.done = done
+                if total is not None:
+                    job.total = total
+                if message is not None:
+                    job.message = message
+            elif kind == "cancelled":
+                job.status = CANCELLED
+                job.message = "Cancelled"
+            elif kind == "failed":
+                job.status = FAILED
+                job.error = payload
+                job.message = str(payload)
+            elif kind == "done":
+                job.status = DONE
+                job.result = payload
+                if job.total:
+                    job.done = job.total
+            self._notify(job)
+            if job.finished:
+                self._finish(job)
+
+    def _finish(self, job):
+        on_done, on_error = self._callbacks.pop(job.id, (None, None))
+        if job.status == DONE and on_done:
+            on_done(job.result)
+        elif job.status == FAILED and on_error:
+            on_error(job.error)
+
+    def _notify(self, job):
+        for listener in self._listeners:
+            listener(job)
+
+
+class JobQueuePanel(ttk.LabelFrame):
+    """
+    Small list of background jobs with their progress, a Cancel button for
+    the selected job and a Clear button for finished ones. The panel packs
+    itself with pack_options while it has jobs and hides when empty.
+    """
+
+    def __init__(self, parent, executor, pack_options=None):
+        super().__init__(parent, text="Background Jobs", padding=5)
+        self.executor = executor
+        self.pack_options = pack_options or {'side': tk.BOTTOM, 'fill': tk.X, 'padx': 5, 'pady': 5}
+
+        self.tree = ttk.Treeview(self, columns=("job", "status", "progress"), show="headings", height=3)
+        self.tree.heading("job", text="Job")
+        self.tree.heading("status", text="Status")
+        self.tree.heading("progress", text="Progress")
+        self.tree.column("job", width=300, anchor=tk.W)
+        self.tree.column("status", width=80, anchor=tk.W)
+        self.tree.column("progress", width=250, anchor=tk.W)
+        self.tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Cancel", command=self._cancel_selected, style='Secondary.TButton').pack(fill=tk.X, pady=2)
+        ttk.Button(button_frame, text="Clear", command=executor.clear_finished, style='Secondary.TButton').pack(fill=tk.X, pady=2)
+
+        executor.add_listener(self._on_job_changed)
+
+    def _on_job_changed(self, job):
+        if job is None:
+            self._refresh_all()
+            return
+        values = (job.title, job.status, self._describe_progress(job))
+        iid = str(job.id)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=values)
+        else:
+            self.tree.insert("", tk.END, iid=iid, values=values)
+        self._update_visibility()
+
+    def _refresh_all(self):
+        self.tree.delete(*self.tree.get_children())
+        for job in self.executor.jobs:
+            self.tree.insert("", tk.END, iid=str(job.id),
+                             values=(job.title, job.status, self._describe_progress(job)))
+        self._update_visibility()
+
+    @staticmethod
+    def _describe_progress(job):
+        if job.total:
+            text = f"{job.done} of {job.total}"
+            return f"{text} - {job.message}" if job.message else text
+        return job.message
+
+    def _update_visibility(self):
+        if self.tree.get_children():
+            if not self.winfo_manager():
+                self.pack(**self.pack_options)
+        else:
+            self.pack_forget()
+
+    def _cancel_selected(self):
+        selected = {int(iid) for iid in self.tree.selection()}
+        for job in self.executor.jobs:
+            if job.id in selected:
+                job.cancel()
@@ -5,13 +5,14 @@ This module provides functions to introspect database table schemas,
 particularly for getting column information from SQLite tables.
 """
 
-import sqlite3
 from config import DATABASE_PATH
+from database.schema_registry import get_column_names
 
 
 def get_columns(table_name):
     """
-    Returns ordered list of column names for the specified table.
+    Returns ordered list of column names for the specified table. The
+    columns are read once and then served by the schema registry.
     
     Args:
         table_name (str): Name of the database table to introspect
@@ -22,13 +23,7 @@ def get_columns(table_name):
     Raises:
         sqlite3.Error: If there's an error accessing the database
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    try:
-        cur = conn.execute(f"PRAGMA table_info({table_name})")
-        cols = [row[1] for row in cur.fetchall()]
-        return cols
-    finally:
-        conn.close()
+    return get_column_names(table_name, DATABASE_PATH)
 
 
 def get_works_columns():
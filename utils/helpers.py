@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import ttk
 import os
 import sys
+from functools import lru_cache
+from utils.inr_format import format_inr
 from PIL import Image, ImageTk
 
 if getattr(sys, 'frozen', False):
@@ -94,31 +96,19 @@ def validate_numeric_input(new_value):
 
 def format_currency_inr(amount):
     # Formats a number as Indian Rupees (INR) with exactly two decimal places
-    # Example: 1234567.89 -> ₹ 12,34,567.89
-    # Ensure amount is a float and round to 2 decimal places
-    amount = float(amount)
-    s = f"{amount:.2f}" # Format to exactly two decimal places
-
-    parts = s.split('.')
-    integer_part = parts[0]
-    decimal_part = parts[1]
-
-    # Format integer part with Indian numbering system
-    if len(integer_part) > 3:
-        last_three = integer_part[-3:]
-        other_parts = integer_part[:-3]
-        formatted_integer = "" 
-        while other_parts:
-            formatted_integer = other_parts[-2:] + "," + formatted_integer
-            other_parts = other_parts[:-2]
-        formatted_integer = formatted_integer + last_three
-    else:
-        formatted_integer = integer_part
+    # Example: 1234567.89 -> ₹ 12,34,567.89/-
+    # Memoised; use utils.inr_format.format_inr_array for whole columns
+    return format_inr(amount)
 
-    return f"₹ {formatted_integer}.{decimal_part}/-"
+@lru_cache(maxsize=None)
+def _num2words():
+    from num2words import num2words
+    return num2words
 
+# typed: 5 and 5.0 are worded differently ("five" vs "five rupees only")
+@lru_cache(maxsize=4096, typed=True)
 def number_to_indian_words(num):
-    from num2words import num2words
+    num2words = _num2words()
     # Handle integers and floats separately
     if isinstance(num, int):
         return num2words(num, lang='en_IN')
@@ -130,4 +120,4 @@ def number_to_indian_words(num):
             return f"{num2words(integer_part, lang='en_IN')} rupees and {num2words(decimal_part, lang='en_IN')} paise only"
         else:
             return f"{num2words(integer_part, lang='en_IN')} rupees only"
-    return str(num)
\ No newline at end of file
+    return str(num)
@@ -0,0 +1,111 @@
+"""
+Indian Rupee formatting with lakh/crore digit grouping (12,34,567.89).
+
+format_inr() formats one amount and memoises the result, since schedules
+repeat the same rates many times. format_inr_array() formats a whole
+NumPy array, list or pandas Series in one call: the digits come from a
+single "%.2f" pass and the commas, sign and symbol are added by reshaping
+the fixed-width strings into a character matrix instead of per value.
+xlsx_inr_format() returns the Excel number format that displays the same
+grouping in exported workbooks.
+"""
+
+from functools import lru_cache
+import numpy as np
+
+INR_SYMBOL = "₹ "
+INR_SUFFIX = "/-"
+
+
+def _group_indian(integer_part):
+    # Last three digits, then groups of two: 1234567 -> 12,34,567
+    if len(integer_part) <= 3:
+        return integer_part
+    head, tail = integer_part[:-3], integer_part[-3:]
+    groups = []
+    while head:
+        groups.append(head[-2:])
+        head = head[:-2]
+    return ",".join(reversed(groups)) + "," + tail
+
+
+@lru_cache(maxsize=8192)
+def _format_inr_cached(amount, symbol, suffix):
+    text = f"{amount:.2f}"
+    sign = ""
+    if text.startswith("-"):
+        sign, text = "-", text[1:]
+    integer_part, decimal_part = text.split(".")
+    return f"{symbol}{sign}{_group_indian(integer_part)}.{decimal_part}{suffix}"
+
+
+def format_inr(amount, symbol=INR_SYMBOL, suffix=INR_SUFFIX):
+    """
+    Formats a number as Indian Rupees with exactly two decimal places.
+    Example: 1234567.89 -> ₹ 12,34,567.89/-
+    """
+    # "+ 0.0" turns -0.0 into 0.0, which the cache could not tell apart
+    return _format_inr_cached(float(amount) + 0.0, symbol, suffix)
+
+
+def format_inr_array(values, symbol=INR_SYMBOL, suffix=INR_SUFFIX, na=""):
+    """
+    Formats every value like format_inr(). Missing and non-finite values
+    become na. Returns an object array, or a Series with the same index
+    when given a pandas Series.
+    """
+    index = getattr(values, "index", None) if hasattr(values, "to_numpy") else None
+    amounts = np.asarray(values.to_numpy(dtype=float, na_value=np.nan) if index is not None else values, dtype=float)
+    flat = amounts.ravel()
+    result = np.full(flat.shape, na, dtype=object)
+
+    finite = np.isfinite(flat)
+    if finite.any():
+        # str.format is the fastest exact "%.2f" available; "+ 0.0" turns -0.0 into 0.0
+        fixed = np.array([f"{amount:.2f}" for amount in (flat[finite] + 0.0).tolist()])
+        negative = np.char.startswith(fixed, "-")
+        fixed = np.char.lstrip(fixed, "-")
+
+        # Right-align into a character matrix: the last three columns are
+        # ".dd" and the integer digits sit right-aligned before them.
+        width = fixed.dtype.itemsize // np.dtype("U1").itemsize
+        chars = np.char.rjust(fixed, width).view("U1").reshape(-1, width)
+        integer_width = width - 3
+
+        blocks = [chars[:, max(integer_width - 3, 0):]]
+        end = integer_width - 3
+        while end > 0:
+            start = max(end - 2, 0)
+            comma = np.where(chars[:, end - 1] != " ", ",", " ").reshape(-1, 1)
+            blocks[:0] = [chars[:, start:end], comma]
+            end = start
+        matrix = np.ascontiguousarray(np.concatenate(blocks, axis=1))
+        grouped = np.char.lstrip(matrix.view(f"U{matrix.shape[1]}").ravel())
+
+        signs = np.where(negative, "-", "")
+        result[finite] = np.char.add(np.char.add(np.char.add(symbol, signs), grouped), suffix)
+
+    result = result.reshape(amounts.shape)
+    if index is not None:
+        import pandas as pd
+        return pd.Series(result, index=index, name=getattr(values, "name", None))
+    return result
+
+
+def xlsx_inr_format(symbol="₹", decimals=2):
+    """
+    Excel number format with lakh/crore grouping, e.g. ₹12,34,567.89.
+    Excel has no Indian grouping code, so the format switches on magnitude
+    with literal commas; negative amounts use the default grouping.
+    """
+    fraction = "." + "0" * decimals if decimals else ""
+    prefix = f'"{symbol}"' if symbol else ""
+    return (
+        f"[>=10000000]{prefix}##\\,##\\,##\\,##0{fraction};"
+        f"[>=100000]{prefix}##\\,##\\,##0{fraction};"
+        f"{prefix}#,##0{fraction}"
+    )
+
+
+INR_XLSX_FORMAT = xlsx_inr_format()
+INR_XLSX_NUMBER_FORMAT = xlsx_inr_format(symbol="")